@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import logging
+
+from ansible.plugins.action import ActionBase
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import EntityApi
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_batch import (
+    TagBatch,
+    TagRequest,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+    configure_circuit_breaker,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    PendingPropagationStore,
+)
+
+
+logger = logging.getLogger(__name__)
+
+ARGUMENT_SPEC = {
+    **ModuleBase.shared_argument_spec(),
+    **dict(
+        host_var=dict(type="str", default="newrelic_entity_tags"),
+        hosts=dict(type="list", elements="str", required=False),
+        batch_size=dict(type="int", default=25),
+    ),
+}
+
+
+class ActionModule(ActionBase):
+    """
+    Runs the entity_tags changes for every host in the play batch in the controller
+    process, using batched entity reads and aliased mutations.
+    """
+
+    TRANSFERS_FILES = False
+    _requires_connection = False
+
+    def run(self, tmp=None, task_vars=None):
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        _, params = self.validate_argument_spec(argument_spec=ARGUMENT_SPEC)
+        hosts = params["hosts"]
+        if not hosts and self._task.run_once:
+            hosts = task_vars.get("ansible_play_batch") or []
+        elif not hosts:
+            # without run_once every host runs the task, so each one only manages itself
+            hosts = [task_vars["inventory_hostname"]]
+        elif not self._task.run_once:
+            result["warnings"] = [
+                "run_once is not set, so the tags of every host in hosts are managed"
+                " once for each host in the play"
+            ]
+        results = dict()
+        requests = []
+        for host in hosts:
+            host_params = self._host_var(host, params["host_var"], task_vars)
+            if host_params is None:
+                results[host] = dict(
+                    changed=False,
+                    skipped=True,
+                    msg="%s is not defined for this host" % params["host_var"],
+                )
+                continue
+            try:
+                requests.append(TagRequest.from_params(host, dict(host_params)))
+            except (TypeError, ValueError) as e:
+                results[host] = dict(changed=False, failed=True, msg=str(e))
+
+        try:
+            self._run_batch(params, requests, results)
+        except Exception as e:
+            logger.fatal("%s", e)
+            result.update(failed=True, msg=str(e), results=results)
+            return result
+
+        result["results"] = results
+        result["changed"] = any(r.get("changed") for r in results.values())
+        failed = sorted(host for host, r in results.items() if r.get("failed"))
+        if failed:
+            result["failed"] = True
+            result["msg"] = "Tag changes failed for hosts: %s" % ", ".join(failed)
+        if self._task.diff or self._task.check_mode:
+            result["diff"] = [
+                dict(r["diff"], before_header=host, after_header=host)
+                for host, r in results.items()
+                if r.get("diff")
+            ]
+        return result
+
+    def _host_var(self, host: str, name: str, task_vars: dict):
+        """
+        Returns the templated value of a variable for another host. hostvars only has
+        inventory vars and facts, so the host's vars are resolved the same way they
+        would be for a task running on it, including play and role vars.
+        """
+        variable_manager = self._task.get_variable_manager()
+        if variable_manager is None:
+            return task_vars["hostvars"][host].get(name)
+        host_vars = variable_manager.get_vars(
+            play=self._task.get_play(),
+            host=variable_manager._inventory.get_host(host),
+            task=self._task,
+        )
+        if host_vars.get(name) is None:
+            return None
+        templar = self._templar.copy_with_new_env(available_variables=host_vars)
+        return templar.template(host_vars[name])
+
+    def _run_batch(self, params: dict, requests: list, results: dict):
+        if not requests:
+            return
+        configure_circuit_breaker(params)
+        waits = params["wait_for_propegation"] and params["consistency"] == "strong"
+        api = EntityApi(
+            params["api_key"],
+            waits,
+            params["propegation_timeout"],
+            compress_requests=params["compress_requests"],
+            request_timeout=params["request_timeout"],
+        )
+        batch = TagBatch(api, requests, batch_size=params["batch_size"])
+        results.update(batch.plan())
+        if self._task.check_mode:
+            return
+
+        markers = batch.apply()
+        if waits:
+            batch.wait(markers, timeout=params["propegation_timeout"])
+        elif params["consistency"] != "strong":
+            store = PendingPropagationStore(params["propagation_file"])
+            for host, marker in markers.items():
+                results[host]["pending_propagation"] = store.add(marker)
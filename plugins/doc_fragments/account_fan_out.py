@@ -0,0 +1,29 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r"""
+options:
+    account_ids:
+        description:
+            - A list of account IDs to search, instead of only O(account_id).
+            - Several accounts are searched in each query, and the queries are run concurrently.
+            - When set, results are also returned for each account, keyed by account ID.
+        required: false
+        type: list
+        elements: str
+    max_workers:
+        description:
+            - The maximum number of queries to run at the same time when O(account_ids) is set.
+        required: false
+        type: int
+        default: 4
+    requests_per_second:
+        description:
+            - The maximum number of queries to start each second for the API key when O(account_ids) is set.
+        required: false
+        type: float
+        default: 5.0
+"""
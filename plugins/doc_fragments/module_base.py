@@ -46,4 +46,79 @@ options:
             - Only used if `wait_for_propegation` is true.
         default: 15
         type: int
+    consistency:
+        description:
+            - Controls how modules confirm that their changes are visible in the New Relic API.
+            - V(strong) waits for each change to be visible, as controlled by O(wait_for_propegation).
+            - V(mutation) trusts the object returned by the mutation and returns immediately. A pending
+              propagation marker is written to O(propagation_file) and returned as RV(ignore:pending_propagation).
+            - V(eventual) behaves like V(mutation) for the changing task. Use it when the
+              M(newrelic.core.propagation_verify) module is run at the end of the play to check all pending markers at once.
+            - If this is unset, the NR_CONSISTENCY environment variable will be used instead.
+        default: strong
+        type: str
+        choices: [strong, mutation, eventual]
+    propagation_file:
+        description:
+            - Path to the controller local file where pending propagation markers are stored.
+            - Only used if O(consistency) is V(mutation) or V(eventual).
+            - If this is unset, the NR_PROPAGATION_FILE environment variable will be used instead.
+        default: ~/.ansible/newrelic_pending_propagation.json
+        type: path
+    compress_requests:
+        description:
+            - When true, large request bodies are gzipped before they are sent to New Relic.
+              Responses are always requested with gzip compression.
+            - This reduces the bandwidth used by large mutations, such as adding many tags
+              or creating conditions with long configurations.
+            - If this is unset, the NR_COMPRESS_REQUESTS environment variable will be used instead.
+        default: false
+        type: bool
+    request_timeout:
+        description:
+            - The number of seconds to wait for New Relic to accept a connection, and to wait
+              for each part of a response.
+            - A request that times out fails the task, and counts as a failure for the circuit
+              breaker if O(circuit_breaker_file) is set.
+            - If this is unset, the NR_REQUEST_TIMEOUT environment variable will be used instead.
+        default: 30
+        type: float
+    trace_file:
+        description:
+            - Path to a local file where tracing spans should be written, one JSON document per line.
+            - Spans are recorded for the module execution, each NerdGraph query, each page of
+              paginated searches, and each wait for a change to propagate.
+            - Set the NR_TRACE_ID environment variable to correlate spans across tasks in a run.
+            - If this is unset, the NR_TRACE_FILE environment variable will be used instead.
+            - If no file is given, tracing is disabled.
+        required: false
+        type: path
+    circuit_breaker_file:
+        description:
+            - Path to a controller local file where the state of the NerdGraph circuit breaker is stored.
+              Every task that uses the same file shares the breaker.
+            - When most recent requests fail because New Relic can not be reached or returns server
+              errors, the breaker opens and tasks fail immediately instead of retrying, until
+              O(circuit_breaker_cooldown) seconds have passed.
+            - If this is unset, the NR_CIRCUIT_BREAKER_FILE environment variable will be used instead.
+            - If no file is given, the circuit breaker is disabled.
+        required: false
+        type: path
+    circuit_breaker_failure_rate:
+        description:
+            - The fraction of requests in the last minute that must fail to open the circuit breaker.
+              The breaker only opens after at least 10 requests were sent in that time.
+            - Only used if O(circuit_breaker_file) is set.
+            - If this is unset, the NR_CIRCUIT_BREAKER_FAILURE_RATE environment variable will be used instead.
+        default: 0.5
+        type: float
+    circuit_breaker_cooldown:
+        description:
+            - The number of seconds the circuit breaker stays open. After that, one request is sent to check
+              if New Relic recovered. If it succeeds, the breaker closes, otherwise it stays open for
+              another cooldown.
+            - Only used if O(circuit_breaker_file) is set.
+            - If this is unset, the NR_CIRCUIT_BREAKER_COOLDOWN environment variable will be used instead.
+        default: 30
+        type: int
 """
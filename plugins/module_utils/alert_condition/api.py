@@ -1,11 +1,20 @@
 import logging
 
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.cache import (
+    PolicyConditionCache,
+)
 from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
     NrqlAlertConditionBase,
     NrqlStaticAlertCondition,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import (
+    arguments,
+    string,
+)
 from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    DEFAULT_REQUEST_TIMEOUT,
     NerdGraphApiBase,
+    actor_document,
 )
 
 
@@ -18,17 +27,39 @@ class NrqlAlertConditionApi(NerdGraphApiBase):
         api_key: str,
         wait_for_propegation: bool = True,
         propegation_timeout: int = 10,
+        compress_requests: bool = False,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        condition_cache: PolicyConditionCache = None,
     ):
         super().__init__(
             api_key=api_key,
             wait_for_propegation=wait_for_propegation,
             propegation_timeout=propegation_timeout,
+            compress_requests=compress_requests,
+            request_timeout=request_timeout,
         )
+        self.condition_cache = condition_cache
 
     def get_condition_by_name_policy_and_account(self, name, policy_id, account_id):
+        if self.condition_cache is not None:
+            hit, data = self.condition_cache.lookup(
+                account_id,
+                policy_id,
+                name,
+                fetch_policy=lambda: self.iter_condition_data_from_query(
+                    arguments(dict(policyId=str(policy_id))), account_id
+                ),
+            )
+            if hit:
+                if data is None:
+                    return None
+                return NrqlAlertConditionBase.from_api_data(
+                    data=data, account_id=account_id
+                )
+
         existing_conditions, _ = (  # pylint: disable=disallowed-name
             self.get_conditions_from_query(
-                entity_search_query='name: "%s", policyId: "%s"' % (name, policy_id),
+                entity_search_query=arguments(dict(name=name, policyId=str(policy_id))),
                 account_id=account_id,
             )
         )
@@ -40,62 +71,202 @@ class NrqlAlertConditionApi(NerdGraphApiBase):
             raise Exception("Multiple alert conditions matched name query....")
 
     def get_conditions_from_query(
-        self, entity_search_query: str, account_id: str, cursor: str = ""
+        self,
+        entity_search_query: str,
+        account_id: str,
+        cursor: str = "",
+        fields: list = None,
+        skip_unsupported: bool = False,
     ) -> list:
-        logger.info("Getting conditions from search '%s'", entity_search_query)
-        query_template = self.jinja_env.from_string(
-            NrqlAlertConditionBase.J2_SEARCH_QUERY
-        )
-        query = query_template.render(
-            entity_search_query=entity_search_query,
-            account_id=account_id,
-            cursor=cursor,
-        )
-        r = self.run_query(query=query)
-        try:
-            query_conditions = r["data"]["actor"]["account"]["alerts"][
-                "nrqlConditionsSearch"
-            ]["nrqlConditions"]
-            cursor = r["data"]["actor"]["account"]["alerts"]["nrqlConditionsSearch"][
-                "nextCursor"
-            ]
-        except KeyError as e:
-            logger.fatal("Encountered key error on '%s'", e)
-            logger.fatal("response=%s", r)
-            raise Exception("Query response did not match excepted format")
+        """
+        Returns one page of conditions matching the search, and the cursor for the
+        next page. If fields is given, only those condition attributes are fetched.
 
+        Conditions of a type that objects can't be created for (baseline, outlier)
+        raise an exception, unless skip_unsupported is true. Then they are skipped
+        with a warning.
+        """
+        query_conditions, cursor = self.get_condition_data_from_query(
+            entity_search_query, account_id, cursor=cursor, fields=fields
+        )
         found_conditions = []
         for condition_data in query_conditions:
-            logger.debug(condition_data)
-            found_conditions += [
+            if skip_unsupported and not (
+                NrqlAlertConditionBase.is_supported_data(condition_data)
+            ):
+                logger.warning(
+                    "Skipping condition %s, %s conditions are not supported",
+                    condition_data.get("id"),
+                    condition_data.get("type"),
+                )
+                continue
+            found_conditions.append(
                 NrqlAlertConditionBase.from_api_data(
                     data=condition_data, account_id=account_id
                 )
-            ]
+            )
         return found_conditions, cursor
 
+    def get_condition_data_from_query(
+        self,
+        entity_search_query: str,
+        account_id: str,
+        cursor: str = "",
+        fields: list = None,
+    ) -> list:
+        """
+        Returns the raw API data of one page of conditions matching the search, and
+        the cursor for the next page.
+        """
+        logger.info("Getting conditions from search '%s'", entity_search_query)
+        query = actor_document(
+            [
+                NrqlAlertConditionBase.SEARCH_FIELD
+                % dict(
+                    entity_search_query=entity_search_query,
+                    account_id=int(account_id),
+                    cursor=string(cursor or ""),
+                    # static conditions are the only supported type, and their fields
+                    # are a superset of the base condition fields
+                    selection=NrqlStaticAlertCondition.search_selection(fields),
+                )
+            ]
+        )
+        with self.trace_page("nrqlConditionsSearch", account_id, cursor) as span:
+            r = self.run_query(query=query)
+            try:
+                query_conditions = r["data"]["actor"]["account"]["alerts"][
+                    "nrqlConditionsSearch"
+                ]["nrqlConditions"]
+                cursor = r["data"]["actor"]["account"]["alerts"][
+                    "nrqlConditionsSearch"
+                ]["nextCursor"]
+            except KeyError as e:
+                logger.fatal("Encountered key error on '%s'", e)
+                logger.fatal("response=%s", r)
+                raise Exception("Query response did not match excepted format")
+            span.set_attribute("results", len(query_conditions))
+
+        logger.info(
+            "Found %s conditions. Next cursor is %s", len(query_conditions), cursor
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            for condition_data in query_conditions:
+                logger.debug("condition=%s", condition_data)
+        return query_conditions, cursor
+
+    def iter_conditions_from_query(
+        self,
+        entity_search_query: str,
+        account_id: str,
+        fields: list = None,
+        skip_unsupported: bool = False,
+    ):
+        """
+        Yields every condition matching the search, following the result cursor.
+        skip_unsupported is passed to get_conditions_from_query.
+        """
+        cursor = ""
+        while True:
+            conditions, cursor = self.get_conditions_from_query(
+                entity_search_query,
+                account_id,
+                cursor=cursor,
+                fields=fields,
+                skip_unsupported=skip_unsupported,
+            )
+            yield from conditions
+            if not cursor:
+                return
+
+    def iter_condition_data_from_query(self, entity_search_query: str, account_id: str):
+        """
+        Yields the raw API data of every condition matching the search.
+        """
+        cursor = ""
+        while True:
+            conditions, cursor = self.get_condition_data_from_query(
+                entity_search_query, account_id, cursor=cursor
+            )
+            yield from conditions
+            if not cursor:
+                return
+
+    def _invalidate_cache(self, condition: NrqlAlertConditionBase):
+        if self.condition_cache is not None:
+            self.condition_cache.invalidate(
+                condition.account_id, condition.policy_id, condition.name
+            )
+
+    def get_conditions_from_accounts(
+        self, entity_search_query: str, cursors: dict, fields: list = None
+    ) -> dict:
+        """
+        Returns one page of conditions matching the search in each account, and the
+        cursor for each account's next page. cursors maps account IDs to the cursor
+        to search from, and all of the accounts are searched in one query.
+        """
+        accounts = list(cursors.items())
+        logger.info(
+            "Getting conditions from search '%s' in %s accounts",
+            entity_search_query,
+            len(accounts),
+        )
+        selection = NrqlStaticAlertCondition.search_selection(fields)
+        query = actor_document(
+            [
+                NrqlAlertConditionBase.SEARCH_FIELD
+                % dict(
+                    entity_search_query=entity_search_query,
+                    account_id=int(account_id),
+                    cursor=string(cursor or ""),
+                    selection=selection,
+                )
+                for account_id, cursor in accounts
+            ],
+            aliased=True,
+        )
+        pages = dict()
+        with self.trace_page("nrqlConditionsSearch", None, None) as span:
+            r = self.run_query(query=query)
+            try:
+                for i, (account_id, _) in enumerate(accounts):
+                    search = r["data"]["actor"]["a%s" % i]["alerts"][
+                        "nrqlConditionsSearch"
+                    ]
+                    pages[account_id] = (
+                        [
+                            NrqlAlertConditionBase.from_api_data(
+                                data=data, account_id=account_id
+                            )
+                            for data in search["nrqlConditions"]
+                        ],
+                        search["nextCursor"],
+                    )
+            except (KeyError, TypeError) as e:
+                logger.fatal("Encountered key error on '%s'", e)
+                logger.fatal("response=%s", r)
+                raise Exception("Query response did not match excepted format")
+            span.set_attribute("accounts", len(accounts))
+        return pages
+
     def delete_condition(self, condition: NrqlAlertConditionBase) -> str:
         logger.info(
             "Deleting alert condition %s with ID %s",
             condition.name,
             condition.id,
         )
-        query_template = self.jinja_env.from_string(
-            NrqlAlertConditionBase.J2_DELETE_QUERY
-        )
-        query = query_template.render(condition=condition)
+        query = condition.delete_mutation()
+        self._invalidate_cache(condition)
         r = self.run_query(query=query)
         return r["data"]["alertsConditionDelete"]["id"]
 
     def create_condition(self, condition: NrqlAlertConditionBase):
         condition.validate_properties()
-        if condition.entity_type == "STATIC":
-            query_template = self.jinja_env.from_string(
-                NrqlStaticAlertCondition.J2_CREATE_QUERY
-            )
-        else:
+        if condition.entity_type != "STATIC":
             raise Exception("Unknown condition type %s" % condition.entity_type)
-        query = query_template.render(condition=condition)
+        query = condition.create_mutation()
+        self._invalidate_cache(condition)
         r = self.run_query(query=query)
         logger.debug(r)
         condition.id = r["data"]["alertsNrqlConditionStaticCreate"]["id"]
@@ -103,13 +274,10 @@ class NrqlAlertConditionApi(NerdGraphApiBase):
 
     def update_condition(self, condition: NrqlAlertConditionBase):
         condition.validate_properties()
-        if condition.entity_type == "STATIC":
-            query_template = self.jinja_env.from_string(
-                NrqlStaticAlertCondition.J2_UPDATE_QUERY
-            )
-        else:
+        if condition.entity_type != "STATIC":
             raise Exception("Unknown condition type %s" % condition.entity_type)
-        query = query_template.render(condition=condition)
+        query = condition.update_mutation()
+        self._invalidate_cache(condition)
         r = self.run_query(query=query)
         logger.debug(r)
         condition.id = r["data"]["alertsNrqlConditionStaticUpdate"]["id"]
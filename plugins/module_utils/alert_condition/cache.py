@@ -0,0 +1,132 @@
+"""
+A controller local cache of the conditions in alert policies, so many tasks that
+manage conditions in the same policy can share one search of the policy.
+"""
+
+import contextlib
+import logging
+import os
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONDITION_CACHE_FILE = "~/.ansible/newrelic_condition_cache.json"
+
+
+class PolicyConditionCache:
+    """
+    A JSON file of the raw search data of every condition in a policy, keyed by
+    account and policy. Ansible runs tasks for many hosts in parallel processes, so
+    every read-modify-write happens under an exclusive lock on a sidecar lock file.
+    The lock is also held while a policy is fetched, so only the first task for a
+    policy searches it.
+
+    Policies are fetched again once their entry is older than ttl seconds. Conditions
+    that were changed since the policy was fetched are marked as invalid, and must be
+    looked up directly until the policy is fetched again.
+    """
+
+    # version 2 stores a list of conditions per name
+    FORMAT_VERSION = 2
+
+    def __init__(self, path: str = None, ttl: int = 300):
+        self.path = os.path.expanduser(path or DEFAULT_CONDITION_CACHE_FILE)
+        self.ttl = ttl
+
+    @staticmethod
+    def policy_key(account_id: str, policy_id: str):
+        return "%s:%s" % (account_id, policy_id)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = json_compat.loads(f.read())
+        except FileNotFoundError:
+            return dict()
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable condition cache %s: %s", self.path, e)
+            return dict()
+        if data.get("version") != self.FORMAT_VERSION:
+            return dict()
+        return data.get("policies", {})
+
+    def _write(self, policies: dict):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                json_compat.dumps_bytes(
+                    {"version": self.FORMAT_VERSION, "policies": policies}
+                )
+            )
+        os.replace(tmp_path, self.path)
+
+    def _is_fresh(self, entry: dict):
+        return entry is not None and time.time() - entry["fetched_at"] <= self.ttl
+
+    def lookup(self, account_id: str, policy_id: str, name: str, fetch_policy):
+        """
+        Returns (True, data) with the raw data of a condition, or (True, None) if the
+        policy has no condition with that name. Returns (False, None) if the
+        condition was invalidated and must be looked up directly. Raises an exception
+        if the policy has more than one condition with the name, like the uncached
+        lookup does.
+
+        fetch_policy is called to get the raw data of every condition in the policy
+        if it is not cached.
+        """
+        key = self.policy_key(account_id, policy_id)
+        with self._locked():
+            policies = self._read()
+            entry = policies.get(key)
+            if not self._is_fresh(entry):
+                logger.info("Prefetching the conditions in policy %s", policy_id)
+                conditions = dict()
+                for data in fetch_policy():
+                    conditions.setdefault(data["name"], []).append(data)
+                entry = dict(fetched_at=time.time(), conditions=conditions, invalid=[])
+                policies = {k: v for k, v in policies.items() if self._is_fresh(v)}
+                policies[key] = entry
+                self._write(policies)
+            else:
+                logger.info("Using cached conditions for policy %s", policy_id)
+
+        if name in entry["invalid"]:
+            return False, None
+        matches = entry["conditions"].get(name) or []
+        if len(matches) > 1:
+            raise Exception("Multiple alert conditions matched name query....")
+        return True, matches[0] if matches else None
+
+    def invalidate(self, account_id: str, policy_id: str, name: str):
+        """
+        Marks a condition as changed, so it is looked up directly until its policy
+        is fetched again.
+        """
+        key = self.policy_key(account_id, policy_id)
+        with self._locked():
+            policies = self._read()
+            entry = policies.get(key)
+            if entry is None or name in entry["invalid"]:
+                return
+            entry["invalid"].append(name)
+            self._write(policies)
@@ -7,12 +7,18 @@ from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.quer
 from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
     Entity,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import enum
+from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    FingerprintedChild,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
-class IncidentTerm:
+class IncidentTerm(FingerprintedChild):
+    __slots__ = ("threshold", "_priority", "operator", "duration", "occurrences")
+
     def __init__(
         self,
         threshold: int,
@@ -41,7 +47,7 @@ class IncidentTerm:
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self.to_json() == other.to_json()
         else:
             return False
 
@@ -58,12 +64,62 @@ class IncidentTerm:
         self._priority = new_val
 
     def to_json(self):
-        return self.__dict__
+        return {
+            "threshold": self.threshold,
+            "priority": self.priority,
+            "operator": self.operator,
+            "duration": self.duration,
+            "occurrences": self.occurrences,
+        }
+
+    def graphql_input(self):
+        """
+        The term as an AlertsNrqlConditionTermsInput object.
+        """
+        return dict(
+            threshold=self.threshold,
+            thresholdDuration=self.duration,
+            thresholdOccurrences=enum(self.occurrences),
+            operator=enum(self.operator),
+            priority=enum(self.priority),
+        )
 
 
 class NrqlAlertConditionBase(Entity):
-    J2_SEARCH_QUERY = NrqlBaseClassAlertConditionTemplates.j2_get_from_search()
-    J2_DELETE_QUERY = NrqlBaseClassAlertConditionTemplates.j2_delete()
+    __slots__ = (
+        "id",
+        "enabled",
+        "description",
+        "policy_id",
+        "incident_terms",
+        "updated_at",
+    )
+    _equality_attrs = Entity._equality_attrs + (
+        "entity_type",
+        "description",
+        "policy_id",
+        "incident_terms",
+    )
+    _search_fields = {
+        "id": ("id",),
+        "name": ("name",),
+        "account_id": (),
+        "guid": ("entityGuid",),
+        "entity_type": ("type",),
+        "policy_id": ("policyId",),
+        "enabled": ("enabled",),
+        "description": ("description",),
+        "incident_terms": (
+            "terms.priority",
+            "terms.operator",
+            "terms.threshold",
+            "terms.thresholdDuration",
+            "terms.thresholdOccurrences",
+        ),
+        "updated_at": ("updatedAt",),
+    }
+    _required_search_fields = ("id", "name", "account_id", "entity_type", "policy_id")
+    SEARCH_FIELD = NrqlBaseClassAlertConditionTemplates.search_field()
 
     def __init__(
         self,
@@ -80,9 +136,15 @@ class NrqlAlertConditionBase(Entity):
         self.description = ""
         self.policy_id = policy_id
         self.incident_terms = []
-        self._equality_attrs.update(
-            ["entity_type", "description", "policy_id", "incident_terms"]
-        )
+        # epoch milliseconds of the last change, which is not compared for equality
+        self.updated_at = None
+
+    # the condition types objects can be created for
+    SUPPORTED_TYPES = ("STATIC",)
+
+    @classmethod
+    def is_supported_data(cls, data):
+        return data.get("type") in cls.SUPPORTED_TYPES
 
     @classmethod
     def from_api_data(cls, data, account_id):
@@ -96,10 +158,33 @@ class NrqlAlertConditionBase(Entity):
     def output_identity_dict(self):
         return {"name": self.name, "id": self.id, "guid": self.guid}
 
+    def delete_mutation(self):
+        return NrqlBaseClassAlertConditionTemplates.delete_mutation(self)
+
 
 class NrqlStaticAlertCondition(NrqlAlertConditionBase):
-    J2_CREATE_QUERY = NrqlStaticAlertConditionTemplates.j2_create()
-    J2_UPDATE_QUERY = NrqlStaticAlertConditionTemplates.j2_update()
+    __slots__ = (
+        "nrql_query",
+        "runbook_url",
+        "data_aggregation_window",
+        "data_aggregation_method",
+        "data_aggregation_timer",
+        "data_aggregation_delay",
+        "data_slide_by",
+        "evaluation_delay",
+    )
+    _equality_attrs = NrqlAlertConditionBase._equality_attrs + __slots__
+    _search_fields = {
+        **NrqlAlertConditionBase._search_fields,
+        "nrql_query": ("nrql.query",),
+        "runbook_url": ("runbookUrl",),
+        "data_aggregation_window": ("signal.aggregationWindow",),
+        "data_aggregation_method": ("signal.aggregationMethod",),
+        "data_aggregation_timer": ("signal.aggregationTimer",),
+        "data_aggregation_delay": ("signal.aggregationDelay",),
+        "data_slide_by": ("signal.slideBy",),
+        "evaluation_delay": ("signal.evaluationDelay",),
+    }
 
     def __init__(self, name: str, account_id: str, policy_id: str, id: str = None):
         super().__init__(name=name, account_id=account_id, policy_id=policy_id, id=id)
@@ -113,19 +198,7 @@ class NrqlStaticAlertCondition(NrqlAlertConditionBase):
         self.data_aggregation_timer = None
         self.data_aggregation_delay = None
         self.data_slide_by = None
-
-        self._equality_attrs.update(
-            [
-                "runbook_url",
-                "nrql_query",
-                "data_aggregation_window",
-                "data_aggregation_method",
-                "data_aggregation_timer",
-                "data_aggregation_delay",
-                "data_slide_by",
-                "evaluation_delay",
-            ]
-        )
+        self.evaluation_delay = None
 
     def validate_properties(self):
         if (
@@ -148,18 +221,54 @@ class NrqlStaticAlertCondition(NrqlAlertConditionBase):
             id=data["id"],
         )
 
+        # searches can select a subset of fields, so anything may be missing
+        nrql = data.get("nrql") or {}
+        signal = data.get("signal") or {}
         obj.enabled = data.get("enabled")
         obj.guid = data.get("entityGuid")
-        obj.nrql_query = data.get("nrql")["query"]
+        obj.nrql_query = nrql.get("query", obj.nrql_query)
         obj.description = data.get("description")
         obj.runbook_url = data.get("runbookUrl")
-        obj.data_aggregation_window = data.get("signal")["aggregationWindow"]
-        obj.data_aggregation_method = data.get("signal")["aggregationMethod"]
-        obj.data_aggregation_timer = data.get("signal")["aggregationTimer"]
-        obj.data_aggregation_delay = data.get("signal")["aggregationDelay"]
-        obj.data_slide_by = data.get("signal")["slideBy"]
-        obj.evaluation_delay = data.get("signal")["evaluationDelay"]
-        for term in data.get("terms", []):
+        obj.data_aggregation_window = signal.get("aggregationWindow")
+        obj.data_aggregation_method = signal.get("aggregationMethod")
+        obj.data_aggregation_timer = signal.get("aggregationTimer")
+        obj.data_aggregation_delay = signal.get("aggregationDelay")
+        obj.data_slide_by = signal.get("slideBy")
+        obj.evaluation_delay = signal.get("evaluationDelay")
+        obj.updated_at = data.get("updatedAt")
+        for term in data.get("terms") or []:
             obj.incident_terms.append(IncidentTerm.from_api_data(term))
 
         return obj
+
+    def graphql_input(self):
+        """
+        The condition as an AlertsNrqlConditionStaticInput object.
+        """
+        signal = dict()
+        if self.data_slide_by:
+            signal["slideBy"] = self.data_slide_by
+        if self.data_aggregation_method != "EVENT_TIMER":
+            signal["aggregationDelay"] = self.data_aggregation_delay
+        if self.data_aggregation_method != "EVENT_FLOW":
+            signal["aggregationTimer"] = self.data_aggregation_timer
+        signal["aggregationWindow"] = self.data_aggregation_window
+        signal["aggregationMethod"] = enum(self.data_aggregation_method)
+
+        condition = dict(name=self.name, enabled=self.enabled)
+        if self.description:
+            condition["description"] = self.description
+        condition["nrql"] = dict(query=self.nrql_query)
+        if self.runbook_url:
+            condition["runbookUrl"] = self.runbook_url
+        condition["signal"] = signal
+        condition["terms"] = [term.graphql_input() for term in self.incident_terms]
+        condition["valueFunction"] = enum("SINGLE_VALUE")
+        condition["violationTimeLimitSeconds"] = 86400
+        return condition
+
+    def create_mutation(self):
+        return NrqlStaticAlertConditionTemplates.create_mutation(self)
+
+    def update_mutation(self):
+        return NrqlStaticAlertConditionTemplates.update_mutation(self)
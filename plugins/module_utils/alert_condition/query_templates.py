@@ -1,64 +1,49 @@
 # Ansible search paths are really obscure, especially around text files. So instead we can store these
-# jinja templates as strings in a python file
+# documents in a python file
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import (
+    Field,
+    identifier,
+    mutation,
+)
+
+
 class NrqlBaseClassAlertConditionTemplates:
     def __init__(self):
         pass
 
     @staticmethod
-    def j2_delete():
-        return """mutation {
-            alertsConditionDelete(accountId: {{ condition.account_id }}, id: {{ condition.id }}) {
-                id
-            }
-        }"""
+    def delete_mutation(condition):
+        return mutation(
+            Field(
+                "alertsConditionDelete",
+                args=dict(
+                    accountId=int(condition.account_id), id=identifier(condition.id)
+                ),
+                selection=("id",),
+            )
+        )
 
     @staticmethod
-    def j2_get_from_search():
-        return """{
-            actor {
-                account(id: {{ account_id }}) {
-                    alerts {
-                        nrqlConditionsSearch(
-                            searchCriteria: { {{ entity_search_query }} }
-                            cursor: "{{ cursor }}"
-                        ) {
-                            totalCount
-                            nextCursor
-                            nrqlConditions {
-                                description
-                                enabled
-                                entityGuid
-                                id
-                                name
-                                nrql {
-                                    query
-                                }
-                                runbookUrl
-                                policyId
-                                signal {
-                                    aggregationDelay
-                                    aggregationMethod
-                                    aggregationTimer
-                                    aggregationWindow
-                                    evaluationDelay
-                                    fillOption
-                                    fillValue
-                                    slideBy
-                                }
-                                terms {
-                                    priority
-                                    operator
-                                    threshold
-                                    thresholdDuration
-                                    thresholdOccurrences
-                                }
-                                type
-                            }
+    def search_field():
+        """
+        The nrqlConditionsSearch field for one account. Search documents only substitute
+        plain values, so this is a %-format string. account_id must be an int, and the
+        search criteria and cursor must already be escaped.
+        """
+        return """account(id: %(account_id)s) {
+                alerts {
+                    nrqlConditionsSearch(
+                        searchCriteria: { %(entity_search_query)s }
+                        cursor: %(cursor)s
+                    ) {
+                        totalCount
+                        nextCursor
+                        nrqlConditions {
+                            %(selection)s
                         }
                     }
                 }
-            }
-        }"""
+            }"""
 
 
 class NrqlStaticAlertConditionTemplates:
@@ -66,75 +51,29 @@ class NrqlStaticAlertConditionTemplates:
         pass
 
     @staticmethod
-    def j2_create():
-        return (
-            "mutation {"
-            "  alertsNrqlConditionStaticCreate ("
-            "    accountId: {{ condition.account_id }}"
-            "    policyId: {{ condition.policy_id }}"
-            "    %s"
-            "  ) {"
-            "    id"
-            "    entityGuid"
-            "  }"
-            "}" % NrqlStaticAlertConditionTemplates.__condition_config()
-        )
-
-    @staticmethod
-    def j2_update():
-        return (
-            "mutation {"
-            "  alertsNrqlConditionStaticUpdate ("
-            "    accountId: {{ condition.account_id }},"
-            "    id: {{ condition.id }},"
-            "    %s"
-            "  ) {"
-            "    id"
-            "    entityGuid"
-            "  }"
-            "}" % NrqlStaticAlertConditionTemplates.__condition_config()
+    def create_mutation(condition):
+        return mutation(
+            Field(
+                "alertsNrqlConditionStaticCreate",
+                args=dict(
+                    accountId=int(condition.account_id),
+                    policyId=identifier(condition.policy_id),
+                    condition=condition.graphql_input(),
+                ),
+                selection=("id", "entityGuid"),
+            )
         )
 
     @staticmethod
-    def __condition_config():
-        return (
-            "condition: {"
-            '  name: "{{ condition.name }}",'
-            "  enabled: {{ condition.enabled | tojson }},"
-            "  {% if condition.description %}"
-            '  description: "{{ condition.description }}",'
-            "  {% endif %}"
-            "  nrql: {"
-            '    query: "{{ condition.nrql_query }}"'
-            "  },"
-            "  {% if condition.runbook_url %}"
-            '  runbookUrl: "{{ condition.runbook_url }}",'
-            "  {% endif %}"
-            "  signal: {"
-            "    {% if condition.signal_slide_by %}"
-            "    slideBy: {{ condition.signal_slide_by }},"
-            "    {% endif %}"
-            '    {% if condition.data_aggregation_method != "EVENT_TIMER" %}'
-            "    aggregationDelay: {{ condition.data_aggregation_delay }},"
-            "    {% endif %}"
-            '    {% if condition.data_aggregation_method != "EVENT_FLOW" %}'
-            "    aggregationTimer: {{ condition.data_aggregation_timer | tojson }},"
-            "    {% endif %}"
-            "    aggregationWindow: {{ condition.data_aggregation_window }},"
-            "    aggregationMethod: {{ condition.data_aggregation_method }}"
-            "  },"
-            "  terms: ["
-            "    {% for term in condition.incident_terms %}"
-            "    {"
-            "        threshold: {{ term.threshold }},"
-            "        thresholdDuration: {{ term.duration }},"
-            "        thresholdOccurrences: {{ term.occurrences }},"
-            "        operator: {{ term.operator }},"
-            "        priority: {{ term.priority }}"
-            "    }"
-            "    {% endfor %}"
-            "  ],"
-            "  valueFunction: SINGLE_VALUE,"
-            "  violationTimeLimitSeconds: 86400"
-            "}"
+    def update_mutation(condition):
+        return mutation(
+            Field(
+                "alertsNrqlConditionStaticUpdate",
+                args=dict(
+                    accountId=int(condition.account_id),
+                    id=identifier(condition.id),
+                    condition=condition.graphql_input(),
+                ),
+                selection=("id", "entityGuid"),
+            )
         )
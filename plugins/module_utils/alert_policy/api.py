@@ -4,8 +4,12 @@ import time
 from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
     AlertPolicy,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import arguments
 from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    DEFAULT_REQUEST_TIMEOUT,
     NerdGraphApiBase,
+    actor_document,
+    cursor_argument,
 )
 
 
@@ -18,17 +22,23 @@ class AlertPolicyApi(NerdGraphApiBase):
         api_key: str,
         wait_for_propegation: bool = True,
         propegation_timeout: int = 10,
+        compress_requests: bool = False,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
     ):
         super().__init__(
             api_key=api_key,
             wait_for_propegation=wait_for_propegation,
             propegation_timeout=propegation_timeout,
+            compress_requests=compress_requests,
+            request_timeout=request_timeout,
         )
 
-    def get_policy_by_name_and_account(self, name, account_id):
+    def get_policy_by_name_and_account(self, name, account_id, fields: list = None):
         existing_policies, _ = (  # pylint: disable=disallowed-name
             self.get_policies_from_query(
-                entity_search_query='name: "%s"' % name, account_id=account_id
+                entity_search_query=arguments(dict(name=name)),
+                account_id=account_id,
+                fields=fields,
             )
         )
         if len(existing_policies) == 1:
@@ -39,27 +49,42 @@ class AlertPolicyApi(NerdGraphApiBase):
             raise Exception("Multiple policies matched name query....")
 
     def get_policies_from_query(
-        self, entity_search_query: str, account_id: str, cursor: str = ""
+        self,
+        entity_search_query: str,
+        account_id: str,
+        cursor: str = "",
+        fields: list = None,
     ) -> list:
+        """
+        Returns one page of policies matching the search, and the cursor for the next
+        page. If fields is given, only those policy attributes are fetched.
+        """
         logger.info("Getting policies from search '%s'", entity_search_query)
-        query_template = self.jinja_env.from_string(AlertPolicy.J2_SEARCH_QUERY)
-        query = query_template.render(
-            entity_search_query=entity_search_query,
-            account_id=account_id,
-            cursor=cursor,
-        )
-        r = self.run_query(query=query)
-        try:
-            query_policies = r["data"]["actor"]["account"]["alerts"]["policiesSearch"][
-                "policies"
-            ]
-            next_cursor = r["data"]["actor"]["account"]["alerts"]["policiesSearch"][
-                "nextCursor"
+        query = actor_document(
+            [
+                AlertPolicy.SEARCH_FIELD
+                % dict(
+                    entity_search_query=entity_search_query,
+                    account_id=int(account_id),
+                    cursor=cursor_argument(cursor),
+                    selection=AlertPolicy.search_selection(fields),
+                )
             ]
-        except KeyError as e:
-            logger.fatal("Encountered key error on '%s'", e)
-            logger.fatal("response=%s", r)
-            raise Exception("Query response did not match excepted format")
+        )
+        with self.trace_page("policiesSearch", account_id, cursor) as span:
+            r = self.run_query(query=query)
+            try:
+                query_policies = r["data"]["actor"]["account"]["alerts"][
+                    "policiesSearch"
+                ]["policies"]
+                next_cursor = r["data"]["actor"]["account"]["alerts"]["policiesSearch"][
+                    "nextCursor"
+                ]
+            except KeyError as e:
+                logger.fatal("Encountered key error on '%s'", e)
+                logger.fatal("response=%s", r)
+                raise Exception("Query response did not match excepted format")
+            span.set_attribute("results", len(query_policies))
 
         logger.info(
             "Found %s policies. Next cursor is %s", len(query_policies), next_cursor
@@ -69,10 +94,69 @@ class AlertPolicyApi(NerdGraphApiBase):
             found_policies += [AlertPolicy.from_api_data(policy_data)]
         return found_policies, next_cursor
 
+    def iter_policies_from_query(
+        self, entity_search_query: str, account_id: str, fields: list = None
+    ):
+        """
+        Yields every policy matching the search, following the result cursor.
+        """
+        cursor = ""
+        while True:
+            policies, cursor = self.get_policies_from_query(
+                entity_search_query, account_id, cursor=cursor, fields=fields
+            )
+            yield from policies
+            if not cursor:
+                return
+
+    def get_policies_from_accounts(
+        self, entity_search_query: str, cursors: dict, fields: list = None
+    ) -> dict:
+        """
+        Returns one page of policies matching the search in each account, and the
+        cursor for each account's next page. cursors maps account IDs to the cursor
+        to search from, and all of the accounts are searched in one query.
+        """
+        accounts = list(cursors.items())
+        logger.info(
+            "Getting policies from search '%s' in %s accounts",
+            entity_search_query,
+            len(accounts),
+        )
+        selection = AlertPolicy.search_selection(fields)
+        query = actor_document(
+            [
+                AlertPolicy.SEARCH_FIELD
+                % dict(
+                    entity_search_query=entity_search_query,
+                    account_id=int(account_id),
+                    cursor=cursor_argument(cursor),
+                    selection=selection,
+                )
+                for account_id, cursor in accounts
+            ],
+            aliased=True,
+        )
+        pages = dict()
+        with self.trace_page("policiesSearch", None, None) as span:
+            r = self.run_query(query=query)
+            try:
+                for i, (account_id, _) in enumerate(accounts):
+                    search = r["data"]["actor"]["a%s" % i]["alerts"]["policiesSearch"]
+                    pages[account_id] = (
+                        [AlertPolicy.from_api_data(p) for p in search["policies"]],
+                        search["nextCursor"],
+                    )
+            except (KeyError, TypeError) as e:
+                logger.fatal("Encountered key error on '%s'", e)
+                logger.fatal("response=%s", r)
+                raise Exception("Query response did not match excepted format")
+            span.set_attribute("accounts", len(accounts))
+        return pages
+
     def create_policy(self, alert_policy: AlertPolicy):
         logger.info("Creating alert policy %s", alert_policy.name)
-        query_template = self.jinja_env.from_string(AlertPolicy.J2_CREATE_QUERY)
-        query = query_template.render(alert_policy=alert_policy)
+        query = alert_policy.create_mutation()
         r = self.run_query(query=query)
         logger.debug(r)
         alert_policy.id = r["data"]["alertsPolicyCreate"]["id"]
@@ -80,8 +164,7 @@ class AlertPolicyApi(NerdGraphApiBase):
 
     def update_policy(self, alert_policy: AlertPolicy):
         logger.info("Updating policy %s", alert_policy.name)
-        query_template = self.jinja_env.from_string(alert_policy.J2_UPDATE_QUERY)
-        query = query_template.render(alert_policy=alert_policy)
+        query = alert_policy.update_mutation()
         self.run_query(query=query)
 
     def delete_policy(self, alert_policy: AlertPolicy) -> str:
@@ -90,8 +173,7 @@ class AlertPolicyApi(NerdGraphApiBase):
             alert_policy.name,
             alert_policy.id,
         )
-        query_template = self.jinja_env.from_string(alert_policy.J2_DELETE_QUERY)
-        query = query_template.render(alert_policy=alert_policy)
+        query = alert_policy.delete_mutation()
         r = self.run_query(query=query)
         logger.debug(r)
         return r["data"]["alertsPolicyDelete"]["id"]
@@ -99,15 +181,16 @@ class AlertPolicyApi(NerdGraphApiBase):
     def __wait_for_policy_creation(self, alert_policy):
         if not self.wait_for_propegation:
             return
-        _time = 0
-        remote_policy_def = None
-        while alert_policy != remote_policy_def:
-            if _time > self.propegation_timeout:
-                raise Exception(
-                    "Timedout waiting for new alert policy to exist in New Relic API"
+        with self.trace_propagation_wait("alert_policy", alert_policy.account_id):
+            _time = 0
+            remote_policy_def = None
+            while alert_policy != remote_policy_def:
+                if _time > self.propegation_timeout:
+                    raise Exception(
+                        "Timedout waiting for new alert policy to exist in New Relic API"
+                    )
+                time.sleep(3)
+                _time += 3
+                remote_policy_def = self.get_policy_by_name_and_account(
+                    name=alert_policy.name, account_id=alert_policy.account_id
                 )
-            time.sleep(3)
-            _time += 3
-            remote_policy_def = self.get_policy_by_name_and_account(
-                name=alert_policy.name, account_id=alert_policy.account_id
-            )
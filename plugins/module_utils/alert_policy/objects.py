@@ -3,6 +3,7 @@ import logging
 from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.query_templates import (
     AlertPolicyTemplates,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import enum
 from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
     NrObjectBase,
 )
@@ -12,10 +13,16 @@ logger = logging.getLogger(__name__)
 
 
 class AlertPolicy(NrObjectBase):
-    J2_SEARCH_QUERY = AlertPolicyTemplates.j2_get_from_search()
-    J2_DELETE_QUERY = AlertPolicyTemplates.j2_delete()
-    J2_CREATE_QUERY = AlertPolicyTemplates.j2_create()
-    J2_UPDATE_QUERY = AlertPolicyTemplates.j2_update()
+    __slots__ = ("id", "incident_preference")
+    _equality_attrs = NrObjectBase._equality_attrs + ("incident_preference",)
+    _search_fields = {
+        "id": ("id",),
+        "name": ("name",),
+        "account_id": ("accountId",),
+        "incident_preference": ("incidentPreference",),
+    }
+    _required_search_fields = ("id", "name", "account_id")
+    SEARCH_FIELD = AlertPolicyTemplates.search_field()
 
     def __init__(
         self,
@@ -27,15 +34,29 @@ class AlertPolicy(NrObjectBase):
         super().__init__(name=name, account_id=account_id)
         self.id = id
         self.incident_preference = incident_preference
-        self._equality_attrs.update(["incident_preference"])
 
     @classmethod
     def from_api_data(cls, data):
         obj = cls(
             name=data["name"],
             account_id=data["accountId"],
-            incident_preference=data["incidentPreference"],
+            incident_preference=data.get("incidentPreference"),
             id=data["id"],
         )
 
         return obj
+
+    def graphql_input(self):
+        """
+        The policy as an AlertsPolicyInput object.
+        """
+        return dict(name=self.name, incidentPreference=enum(self.incident_preference))
+
+    def create_mutation(self):
+        return AlertPolicyTemplates.create_mutation(self)
+
+    def update_mutation(self):
+        return AlertPolicyTemplates.update_mutation(self)
+
+    def delete_mutation(self):
+        return AlertPolicyTemplates.delete_mutation(self)
@@ -1,60 +1,70 @@
 # Ansible search paths are really obscure, especially around text files. So instead we can store these
-# jinja templates as strings in a python file
+# documents in a python file
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import (
+    Field,
+    identifier,
+    mutation,
+)
+
+
 class AlertPolicyTemplates:
     def __init__(self):
         pass
 
     @staticmethod
-    def j2_create():
-        return """mutation {
-            alertsPolicyCreate(
-                accountId: {{ alert_policy.account_id }}
-                policy: { name: "{{ alert_policy.name }}", incidentPreference: {{ alert_policy.incident_preference }} }
-            ) {
-                id
-                name
-                incidentPreference
-            }
-        }"""
+    def create_mutation(alert_policy):
+        return mutation(
+            Field(
+                "alertsPolicyCreate",
+                args=dict(
+                    accountId=int(alert_policy.account_id),
+                    policy=alert_policy.graphql_input(),
+                ),
+                selection=("id", "name", "incidentPreference"),
+            )
+        )
 
     @staticmethod
-    def j2_update():
-        return """mutation {
-            alertsPolicyUpdate(
-                accountId: {{ alert_policy.account_id }}
-                id: {{ alert_policy.id }}
-                policy: { name: "{{ alert_policy.name }}", incidentPreference: {{ alert_policy.incident_preference }} }
-            ) {
-                id
-                name
-                incidentPreference
-            }
-        }"""
+    def update_mutation(alert_policy):
+        return mutation(
+            Field(
+                "alertsPolicyUpdate",
+                args=dict(
+                    accountId=int(alert_policy.account_id),
+                    id=identifier(alert_policy.id),
+                    policy=alert_policy.graphql_input(),
+                ),
+                selection=("id", "name", "incidentPreference"),
+            )
+        )
 
     @staticmethod
-    def j2_delete():
-        return """mutation {
-            alertsPolicyDelete(accountId: {{ alert_policy.account_id }}, id: {{ alert_policy.id }}) {
-                id
-            }
-        }"""
+    def delete_mutation(alert_policy):
+        return mutation(
+            Field(
+                "alertsPolicyDelete",
+                args=dict(
+                    accountId=int(alert_policy.account_id),
+                    id=identifier(alert_policy.id),
+                ),
+                selection=("id",),
+            )
+        )
 
     @staticmethod
-    def j2_get_from_search():
-        return """{
-            actor {
-                account(id: {{ account_id }}) {
-                    alerts {
-                        policiesSearch(searchCriteria: { {{ entity_search_query }} }) {
-                            nextCursor
-                            policies {
-                                id
-                                name
-                                accountId
-                                incidentPreference
-                            }
+    def search_field():
+        """
+        The policiesSearch field for one account. Search documents only substitute plain
+        values, so this is a %-format string. account_id must be an int, and the search
+        criteria and cursor must already be escaped.
+        """
+        return """account(id: %(account_id)s) {
+                alerts {
+                    policiesSearch(searchCriteria: { %(entity_search_query)s }%(cursor)s) {
+                        nextCursor
+                        policies {
+                            %(selection)s
                         }
                     }
                 }
-            }
-        }"""
+            }"""
@@ -0,0 +1,252 @@
+"""
+A circuit breaker for NerdGraph requests, shared by every task on the controller.
+When most recent requests fail because NerdGraph is unreachable or returns server
+errors, the breaker opens and requests fail immediately instead of each task
+retrying against a backend that is down.
+"""
+
+import contextlib
+import logging
+import os
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_COOLDOWN = 30
+# the failure rate is only checked once this many requests were sent in the window,
+# so a couple of failed requests can't open the breaker
+DEFAULT_MIN_REQUESTS = 10
+DEFAULT_WINDOW = 60
+
+
+class NerdGraphCircuitOpenError(Exception):
+    def __init__(self, failures: int, requests: int, retry_in: float, path: str):
+        super().__init__(
+            "NerdGraph appears to be unavailable: %s of the last %s requests failed, so"
+            " requests are not being sent. The next attempt will be made in %s seconds."
+            " Remove %s to reset the circuit breaker."
+            % (failures, requests, max(0, int(retry_in + 0.5)), path)
+        )
+        self.retry_in = retry_in
+
+
+class NoopCircuitBreaker:
+    """
+    Breaker used when no state file is configured. Requests are always sent.
+    """
+
+    enabled = False
+
+    def before_request(self):
+        pass
+
+    def record(self, success: bool):
+        pass
+
+    def state(self):
+        return CLOSED
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker whose state is kept in a JSON file, so the parallel processes
+    Ansible runs tasks in all see the same state. Every read-modify-write happens under
+    an exclusive lock on a sidecar lock file.
+
+    The breaker starts closed, and counts the outcome of each request in one second
+    buckets. Once at least min_requests were sent in the last window seconds and
+    failure_rate of them failed, it opens. Requests fail fast while it is open. After
+    cooldown seconds, the next request is sent as a probe and the breaker is half open;
+    other requests keep failing until the probe closes the breaker or opens it again.
+
+    Successes are only counted once a request in the window failed, so healthy runs
+    never lock or write the file. The failure rate is therefore measured over the
+    requests sent since the first recent failure.
+    """
+
+    FORMAT_VERSION = 1
+    enabled = True
+
+    def __init__(
+        self,
+        path: str,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        cooldown: float = DEFAULT_COOLDOWN,
+        min_requests: int = DEFAULT_MIN_REQUESTS,
+        window: float = DEFAULT_WINDOW,
+    ):
+        self.path = os.path.expanduser(path)
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.min_requests = min_requests
+        self.window = window
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = json_compat.loads(f.read())
+        except FileNotFoundError:
+            return self._closed_state()
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "Ignoring unreadable circuit breaker file %s: %s", self.path, e
+            )
+            return self._closed_state()
+        if data.get("version") != self.FORMAT_VERSION:
+            return self._closed_state()
+        return data
+
+    def _write(self, data: dict):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json_compat.dumps_bytes(dict(data, version=self.FORMAT_VERSION)))
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _closed_state():
+        return dict(state=CLOSED, buckets={})
+
+    def _counts(self, data: dict, now: float):
+        """
+        Returns the number of failures and requests in the window.
+        """
+        failures = requests = 0
+        for second, (successes, failed) in data.get("buckets", {}).items():
+            if now - int(second) < self.window:
+                failures += failed
+                requests += successes + failed
+        return failures, requests
+
+    def _quiet(self, data: dict, now: float):
+        """
+        Returns true if the breaker is closed and no request failed in the window.
+        """
+        return data["state"] == CLOSED and self._counts(data, now)[0] == 0
+
+    def _prune(self, data: dict, now: float):
+        data["buckets"] = {
+            second: counts
+            for second, counts in data.get("buckets", {}).items()
+            if now - int(second) < self.window
+        }
+
+    def state(self):
+        return self._read()["state"]
+
+    def before_request(self):
+        """
+        Raises NerdGraphCircuitOpenError if the breaker is open and a request should
+        not be sent.
+        """
+        # the file is replaced atomically, so the common closed case doesn't need the lock
+        if self._read()["state"] == CLOSED:
+            return
+        now = time.time()
+        with self._locked():
+            data = self._read()
+            if data["state"] == CLOSED:
+                return
+            retry_in = data["opened_at"] + self.cooldown - now
+            if data["state"] == HALF_OPEN:
+                # a probe that never reported back (the task was killed) is replaced
+                # after another cooldown
+                retry_in = data["probe_started_at"] + self.cooldown - now
+            if retry_in > 0:
+                raise NerdGraphCircuitOpenError(
+                    data["failures"], data["requests"], retry_in, self.path
+                )
+            logger.warning("Sending a probe request to check if NerdGraph recovered")
+            data.update(state=HALF_OPEN, probe_started_at=now)
+            self._write(data)
+
+    def record(self, success: bool):
+        """
+        Records the outcome of a request that was sent.
+        """
+        now = time.time()
+        if success and self._quiet(self._read(), now):
+            return
+        with self._locked():
+            data = self._read()
+            if success and self._quiet(data, now):
+                return
+            if data["state"] == HALF_OPEN:
+                if success:
+                    logger.warning("NerdGraph recovered, closing the circuit breaker")
+                    data = self._closed_state()
+                else:
+                    data.update(state=OPEN, opened_at=now)
+                self._write(data)
+                return
+            if data["state"] == OPEN:
+                # a request sent before the breaker opened doesn't change its state
+                return
+
+            self._prune(data, now)
+            counts = data["buckets"].setdefault(str(int(now)), [0, 0])
+            counts[0 if success else 1] += 1
+            failures, requests = self._counts(data, now)
+            if (
+                not success
+                and requests >= self.min_requests
+                and failures >= self.failure_rate * requests
+            ):
+                logger.warning(
+                    "%s of the last %s NerdGraph requests failed, opening the circuit"
+                    " breaker for %s seconds",
+                    failures,
+                    requests,
+                    self.cooldown,
+                )
+                data.update(
+                    state=OPEN, opened_at=now, failures=failures, requests=requests
+                )
+            self._write(data)
+
+
+_breaker = NoopCircuitBreaker()
+
+
+def get_circuit_breaker():
+    return _breaker
+
+
+def set_circuit_breaker(breaker):
+    global _breaker
+    _breaker = breaker
+    return _breaker
+
+
+def configure_circuit_breaker(
+    path: str = None,
+    failure_rate: float = DEFAULT_FAILURE_RATE,
+    cooldown: float = DEFAULT_COOLDOWN,
+):
+    if path:
+        return set_circuit_breaker(CircuitBreaker(path, failure_rate, cooldown))
+    return set_circuit_breaker(NoopCircuitBreaker())
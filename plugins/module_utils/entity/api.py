@@ -1,5 +1,7 @@
 import logging
+import re
 
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import string
 from ansible_collections.newrelic.core.plugins.module_utils.entity.query_templates import (
     EntityQueryTemplates,
 )
@@ -7,12 +9,47 @@ from ansible_collections.newrelic.core.plugins.module_utils.entity.objects impor
     Entity,
 )
 from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    DEFAULT_REQUEST_TIMEOUT,
     NerdGraphApiBase,
+    actor_document,
+    cursor_argument,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.lazy_log import (
+    minified,
 )
 
 
 logger = logging.getLogger(__name__)
 
+_ALIAS_INDEX_RE = re.compile(r"(\d+)$")
+_SEARCH_FIELD = EntityQueryTemplates.search_field()
+_TAGS_SEARCH_FIELD = EntityQueryTemplates.tags_search_field()
+
+# entitySearch queries get slow and can hit the query length limit with very long
+# IN clauses, so GUID lookups are split into batches
+GUID_BATCH_SIZE = 25
+
+
+def guid_search_queries(guids: list, batch_size: int = GUID_BATCH_SIZE):
+    """
+    Returns entitySearch queries that match the GUIDs, batch_size GUIDs per query.
+    Duplicate GUIDs are only looked up once.
+    """
+    guids = list(dict.fromkeys(guids))
+    return [
+        "id IN (%s)"
+        % ", ".join(search_literal(guid) for guid in guids[i : i + batch_size])
+        for i in range(0, len(guids), batch_size)
+    ]
+
+
+def search_literal(value: str):
+    """
+    Returns a quoted string for an entitySearch query, like 'value'. Quotes and
+    backslashes in the value are escaped with a backslash.
+    """
+    return "'%s'" % str(value).replace("\\", "\\\\").replace("'", "\\'")
+
 
 class EntityApi(NerdGraphApiBase):
     def __init__(
@@ -20,21 +57,29 @@ class EntityApi(NerdGraphApiBase):
         api_key: str,
         wait_for_propegation: bool = True,
         propegation_timeout: int = 10,
+        compress_requests: bool = False,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
     ):
         super().__init__(
             api_key=api_key,
             wait_for_propegation=wait_for_propegation,
             propegation_timeout=propegation_timeout,
+            compress_requests=compress_requests,
+            request_timeout=request_timeout,
         )
 
     def get_entity_by_guid(self, guid):
         logger.info("Looking up entity with guid %s", guid)
-        query_template = self.jinja_env.from_string(
-            EntityQueryTemplates.j2_get_from_search()
+        query = actor_document(
+            [
+                _SEARCH_FIELD
+                % dict(
+                    entity_search_query=string("id = %s" % search_literal(guid)),
+                    cursor="",
+                )
+            ]
         )
-        entity_search_query = "id = '%s'" % guid
-        query = query_template.render(entity_search_query=entity_search_query)
-        logger.debug("query=%s", "".join(query.split()))
+        logger.debug("query=%s", minified(query))
         r = self.run_query(query=query)
         if r["data"]["actor"]["entitySearch"]["count"] != 1:
             raise Exception("Could not find entity with guid %s" % guid)
@@ -42,3 +87,94 @@ class EntityApi(NerdGraphApiBase):
         return Entity.from_api_data(
             r["data"]["actor"]["entitySearch"]["results"]["entities"][0]
         )
+
+    def get_entities_from_query(
+        self,
+        entity_search_query: str,
+        account_id: str = None,
+        cursor: str = "",
+        tags_only: bool = False,
+    ):
+        """
+        Returns one page of entities matching the search, and the cursor for the
+        next page. If tags_only is true, only the tags and identifying fields of each
+        entity are fetched.
+        """
+        logger.info("Getting entities from search '%s'", entity_search_query)
+        field = _TAGS_SEARCH_FIELD if tags_only else _SEARCH_FIELD
+        query = actor_document(
+            [
+                field
+                % dict(
+                    entity_search_query=string(entity_search_query),
+                    cursor=cursor_argument(cursor, " (cursor: %s)"),
+                )
+            ]
+        )
+        logger.debug("query=%s", minified(query))
+        with self.trace_page("entitySearch", account_id, cursor) as span:
+            r = self.run_query(query=query)
+            try:
+                results = r["data"]["actor"]["entitySearch"]["results"]
+                query_entities = results["entities"]
+                next_cursor = results["nextCursor"]
+            except (KeyError, TypeError) as e:
+                logger.fatal("Encountered key error on '%s'", e)
+                logger.fatal("response=%s", r)
+                raise Exception("Query response did not match excepted format")
+            span.set_attribute("results", len(query_entities))
+
+        logger.info(
+            "Found %s entities. Next cursor is %s", len(query_entities), next_cursor
+        )
+        return [Entity.from_api_data(data) for data in query_entities], next_cursor
+
+    def iter_entities_from_query(
+        self, entity_search_query: str, account_id=None, tags_only: bool = False
+    ):
+        """
+        Yields every entity matching the search, following the result cursor.
+        """
+        cursor = ""
+        while True:
+            entities, cursor = self.get_entities_from_query(
+                entity_search_query,
+                account_id=account_id,
+                cursor=cursor,
+                tags_only=tags_only,
+            )
+            yield from entities
+            if not cursor:
+                return
+
+    def iter_entities_by_guids(
+        self, guids: list, batch_size: int = GUID_BATCH_SIZE, tags_only: bool = False
+    ):
+        """
+        Yields the entities for a list of GUIDs, looking them up batch_size at a time.
+        GUIDs that don't exist are skipped.
+        """
+        for entity_search_query in guid_search_queries(guids, batch_size):
+            yield from self.iter_entities_from_query(
+                entity_search_query, tags_only=tags_only
+            )
+
+    def apply_tag_diffs(self, diffs: list, batch_size: int = 25):
+        """
+        Applies TagDiffs for many entities using aliased mutations, batch_size entities
+        per request.
+        """
+        diffs = [diff for diff in diffs if diff]
+        for i in range(0, len(diffs), batch_size):
+            batch = diffs[i : i + batch_size]
+            logger.info("Applying tag changes to %s entities", len(batch))
+            query = EntityQueryTemplates.batch_tag_changes(batch)
+            logger.debug("query=%s", minified(query))
+            r = self.run_query(query=query)
+            errors = {}
+            for alias, field in (r.get("data") or {}).items():
+                if field and field.get("errors"):
+                    guid = batch[int(_ALIAS_INDEX_RE.search(alias).group(1))].guid
+                    errors.setdefault(guid, []).extend(field["errors"])
+            if errors:
+                raise Exception("Failed to apply tag changes: %s" % errors)
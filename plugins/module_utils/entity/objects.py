@@ -1,6 +1,7 @@
 import logging
 
 from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    FingerprintedChild,
     NrObjectBase,
 )
 
@@ -9,9 +10,11 @@ logger = logging.getLogger(__name__)
 
 
 class Tag:
+    __slots__ = ("name", "values")
+
     def __init__(self, name: str, values: list):
         self.name = name
-        if not isinstance(values, list):
+        if not isinstance(values, (list, set, frozenset, tuple)):
             values = [values]
         self.values = {str(v) for v in values}
 
@@ -25,7 +28,9 @@ class Tag:
         return str({self.name: self.values})
 
 
-class EntityTags:
+class EntityTags(FingerprintedChild):
+    __slots__ = ("tags",)
+
     def __init__(self, tag_data: dict = None):
         self.tags = dict()
         if not tag_data:
@@ -63,10 +68,31 @@ class EntityTags:
     def to_json(self):
         return {tag.name: list(tag.values) for tag in self.tags.values()}
 
+    def graphql_input(self):
+        """
+        The tags as a list of TaggingTagInput objects, for adding tags. Tags are
+        sorted by key so the same tags always give the same document.
+        """
+        return [
+            dict(key=key, values=self.tags[key].values) for key in sorted(self.tags)
+        ]
+
+    def graphql_value_input(self):
+        """
+        Every tag value as a list of TaggingTagValueInput objects, for removing
+        specific values.
+        """
+        return [
+            dict(key=key, value=tag_value)
+            for key in sorted(self.tags)
+            for tag_value in sorted(self.tags[key].values)
+        ]
+
     def remove_key(self, key: str):
         if key in self.tags:
             removed = self.tags[key]
             del self.tags[key]
+            self._changed()
             return removed
 
     def remove_values(self, tag):
@@ -79,11 +105,13 @@ class EntityTags:
         overlap = new_tag.values.intersection(tag.values)
         new_tag.values = new_tag.values - tag.values
         self.tags[tag.name] = new_tag
+        self._changed()
         return Tag(name=new_tag.name, values=list(overlap))
 
     def add_tag(self, tag):
         if tag.name not in self.tags:
             self.tags[tag.name] = tag
+            self._changed()
             return tag
         new_tag = self.tags[tag.name]
         logger.debug("Add tag %s to tag %s", tag, new_tag)
@@ -93,26 +121,34 @@ class EntityTags:
         missing = tag.values - new_tag.values
         new_tag.values = new_tag.values.union(tag.values)
         self.tags[tag.name] = new_tag
+        self._changed()
         return Tag(name=tag.name, values=list(missing))
 
     def replace_tag(self, tag):
         if tag.name not in self.tags:
             self.tags[tag.name] = tag
+            self._changed()
             return tag
 
         if self.tags[tag.name] == tag:
             return
 
         self.tags[tag.name] = tag
+        self._changed()
         return tag
 
 
 class Entity(NrObjectBase):
+    __slots__ = ("guid", "tags", "type", "entity_type")
+    _equality_attrs = NrObjectBase._equality_attrs + ("tags",)
+    _unordered_attrs = frozenset(["tags"])
+
     def __init__(self, name: str, account_id: str, guid: str = None):
         super().__init__(name=name, account_id=account_id)
         self.guid = guid
         self.tags = dict()
-        self._equality_attrs.update(["tags"])
+        self.type = None
+        self.entity_type = None
 
     @classmethod
     def from_api_data(cls, data):
@@ -123,5 +159,6 @@ class Entity(NrObjectBase):
         )
         obj.tags = EntityTags(tag_data={t["key"]: t["values"] for t in data["tags"]})
         obj.type = data["type"]
+        obj.entity_type = data.get("entityType")
 
         return obj
@@ -1,80 +1,129 @@
 # Ansible search paths are really obscure, especially around text files. So instead we can store these
-# jinja templates as strings in a python file
+# documents in a python file
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import (
+    ERRORS_SELECTION,
+    Field,
+    mutation,
+)
+
+
 class EntityQueryTemplates:
     def __init__(self):
         pass
 
     @staticmethod
-    def j2_get_from_search():
-        return """{
-            actor {
-                entitySearch(query: "{{ entity_search_query }}") {
-                    count
-                    results {
-                        entities {
-                            tags {
-                                key
-                                values
-                            }
-                            accountId
-                            guid
-                            name
-                            entityType
-                            type
+    def search_field():
+        """
+        The entitySearch field. Search documents only substitute plain values, so this
+        is a %-format string.
+        """
+        return """entitySearch(query: %(entity_search_query)s) {
+                count
+                results%(cursor)s {
+                    nextCursor
+                    entities {
+                        tags {
+                            key
+                            values
                         }
+                        accountId
+                        guid
+                        name
+                        entityType
+                        type
                     }
                 }
-            }
-        }"""
+            }"""
 
     @staticmethod
-    def j2_add_or_update_tags():
+    def tags_search_field():
         """
-        NOTE: This does not replace all of the tags. It will add tags, or update the values if the tags exist.
+        The entitySearch field with only the fields needed to index entity tags.
         """
-        return """
-            mutation {
-                taggingAddTagsToEntity(guid: "{{ guid }}", tags: [
-                    {%- for tag in tags %}
-                        {key: "{{ tag.name }}", values: {{ tag.values | list | tojson }}}
-                    {% endfor -%}
-                ]) {
-                    errors {
-                        message
+        return """entitySearch(query: %(entity_search_query)s) {
+                results%(cursor)s {
+                    nextCursor
+                    entities {
+                        tags {
+                            key
+                            values
+                        }
+                        accountId
+                        guid
+                        name
                         type
                     }
                 }
-            }
-        """
+            }"""
 
     @staticmethod
-    def j2_remove_tags_by_keys():
-        return """
-            mutation {
-                taggingDeleteTagFromEntity(guid: "{{ guid }}", tagKeys: {{ tag_names | tojson }}) {
-                    errors {
-                        message
-                        type
-                    }
-                }
-            }
+    def add_tags_field(guid: str, tags, alias: str = None):
         """
+        NOTE: This does not replace all of the tags. It will add tags, or update the values if the tags exist.
+        """
+        return Field(
+            "taggingAddTagsToEntity",
+            args=dict(guid=guid, tags=tags.graphql_input()),
+            selection=ERRORS_SELECTION,
+            alias=alias,
+        )
 
     @staticmethod
-    def j2_remove_tag_values():
-        return """
-            mutation {
-                taggingDeleteTagValuesFromEntity(guid: "{{ guid }}", tagValues: [
-                    {%- for tag in tags %}
-                    {%- for tag_value in tag.values %}
-                        {key: "{{ tag.name }}", value: "{{ tag_value }}"}
-                    {% endfor -%}
-                    {% endfor -%}
-                ]) {
-                    errors {
-                        message
-                        type
-                    }
-                }
-            }
+    def remove_tags_by_keys_field(guid: str, tag_names: list, alias: str = None):
+        return Field(
+            "taggingDeleteTagFromEntity",
+            args=dict(guid=guid, tagKeys=list(tag_names)),
+            selection=ERRORS_SELECTION,
+            alias=alias,
+        )
+
+    @staticmethod
+    def remove_tag_values_field(guid: str, tags, alias: str = None):
+        return Field(
+            "taggingDeleteTagValuesFromEntity",
+            args=dict(guid=guid, tagValues=tags.graphql_value_input()),
+            selection=ERRORS_SELECTION,
+            alias=alias,
+        )
+
+    @staticmethod
+    def add_or_update_tags(guid: str, tags):
+        return mutation(EntityQueryTemplates.add_tags_field(guid, tags))
+
+    @staticmethod
+    def remove_tags_by_keys(guid: str, tag_names: list):
+        return mutation(EntityQueryTemplates.remove_tags_by_keys_field(guid, tag_names))
+
+    @staticmethod
+    def remove_tag_values(guid: str, tags):
+        return mutation(EntityQueryTemplates.remove_tag_values_field(guid, tags))
+
+    @staticmethod
+    def batch_tag_changes(diffs: list):
+        """
+        Applies the changes from several TagDiffs in one document. Mutation fields are
+        executed in order, so keys are removed before tags are added back. The fields
+        for diffs[i] are aliased removeKeys{i}, removeValues{i}, and addTags{i}.
         """
+        fields = []
+        for i, diff in enumerate(diffs):
+            if diff.removed_key_names:
+                fields.append(
+                    EntityQueryTemplates.remove_tags_by_keys_field(
+                        diff.guid, diff.removed_key_names, alias="removeKeys%s" % i
+                    )
+                )
+            if len(diff.value_removals) > 0:
+                fields.append(
+                    EntityQueryTemplates.remove_tag_values_field(
+                        diff.guid, diff.value_removals, alias="removeValues%s" % i
+                    )
+                )
+            tags_to_add = diff.tags_to_add
+            if len(tags_to_add) > 0:
+                fields.append(
+                    EntityQueryTemplates.add_tags_field(
+                        diff.guid, tags_to_add, alias="addTags%s" % i
+                    )
+                )
+        return mutation(*fields)
@@ -0,0 +1,174 @@
+"""
+Applies the entity_tags changes requested by many hosts at once. The entities are
+read with batched GUID searches, and the changes are sent as aliased mutations, so a
+play batch of hosts needs a few requests instead of several per host.
+"""
+
+import logging
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_diff import (
+    diff_entity_tags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    backoff_delays,
+    entity_tags_marker,
+    verify_entity_tags_markers,
+)
+
+
+logger = logging.getLogger(__name__)
+
+TAG_REQUEST_DEFAULTS = dict(state="present", append=True)
+
+
+class TagRequest:
+    """
+    The entity_tags arguments for one host.
+    """
+
+    __slots__ = ("host", "guid", "tags", "state", "append")
+
+    def __init__(
+        self,
+        host: str,
+        guid: str,
+        tags: dict,
+        state: str = "present",
+        append: bool = True,
+    ):
+        if state not in ("present", "absent"):
+            raise ValueError("state must be present or absent, not %s" % state)
+        self.host = host
+        self.guid = guid
+        self.tags = EntityTags(tags)
+        self.state = state
+        self.append = append
+
+    @classmethod
+    def from_params(cls, host: str, params: dict):
+        if not isinstance(params, dict):
+            raise ValueError("Expected a dict of entity_tags options")
+        unknown = sorted(set(params).difference(("guid", "tags", "state", "append")))
+        if unknown:
+            raise ValueError("Unknown entity_tags options %s" % unknown)
+        if not params.get("guid") or params.get("tags") is None:
+            raise ValueError("guid and tags are required")
+        return cls(host=host, **dict(TAG_REQUEST_DEFAULTS, **params))
+
+
+class TagBatch:
+    """
+    Computes and applies the tag changes for a list of TagRequests. Each host gets a
+    result like the entity_tags module's. Hosts that can't be processed get a failed
+    result, without stopping the other hosts.
+    """
+
+    def __init__(self, api, requests: list, batch_size: int = 25):
+        self.api = api
+        self.requests = requests
+        self.batch_size = batch_size
+        self.results = dict()
+        self.diffs = dict()
+        self.entities = dict()
+
+    def _fail(self, host: str, msg: str):
+        self.results[host] = dict(changed=False, failed=True, msg=msg)
+
+    def plan(self):
+        """
+        Reads the entities and computes the tag diff for each host. Returns the
+        results by host, which are final for hosts that need no changes.
+        """
+        owners = dict()
+        valid = []
+        for request in self.requests:
+            if request.guid in owners:
+                self._fail(
+                    request.host,
+                    "Entity %s is already managed by host %s in this batch"
+                    % (request.guid, owners[request.guid]),
+                )
+                continue
+            owners[request.guid] = request.host
+            valid.append(request)
+
+        self.entities = {
+            entity.guid: entity
+            for entity in self.api.iter_entities_by_guids(
+                [r.guid for r in valid], self.batch_size, tags_only=True
+            )
+        }
+        for request in valid:
+            entity = self.entities.get(request.guid)
+            if entity is None:
+                self._fail(
+                    request.host, "Could not find entity with guid %s" % request.guid
+                )
+                continue
+            diff = diff_entity_tags(
+                entity.tags,
+                request.tags,
+                state=request.state,
+                append=request.append,
+                guid=entity.guid,
+            )
+            result = dict(
+                changed=bool(diff),
+                name=entity.name,
+                guid=entity.guid,
+                changed_tags=diff.to_json(),
+            )
+            if diff:
+                self.diffs[request.host] = diff
+                result["diff"] = dict(
+                    before=entity.tags.to_json(),
+                    after=diff.apply_to(entity.tags).to_json(),
+                )
+            self.results[request.host] = result
+        logger.info(
+            "%s of %s hosts need tag changes", len(self.diffs), len(self.requests)
+        )
+        return self.results
+
+    def markers(self):
+        requests = {r.host: r for r in self.requests}
+        return {
+            host: entity_tags_marker(
+                self.entities[diff.guid],
+                diff.changed_tags(),
+                state=requests[host].state,
+            )
+            for host, diff in self.diffs.items()
+        }
+
+    def apply(self):
+        """
+        Applies the planned diffs with batched aliased mutations, and returns the
+        propagation marker for each changed host.
+        """
+        if self.diffs:
+            self.api.apply_tag_diffs(list(self.diffs.values()), self.batch_size)
+        return self.markers()
+
+    def wait(self, markers: dict, timeout: float, initial_delay: float = 1):
+        """
+        Waits until every change is visible in the API, checking all of the entities
+        with one batched search per attempt.
+        """
+        pending = list(markers.values())
+        delays = backoff_delays(
+            initial=initial_delay, maximum=15, factor=2, timeout=timeout
+        )
+        while pending:
+            delay = next(delays, None)
+            if delay is None:
+                raise Exception(
+                    "Timedout waiting for new tags to be shown in New Relic API"
+                )
+            time.sleep(delay)
+            verified = verify_entity_tags_markers(self.api, pending)
+            pending = [m for m in pending if m not in verified]
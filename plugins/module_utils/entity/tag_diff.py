@@ -0,0 +1,151 @@
+import logging
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    EntityTags,
+    Tag,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class TagDiff:
+    """
+    The tag changes needed to bring an entity to a desired state.
+      adds - values that should be added to a key, keeping any existing values
+      replacements - keys whose values should be replaced entirely
+      key_removals - keys that should be removed, with the values they currently have
+      value_removals - specific values that should be removed from a key
+    """
+
+    __slots__ = ("guid", "adds", "replacements", "key_removals", "value_removals")
+
+    def __init__(self, guid: str = None):
+        self.guid = guid
+        self.adds = EntityTags()
+        self.replacements = EntityTags()
+        self.key_removals = EntityTags()
+        self.value_removals = EntityTags()
+
+    def __bool__(self):
+        return bool(
+            self.adds.tags
+            or self.replacements.tags
+            or self.key_removals.tags
+            or self.value_removals.tags
+        )
+
+    def __repr__(self):
+        return "TagDiff(%s)" % self.to_json()
+
+    @property
+    def removed_key_names(self):
+        """
+        Keys that need to be deleted before tags are added. Replaced keys are
+        deleted and then added again with their new values.
+        """
+        return sorted(set(self.key_removals.tags) | set(self.replacements.tags))
+
+    @property
+    def tags_to_add(self):
+        return self.adds.merge(self.replacements)
+
+    def apply_to(self, tags: EntityTags):
+        """
+        Returns new EntityTags with this diff applied to the given tags.
+        """
+        values_by_key = {key: set(tag.values) for key, tag in tags.tags.items()}
+        for key in self.removed_key_names:
+            values_by_key.pop(key, None)
+        for tag in self.value_removals:
+            if tag.name in values_by_key:
+                values_by_key[tag.name] -= tag.values
+        for tag in self.adds:
+            values_by_key[tag.name] = values_by_key.get(tag.name, set()) | tag.values
+        for tag in self.replacements:
+            values_by_key[tag.name] = set(tag.values)
+        return EntityTags(values_by_key)
+
+    def changed_tags(self):
+        return self.adds.merge(self.replacements).merge(
+            self.key_removals.merge(self.value_removals)
+        )
+
+    def to_json(self):
+        return self.changed_tags().to_json()
+
+
+def _tag(name, values):
+    return Tag(name=name, values=values)
+
+
+def diff_entity_tags(
+    current: EntityTags,
+    desired: EntityTags,
+    state: str = "present",
+    append: bool = True,
+    guid: str = None,
+):
+    """
+    Computes the changes between an entity's current tags and the desired tags
+    without modifying either.
+    If state is present and append is true, missing values are added to each key.
+    If append is false, keys whose values differ are replaced.
+    If state is absent, keys with no desired values are removed entirely and keys with
+    values have those values removed. A key is only changed if the entity has all of
+    the values given for it.
+    """
+    diff = TagDiff(guid=guid)
+    current_tags = current.tags
+    desired_tags = desired.tags
+    shared_keys = desired_tags.keys() & current_tags.keys()
+
+    if state == "absent":
+        for key in shared_keys:
+            values = desired_tags[key].values
+            existing = current_tags[key].values
+            if not values <= existing:
+                continue
+            if values:
+                diff.value_removals.tags[key] = _tag(key, values)
+            else:
+                diff.key_removals.tags[key] = _tag(key, existing)
+        return diff
+
+    changes = diff.adds.tags if append else diff.replacements.tags
+    for key in desired_tags.keys() - current_tags.keys():
+        changes[key] = _tag(key, desired_tags[key].values)
+
+    for key in shared_keys:
+        values = desired_tags[key].values
+        existing = current_tags[key].values
+        if append:
+            missing = values - existing
+            if missing:
+                changes[key] = _tag(key, missing)
+        elif values != existing:
+            changes[key] = _tag(key, values)
+
+    return diff
+
+
+def diff_many_entity_tags(
+    entities, desired_by_guid: dict, state="present", append=True
+):
+    """
+    Computes tag diffs for many entities at once. entities is an iterable of Entity
+    objects and desired_by_guid maps each entity GUID to its desired EntityTags.
+    Returns a dict of GUID to TagDiff, only including entities that need changes.
+    """
+    diffs = {}
+    for entity in entities:
+        desired = desired_by_guid.get(entity.guid)
+        if desired is None:
+            continue
+        diff = diff_entity_tags(
+            entity.tags, desired, state=state, append=append, guid=entity.guid
+        )
+        if diff:
+            diffs[entity.guid] = diff
+    logger.info("%s of %s entities need tag changes", len(diffs), len(desired_by_guid))
+    return diffs
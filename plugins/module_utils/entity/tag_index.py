@@ -0,0 +1,218 @@
+import logging
+import os
+import tempfile
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+
+
+logger = logging.getLogger(__name__)
+
+
+class TagIndex:
+    """
+    An inverted index of entity tags for one account. The index maps each tag key to
+    its values, and each value to the set of entity GUIDs that have it, so lookups
+    don't need to touch every entity.
+
+    The tags of each entity are kept alongside the index so that single entities can
+    be refreshed without rebuilding everything.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, account_id: str):
+        self.account_id = str(account_id)
+        self.updated_at = None
+        # guid -> {"name": str, "type": str, "tags": {key: [values]}}
+        self.entities = dict()
+        # key -> value -> set of guids
+        self.index = dict()
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add_entity(self, entity):
+        """
+        Adds an Entity to the index, replacing anything previously indexed for its GUID.
+        """
+        self.remove_entity(entity.guid)
+        tags = {tag.name: sorted(tag.values) for tag in entity.tags}
+        self.entities[entity.guid] = {
+            "name": entity.name,
+            "type": entity.type,
+            "tags": tags,
+        }
+        for key, values in tags.items():
+            postings = self.index.setdefault(key, dict())
+            for value in values:
+                postings.setdefault(value, set()).add(entity.guid)
+
+    def remove_entity(self, guid: str):
+        entity = self.entities.pop(guid, None)
+        if entity is None:
+            return
+        for key, values in entity["tags"].items():
+            postings = self.index.get(key, {})
+            for value in values:
+                guids = postings.get(value)
+                if guids is None:
+                    continue
+                guids.discard(guid)
+                if not guids:
+                    del postings[value]
+            if not postings:
+                self.index.pop(key, None)
+
+    def guids_with_tag(self, key: str, values=None):
+        """
+        Returns the GUIDs of entities that have the tag key. If values are given, the
+        entity must have at least one of them.
+        """
+        postings = self.index.get(key)
+        if not postings:
+            return set()
+        if values is None:
+            values = postings.keys()
+        elif not isinstance(values, (list, set, frozenset, tuple)):
+            values = [values]
+
+        guids = set()
+        for value in values:
+            guids.update(postings.get(str(value), ()))
+        return guids
+
+    def guids_missing_tag(self, key: str):
+        return set(self.entities).difference(self.guids_with_tag(key))
+
+    def search(self, tags: dict = None, missing_tags: list = None):
+        """
+        Returns the sorted GUIDs of entities that match every tag in tags and have none
+        of the keys in missing_tags. A tag with no values matches any value.
+        """
+        guids = set(self.entities)
+        for key, values in (tags or {}).items():
+            if values in (None, []):
+                values = None
+            guids.intersection_update(self.guids_with_tag(key, values))
+            if not guids:
+                return []
+        for key in missing_tags or []:
+            guids.difference_update(self.guids_with_tag(key))
+        return sorted(guids)
+
+    def entity_json(self, guid: str):
+        entity = self.entities[guid]
+        return {
+            "guid": guid,
+            "name": entity["name"],
+            "type": entity["type"],
+            "account_id": self.account_id,
+            "tags": entity["tags"],
+        }
+
+    def age(self):
+        if self.updated_at is None:
+            return None
+        return time.time() - self.updated_at
+
+    def is_stale(self, max_age: int):
+        age = self.age()
+        return age is None or age > max_age
+
+    def build(self, api):
+        """
+        Replaces the index with every entity in the account, using a paginated search.
+        """
+        started = time.time()
+        self.entities = dict()
+        self.index = dict()
+        for entity in api.iter_entities_from_query(
+            "accountId = %s" % int(self.account_id),
+            account_id=self.account_id,
+            tags_only=True,
+        ):
+            self.add_entity(entity)
+        self.updated_at = started
+        logger.info(
+            "Indexed tags for %s entities in account %s", len(self), self.account_id
+        )
+
+    def refresh_entities(self, api, guids: list):
+        """
+        Re-reads the tags of specific entities, for example after they were changed
+        by another task. GUIDs that no longer exist are removed from the index.
+        """
+        found = set()
+        for entity in api.iter_entities_by_guids(guids, tags_only=True):
+            if str(entity.account_id) != self.account_id:
+                continue
+            self.add_entity(entity)
+            found.add(entity.guid)
+        for guid in set(guids) - found:
+            self.remove_entity(guid)
+        logger.info("Refreshed tags for %s entities", len(set(guids)))
+
+    def to_json(self):
+        return {
+            "version": self.FORMAT_VERSION,
+            "account_id": self.account_id,
+            "updated_at": self.updated_at,
+            "entities": self.entities,
+            "index": {
+                key: {value: sorted(guids) for value, guids in postings.items()}
+                for key, postings in self.index.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict):
+        obj = cls(account_id=data["account_id"])
+        obj.updated_at = data.get("updated_at")
+        obj.entities = data.get("entities", {})
+        obj.index = {
+            key: {value: set(guids) for value, guids in postings.items()}
+            for key, postings in data.get("index", {}).items()
+        }
+        return obj
+
+    def save(self, path: str):
+        """
+        Writes the index to a file. The file is replaced atomically so a concurrent
+        reader never sees a partial index.
+        """
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tag_index.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json_compat.dumps_bytes(self.to_json()))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, account_id: str):
+        """
+        Reads an index from a file. Returns an empty index if the file does not exist,
+        can't be read, or was built for a different account.
+        """
+        path = os.path.expanduser(path)
+        try:
+            with open(path, "rb") as f:
+                data = json_compat.loads(f.read())
+        except FileNotFoundError:
+            return cls(account_id=account_id)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable tag index %s: %s", path, e)
+            return cls(account_id=account_id)
+
+        if data.get("version") != cls.FORMAT_VERSION or str(
+            data.get("account_id")
+        ) != str(account_id):
+            logger.info("Tag index %s does not match this account, rebuilding", path)
+            return cls(account_id=account_id)
+        return cls.from_json(data)
@@ -0,0 +1,130 @@
+"""
+Runs the same search against many accounts. Accounts are queried several at a time
+in one document, using aliased account(id:) fields, and the documents are sent from a
+small pool of worker threads that share a request rate limit per API key.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+# NerdGraph limits the cost of a single query, so only this many accounts are
+# searched in one document
+ACCOUNTS_PER_QUERY = 10
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+
+
+def fan_out_argument_spec():
+    return dict(
+        account_ids=dict(type="list", elements="str", required=False),
+        max_workers=dict(type="int", required=False, default=DEFAULT_MAX_WORKERS),
+        requests_per_second=dict(
+            type="float", required=False, default=DEFAULT_REQUESTS_PER_SECOND
+        ),
+    )
+
+
+class RateLimiter:
+    """
+    Spaces out requests so no more than rate are started each second. Limiters are
+    shared by API key, since New Relic counts requests against the key's user.
+    """
+
+    _limiters = dict()
+    _limiters_lock = threading.Lock()
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @classmethod
+    def for_key(cls, api_key: str, rate: float):
+        """
+        Returns the limiter for an API key, creating it if needed. If a limiter
+        already exists for the key, its rate is updated.
+        """
+        with cls._limiters_lock:
+            limiter = cls._limiters.get(api_key)
+            if limiter is None:
+                limiter = cls._limiters[api_key] = cls(rate)
+            else:
+                limiter.interval = 1.0 / rate if rate else 0.0
+            return limiter
+
+    def acquire(self):
+        """
+        Blocks until another request can be started.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def account_cursor_chunks(cursors: dict, size: int = ACCOUNTS_PER_QUERY):
+    """
+    Splits a dict of account ID to cursor into dicts of at most size accounts.
+    """
+    items = list(cursors.items())
+    return [dict(items[i : i + size]) for i in range(0, len(items), size)]
+
+
+def search_accounts_from_params(fetch_page, params: dict):
+    """
+    Runs search_accounts with the account_ids, max_workers, and requests_per_second
+    module parameters.
+    """
+    return search_accounts(
+        fetch_page,
+        params["account_ids"],
+        max_workers=params["max_workers"],
+        rate_limiter=RateLimiter.for_key(
+            params["api_key"], params["requests_per_second"]
+        ),
+    )
+
+
+def search_accounts(
+    fetch_page,
+    account_ids: list,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    rate_limiter: RateLimiter = None,
+    accounts_per_query: int = ACCOUNTS_PER_QUERY,
+):
+    """
+    Returns a dict of account ID to every result of a search in that account.
+
+    fetch_page is called with a dict of account ID to cursor (empty for the first
+    page), and returns a dict of account ID to (results, next cursor). Accounts
+    with more pages are searched again together until none have a next cursor.
+    """
+    account_ids = list(dict.fromkeys(str(a) for a in account_ids))
+    results = {account_id: [] for account_id in account_ids}
+    pending = {account_id: "" for account_id in account_ids}
+
+    def _fetch(cursors):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return fetch_page(cursors)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending:
+            chunks = account_cursor_chunks(pending, accounts_per_query)
+            logger.info(
+                "Searching %s accounts in %s queries", len(pending), len(chunks)
+            )
+            pending = dict()
+            for pages in pool.map(_fetch, chunks):
+                for account_id, (found, cursor) in pages.items():
+                    results[account_id] += found
+                    if cursor:
+                        pending[account_id] = cursor
+    return results
@@ -0,0 +1,211 @@
+"""
+A small builder for GraphQL documents. Argument values are serialized from python
+values, so documents are built without a template engine and every string is escaped.
+
+    mutation(
+        Field(
+            "alertsPolicyCreate",
+            args=dict(accountId=1, policy=dict(name="foo", incidentPreference=Enum("PER_POLICY"))),
+            selection=["id", "name"],
+        )
+    )
+"""
+
+import json
+import math
+import re
+
+
+_NAME_RE = re.compile(r"[_A-Za-z][_0-9A-Za-z]*\Z")
+_SURROGATE_RE = re.compile("[\ud800-\udfff]")
+# Enum values can't be written as any of these, since they are other literals
+_RESERVED_ENUM_VALUES = frozenset(("true", "false", "null"))
+# the C string encoder json.dumps uses, without its per-call setup
+_dump_string = json.encoder.encode_basestring
+
+_valid_names = set()
+_enums = dict()
+
+ERRORS_SELECTION = ("errors { message type }",)
+
+
+def name(value: str):
+    """
+    Returns value if it is a valid GraphQL name, for field names, aliases, and input
+    object keys.
+    """
+    if value in _valid_names:
+        return value
+    if not isinstance(value, str) or not _NAME_RE.match(value):
+        raise ValueError("%r is not a valid GraphQL name" % (value,))
+    # documents reuse the same few names, so valid ones are only matched once
+    _valid_names.add(value)
+    return value
+
+
+class Enum(str):
+    """
+    A string that is written as a bare enum value instead of a quoted string.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, value):
+        value = str(value)
+        if not _NAME_RE.match(value) or value in _RESERVED_ENUM_VALUES:
+            raise ValueError("%r is not a valid GraphQL enum value" % value)
+        return super().__new__(cls, value)
+
+
+def enum(val):
+    """
+    Returns val as an Enum, or None (null) if it is not set.
+    """
+    if val is None:
+        return None
+    try:
+        return _enums[val]
+    except KeyError:
+        return _enums.setdefault(val, Enum(val))
+
+
+def identifier(val):
+    """
+    Returns an ID value. Numeric IDs are written as ints, like the API returns them,
+    and anything else as a string.
+    """
+    if val is None or isinstance(val, int):
+        return val
+    val = str(val)
+    return int(val) if val.isdigit() and val.isascii() else val
+
+
+def string(value: str):
+    """
+    Returns a quoted GraphQL string. GraphQL strings use the same escapes as JSON, so
+    quotes, backslashes, and control characters are escaped and everything else is
+    written as is.
+
+    Unpaired surrogates (from badly decoded input) can't be sent in a request body or
+    escaped in GraphQL, so they raise a ValueError before a document is built.
+    """
+    if _SURROGATE_RE.search(value):
+        raise ValueError(
+            "%s contains an unpaired surrogate character" % ascii(value)[:80]
+        )
+    return _dump_string(value)
+
+
+def arguments(values: dict):
+    """
+    Returns the arguments or input object fields in values, without the enclosing
+    parentheses or braces. Search criteria are written this way.
+    """
+    return ", ".join(
+        [
+            "%s: %s" % (key if key in _valid_names else name(key), value(item))
+            for key, item in values.items()
+        ]
+    )
+
+
+def _object(val: dict):
+    return "{%s}" % arguments(val)
+
+
+def _list(val):
+    return "[%s]" % ", ".join([value(item) for item in val])
+
+
+def _set(val):
+    return _list(sorted(val, key=str))
+
+
+def _float(val: float):
+    if not math.isfinite(val):
+        raise ValueError("%r can't be written as a GraphQL float" % val)
+    return float.__repr__(val)
+
+
+_SERIALIZERS = {
+    type(None): lambda val: "null",
+    bool: lambda val: "true" if val else "false",
+    Enum: str.__str__,
+    str: string,
+    int: int.__repr__,
+    float: _float,
+    dict: _object,
+    list: _list,
+    tuple: _list,
+    set: _set,
+    frozenset: _set,
+}
+
+
+def value(val):
+    """
+    Serializes a python value as a GraphQL input value. Dicts become input objects,
+    and lists, tuples, and sets become lists. Sets are sorted so the same value always
+    gives the same document.
+    """
+    serializer = _SERIALIZERS.get(type(val))
+    if serializer is None:
+        # subclasses of the supported types use their base type's serializer
+        for base, serializer in _SERIALIZERS.items():
+            if isinstance(val, base):
+                break
+        else:
+            raise TypeError(
+                "Can't serialize %s as a GraphQL value" % type(val).__name__
+            )
+    return serializer(val)
+
+
+class Field:
+    """
+    A field in a document, with optional arguments, selection set, and alias. The
+    selection is a list of field names (or nested selections as strings) and Fields.
+    """
+
+    __slots__ = ("name", "args", "selection", "alias")
+
+    def __init__(self, name: str, args: dict = None, selection=(), alias: str = None):
+        self.name = name
+        self.args = args
+        self.selection = selection
+        self.alias = alias
+
+    def render(self):
+        parts = []
+        if self.alias:
+            parts.append("%s: " % name(self.alias))
+        parts.append(name(self.name))
+        if self.args:
+            parts.append(
+                "(%s)"
+                % ", ".join(
+                    [
+                        "%s: %s" % (name(key), value(val))
+                        for key, val in self.args.items()
+                    ]
+                )
+            )
+        if self.selection:
+            parts.append(
+                " { %s }"
+                % " ".join(
+                    s.render() if isinstance(s, Field) else s for s in self.selection
+                )
+            )
+        return "".join(parts)
+
+    def __str__(self):
+        return self.render()
+
+
+def mutation(*fields: Field):
+    """
+    Returns a mutation document with the given top level fields. The fields are run
+    in order by the server.
+    """
+    return "mutation {\n  %s\n}" % "\n  ".join(field.render() for field in fields)
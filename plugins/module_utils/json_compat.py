@@ -0,0 +1,97 @@
+"""
+A small wrapper around the fastest available JSON library. orjson is used if it is
+installed, then ujson, and the standard library json module otherwise. Set the
+NR_JSON_BACKEND environment variable to json, orjson, or ujson to pick one.
+
+The backends don't format output identically (for example, orjson doesn't escape
+non-ASCII characters), so anything that is hashed, like object fingerprints, should
+keep using the standard library json module.
+"""
+
+import json
+import os
+
+
+BACKENDS = ("orjson", "ujson", "json")
+
+
+def _import_backend(name):
+    if name == "orjson":
+        import orjson
+
+        return orjson
+    if name == "ujson":
+        import ujson
+
+        return ujson
+    return json
+
+
+def _select_backend():
+    requested = os.environ.get("NR_JSON_BACKEND")
+    names = (requested,) if requested in BACKENDS else BACKENDS
+    for name in names:
+        try:
+            return name, _import_backend(name)
+        except ImportError:
+            continue
+    return "json", json
+
+
+BACKEND, _backend = _select_backend()
+
+
+if BACKEND == "orjson":
+
+    def loads(data):
+        return _backend.loads(data)
+
+    def dumps_bytes(obj, sort_keys: bool = False, default=None):
+        option = _backend.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= _backend.OPT_SORT_KEYS
+        return _backend.dumps(obj, default=default, option=option)
+
+    def dumps(obj, sort_keys: bool = False, default=None):
+        return dumps_bytes(obj, sort_keys=sort_keys, default=default).decode("utf-8")
+
+elif BACKEND == "ujson":
+
+    def loads(data):
+        return _backend.loads(data)
+
+    def dumps(obj, sort_keys: bool = False, default=None):
+        if default is None:
+            return _backend.dumps(obj, sort_keys=sort_keys)
+        return _backend.dumps(obj, sort_keys=sort_keys, default=default)
+
+    def dumps_bytes(obj, sort_keys: bool = False, default=None):
+        return dumps(obj, sort_keys=sort_keys, default=default).encode("utf-8")
+
+else:
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj, sort_keys: bool = False, default=None):
+        return json.dumps(
+            obj, sort_keys=sort_keys, default=default, separators=(",", ":")
+        )
+
+    def dumps_bytes(obj, sort_keys: bool = False, default=None):
+        return dumps(obj, sort_keys=sort_keys, default=default).encode("utf-8")
+
+
+class JsonEncoder:
+    """
+    An encoder with the same encode method as json.JSONEncoder, for the helpers that
+    accept one.
+    """
+
+    __slots__ = ("default",)
+
+    def __init__(self, default=str):
+        self.default = default
+
+    def encode(self, obj):
+        return dumps(obj, default=self.default)
@@ -0,0 +1,40 @@
+"""
+Helpers for passing expensive values to logging calls. The wrapped function is only
+called if a handler actually formats the record, so hot paths don't pay for
+messages that are filtered out by the log level.
+"""
+
+
+class LazyFormat:
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    __repr__ = __str__
+
+
+def _minify(query: str):
+    return "".join(query.split())
+
+
+def _to_json(obj):
+    return obj.to_json()
+
+
+def minified(query: str):
+    """
+    Lazily removes all whitespace from a query so it fits on a single log line.
+    """
+    return LazyFormat(_minify, query)
+
+
+def as_json(obj):
+    """
+    Lazily calls to_json on an object.
+    """
+    return LazyFormat(_to_json, obj)
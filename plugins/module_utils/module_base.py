@@ -1,49 +1,85 @@
 import logging
-from io import StringIO
+from collections import deque
 from ansible.module_utils.basic import env_fallback
 
 from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    DEFAULT_REQUEST_TIMEOUT,
     NerdGraphQueryError,
 )
+from ansible_collections.newrelic.core.plugins.module_utils import circuit_breaker
+from ansible_collections.newrelic.core.plugins.module_utils import tracing
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    CONSISTENCY_MODES,
+    DEFAULT_PROPAGATION_FILE,
+    PendingPropagationStore,
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Modules are executed as __main__ by Ansible, so their loggers are not under the
+# collection namespace
+LOGGER_NAMESPACES = ("ansible_collections.newrelic.core", "__main__")
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the most recent formatted log lines in memory. Once the buffer is full,
+    the oldest lines are dropped so memory use does not grow with the number of
+    records.
+    """
+
+    def __init__(self, level, capacity: int):
+        super().__init__(level)
+        self.buffer = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(msg)
+
+    def getvalue(self):
+        lines = list(self.buffer)
+        if self.dropped:
+            lines.insert(0, "(%s earlier log lines were dropped)" % self.dropped)
+        return "\n".join(lines)
+
 
 class ModuleLogger:
+    MAX_BUFFERED_LINES = 2000
+
     def __init__(self, module):
-        self.logger = logging.getLogger()
-        self.stdout_stream = StringIO()
-        self.stderr_stream = StringIO()
+        self.loggers = [logging.getLogger(name) for name in LOGGER_NAMESPACES]
         self.configure(module.params["log_level"])
 
     def configure(self, log_level):
-        self.logger.setLevel(logging.DEBUG)
-        try:
-            stdout_handler = logging.StreamHandler()
-            stdout_handler.setStream(self.stdout_stream)
-        except AttributeError:
-            # python 3.6
-            stdout_handler = logging.StreamHandler(self.stdout_stream)
-        stdout_handler.setLevel(log_level)
-
-        try:
-            stderr_handler = logging.StreamHandler()
-            stderr_handler.setStream(self.stderr_stream)
-        except AttributeError:
-            # python 3.6
-            stderr_handler = logging.StreamHandler(self.stderr_stream)
-        stderr_handler.setLevel(logging.WARN)
-
-        self.logger.addHandler(stdout_handler)
-        self.logger.addHandler(stderr_handler)
-        self.logger.addHandler(stderr_handler)
+        """
+        Attaches the capture handlers to the collection's loggers. Handlers from any
+        previous ModuleLogger are removed first, so repeated instantiation in the same
+        process does not accumulate handlers.
+        """
+        self.stdout_handler = RingBufferHandler(log_level, self.MAX_BUFFERED_LINES)
+        self.stderr_handler = RingBufferHandler(logging.WARN, self.MAX_BUFFERED_LINES)
+        level = min(logging.getLevelName(log_level), logging.WARN)
+        for _logger in self.loggers:
+            for handler in list(_logger.handlers):
+                if isinstance(handler, RingBufferHandler):
+                    _logger.removeHandler(handler)
+            _logger.addHandler(self.stdout_handler)
+            _logger.addHandler(self.stderr_handler)
+            _logger.setLevel(level)
 
     def write_streams(self, result):
-        stdout = self.stdout_stream.getvalue().strip()
-        stderr = self.stderr_stream.getvalue().strip()
+        stdout = self.stdout_handler.getvalue().strip()
+        stderr = self.stderr_handler.getvalue().strip()
         if stderr:
-            result["stderr"] = stderr.strip()
+            result["stderr"] = stderr
             result["stderr_lines"] = stderr.split("\n")
 
         if stdout:
@@ -51,11 +87,40 @@ class ModuleLogger:
             result["stdout_lines"] = stdout.split("\n")
 
 
+def _diff_state(obj):
+    if obj is None:
+        return {}
+    state = obj.to_json() if hasattr(obj, "to_json") else dict(obj)
+    # the fingerprint changes with every other field, so it only adds noise
+    state.pop("fingerprint", None)
+    return state
+
+
+def configure_circuit_breaker(params: dict):
+    """
+    Configures the NerdGraph circuit breaker from the shared module parameters.
+    """
+    return circuit_breaker.configure_circuit_breaker(
+        params["circuit_breaker_file"],
+        failure_rate=params["circuit_breaker_failure_rate"],
+        cooldown=params["circuit_breaker_cooldown"],
+    )
+
+
 class ModuleBase:
     def __init__(self, module):
         self.module = module
         self.params = module.params
         self._logger = ModuleLogger(module)
+        tracer = tracing.configure_tracing(self.params["trace_file"])
+        configure_circuit_breaker(self.params)
+        self._module_span = tracer.span(
+            "module.run",
+            module=getattr(module, "_name", None),
+            account_id=self.params["account_id"],
+            check_mode=module.check_mode,
+        )
+        self._module_span.__enter__()
 
     @staticmethod
     def shared_argument_spec():
@@ -86,14 +151,85 @@ class ModuleBase:
                 type="int",
                 default=15,
             ),
+            consistency=dict(
+                type="str",
+                default="strong",
+                choices=list(CONSISTENCY_MODES),
+                fallback=(env_fallback, ["NR_CONSISTENCY"]),
+            ),
+            propagation_file=dict(
+                type="path",
+                default=DEFAULT_PROPAGATION_FILE,
+                fallback=(env_fallback, ["NR_PROPAGATION_FILE"]),
+            ),
+            compress_requests=dict(
+                type="bool",
+                default=False,
+                fallback=(env_fallback, ["NR_COMPRESS_REQUESTS"]),
+            ),
+            request_timeout=dict(
+                type="float",
+                default=DEFAULT_REQUEST_TIMEOUT,
+                fallback=(env_fallback, ["NR_REQUEST_TIMEOUT"]),
+            ),
+            trace_file=dict(
+                type="path",
+                required=False,
+                fallback=(env_fallback, ["NR_TRACE_FILE"]),
+            ),
+            circuit_breaker_file=dict(
+                type="path",
+                required=False,
+                fallback=(env_fallback, ["NR_CIRCUIT_BREAKER_FILE"]),
+            ),
+            circuit_breaker_failure_rate=dict(
+                type="float",
+                default=circuit_breaker.DEFAULT_FAILURE_RATE,
+                fallback=(env_fallback, ["NR_CIRCUIT_BREAKER_FAILURE_RATE"]),
+            ),
+            circuit_breaker_cooldown=dict(
+                type="int",
+                default=circuit_breaker.DEFAULT_COOLDOWN,
+                fallback=(env_fallback, ["NR_CIRCUIT_BREAKER_COOLDOWN"]),
+            ),
         )
 
+    def waits_for_propagation(self):
+        """
+        Returns true if the module should block until its changes are visible in the API.
+        """
+        return (
+            self.params["wait_for_propegation"]
+            and self.params["consistency"] == "strong"
+        )
+
+    def set_diff(self, result: dict, before, after):
+        """
+        Adds an Ansible before/after diff of two object states to the result, when
+        running in check mode or with --diff. Either state may be None if the object
+        does not exist.
+        """
+        if not (self.module.check_mode or self.module._diff):
+            return
+        result["diff"] = dict(before=_diff_state(before), after=_diff_state(after))
+
+    def record_pending_propagation(self, result: dict, marker: dict):
+        """
+        In mutation and eventual consistency modes, records a marker for a change so
+        propagation_verify can check it later, and adds it to the result.
+        """
+        if self.params["consistency"] == "strong":
+            return
+        store = PendingPropagationStore(self.params["propagation_file"])
+        result["pending_propagation"] = store.add(marker)
+
     def exit_with_exception(self, result: dict, exc: Exception):
         logger.fatal("%s", exc)
         if isinstance(exc, NerdGraphQueryError):
             result["query_failure"] = exc.to_json()
         result["failed"] = True
         self._logger.write_streams(result)
+        self._end_trace(exc)
         self.module.fail_json(msg=str(exc), **result)
 
     def exit(self, result):
@@ -101,4 +237,13 @@ class ModuleBase:
             if hasattr(v, "to_json"):
                 result[k] = v.to_json()
         self._logger.write_streams(result)
+        self._end_trace()
         self.module.exit_json(**result)
+
+    def _end_trace(self, exc: Exception = None):
+        if self._module_span.recording:
+            if exc is not None:
+                self._module_span.status = "error"
+                self._module_span.set_attribute("error", str(exc))
+            self._module_span.end()
+        tracing.get_tracer().close()
@@ -1,88 +1,278 @@
+import gzip
+import importlib.util
 import logging
-import json
 import re
 import time
 import random
 
-MISSING_IMPORTS = set()
-try:
-    import requests
-except ImportError:
-    MISSING_IMPORTS.add("requests")
+# requests is a large part of a module's startup time, so it is only imported when a
+# request is sent
+MISSING_IMPORTS = set(
+    name for name in ("requests",) if importlib.util.find_spec(name) is None
+)
 
-try:
-    from jinja2 import Environment
-    from jinja2 import BaseLoader
-except ImportError:
-    MISSING_IMPORTS.add("jinja2")
+from ansible_collections.newrelic.core.plugins.module_utils import circuit_breaker
+from ansible_collections.newrelic.core.plugins.module_utils import graphql
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.plugins.module_utils import tracing
 
 
 logger = logging.getLogger(__name__)
 
+# seconds to wait for NerdGraph to accept the connection and to send each part of
+# the response
+DEFAULT_REQUEST_TIMEOUT = 30
+
+
+def cursor_argument(cursor: str, template: str = ", cursor: %s"):
+    """
+    Returns the cursor argument for a search field, or an empty string for the first
+    page.
+    """
+    return template % graphql.string(cursor) if cursor else ""
+
+
+def actor_document(fields: list, aliased: bool = False):
+    """
+    Returns a query document with each field under actor. If aliased is true, the
+    fields are aliased a0, a1, ... so the results can be told apart.
+    """
+    if aliased:
+        fields = ["a%s: %s" % (i, field) for i, field in enumerate(fields)]
+    return "{\n  actor {\n    %s\n  }\n}" % "\n    ".join(fields)
+
 
 class NerdGraphApiBase:
+    # Request bodies smaller than this are not worth compressing
+    COMPRESS_MIN_BYTES = 16 * 1024
+
     def __init__(
         self,
         api_key: str,
         wait_for_propegation: bool = True,
         propegation_timeout: int = 10,
+        compress_requests: bool = False,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
     ):
         if MISSING_IMPORTS:
             raise Exception(
                 "Missing required python package(s): %s" % ", ".join(MISSING_IMPORTS)
             )
-        self.default_headers = {"Api-Key": api_key}
+        self.default_headers = {
+            "Api-Key": api_key,
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip",
+        }
         self.api_base_url = "https://api.newrelic.com/graphql"
-        self.jinja_env = Environment(loader=BaseLoader)
         self.wait_for_propegation = wait_for_propegation
         self.propegation_timeout = propegation_timeout
+        self.compress_requests = compress_requests
+        self.request_timeout = request_timeout
 
     def run_query(self, query: str):
-        try:
-            r = requests.post(
-                url=self.api_base_url,
-                headers=dict(
-                    self.default_headers, **{"Content-type": "application/json"}
-                ),
-                data=json.dumps({"query": query}),
-            )
-            self.handle_query_errors(r, query)
-        except NerdGraphRateLimitError as e:
-            logger.warning("%s", e)
-            x = random.randrange(0, 15, 1)
-            logger.info("Retrying in %s seconds", x)
-            time.sleep(x)
-            r = requests.post(
-                url=self.api_base_url,
-                headers=dict(
-                    self.default_headers, **{"Content-type": "application/json"}
-                ),
-                data=json.dumps({"query": query}),
+        with tracing.get_tracer().span("nerdgraph.run_query") as span:
+            if span.recording:
+                span.set_attribute("operation", tracing.query_operation(query))
+                span.set_attribute("account_id", tracing.query_account_id(query))
+            body, headers, body_size = self.encode_request(query)
+            try:
+                r = self._send(body, headers, body_size, span)
+                data = self.handle_query_errors(r, query)
+            except NerdGraphRateLimitError as e:
+                logger.warning("%s", e)
+                x = random.randrange(0, 15, 1)
+                logger.info("Retrying in %s seconds", x)
+                span.set_attribute("rate_limit_retry_seconds", x)
+                time.sleep(x)
+                r = self._send(body, headers, body_size, span)
+                data = self.handle_query_errors(r, query)
+
+            span.set_attribute("status_code", r.status_code)
+            return data
+
+    def run_mutations(self, queries: list, batch_size: int = 25):
+        """
+        Runs many mutation documents with batch_size of them in each request. Each
+        document must have a single mutation field, which is aliased so the results
+        can be told apart. NerdGraph runs the fields of a mutation in order.
+        Returns the result of each mutation field, in the same order as queries.
+
+        A field that failed doesn't stop the others, so when the response has data,
+        the top level errors are added to the errors of the field in their path and
+        the results of the other fields are still returned. Errors without a path
+        are added to every field that has no result.
+        """
+        results = []
+        for i in range(0, len(queries), batch_size):
+            batch = queries[i : i + batch_size]
+            logger.info("Running %s mutations in one request", len(batch))
+            aliases = ["m%s" % n for n in range(len(batch))]
+            query = "mutation {\n%s\n}" % "\n".join(
+                alias_mutation(q, alias) for alias, q in zip(aliases, batch)
             )
-            self.handle_query_errors(r, query)
+            try:
+                response = self.run_query(query=query)
+            except NerdGraphQueryError as e:
+                if not e.response.get("data"):
+                    raise
+                response = e.response
+            data = response.get("data") or {}
+            errors = dict()
+            for error in response.get("errors", []):
+                path = error.get("path") or []
+                if path and path[0] in aliases:
+                    targets = [path[0]]
+                else:
+                    targets = [alias for alias in aliases if data.get(alias) is None]
+                for alias in targets:
+                    errors.setdefault(alias, []).append(error)
+            for alias in aliases:
+                result = data.get(alias)
+                if alias in errors:
+                    result = dict(result or {})
+                    result["errors"] = (result.get("errors") or []) + errors[alias]
+                results.append(result)
+        return results
+
+    def encode_request(self, query: str):
+        """
+        Returns the request body, headers, and uncompressed body size for a query. If
+        compress_requests is enabled, large bodies (usually mutations with many tags
+        or a full condition config) are gzipped.
+        """
+        body = json_compat.dumps_bytes({"query": query})
+        size = len(body)
+        if not self.compress_requests or size < self.COMPRESS_MIN_BYTES:
+            return body, self.default_headers, size
+        headers = dict(self.default_headers, **{"Content-Encoding": "gzip"})
+        return gzip.compress(body), headers, size
+
+    def _send(self, body: bytes, headers: dict, request_uncompressed: int, span):
+        """
+        Posts a request through the circuit breaker. Requests that could not be sent
+        or timed out and server errors count as failures. Any other response, including GraphQL
+        errors, means NerdGraph is up.
+        """
+        breaker = circuit_breaker.get_circuit_breaker()
+        if not breaker.enabled:
+            return self._post(body, headers, request_uncompressed, span)
+        try:
+            breaker.before_request()
+        except circuit_breaker.NerdGraphCircuitOpenError:
+            span.set_attribute("circuit_open", True)
+            raise
+        try:
+            r = self._post(body, headers, request_uncompressed, span)
+        except Exception:
+            breaker.record(success=False)
+            raise
+        breaker.record(success=r.status_code < 500)
+        return r
 
-        return r.json()
+    def _post(self, body: bytes, headers: dict, request_uncompressed: int, span):
+        import requests
+
+        r = requests.post(
+            url=self.api_base_url,
+            headers=headers,
+            data=body,
+            timeout=self.request_timeout,
+        )
+        request_bytes = len(body)
+        response_uncompressed = len(r.content)
+        response_bytes = _wire_size(r, response_uncompressed)
+        logger.info(
+            "Sent %s bytes (%s uncompressed), received %s bytes (%s uncompressed)",
+            request_bytes,
+            request_uncompressed,
+            response_bytes,
+            response_uncompressed,
+        )
+        if span.recording:
+            span.set_attribute("request_bytes", request_bytes)
+            span.set_attribute("request_bytes_uncompressed", request_uncompressed)
+            span.set_attribute("response_bytes", response_bytes)
+            span.set_attribute("response_bytes_uncompressed", response_uncompressed)
+        return r
+
+    def trace_page(self, operation: str, account_id: str = None, cursor: str = None):
+        """
+        Starts a span for a single page of a paginated search.
+        """
+        return tracing.get_tracer().span(
+            "nerdgraph.page",
+            operation=operation,
+            account_id=account_id,
+            cursor=cursor or None,
+        )
+
+    def trace_propagation_wait(self, kind: str, account_id: str = None, **attributes):
+        """
+        Starts a span covering the time spent waiting for a change to be visible in the API.
+        """
+        return tracing.get_tracer().span(
+            "nerdgraph.propagation_wait",
+            kind=kind,
+            account_id=account_id,
+            timeout=self.propegation_timeout,
+            **attributes
+        )
 
     def handle_query_errors(self, response, query):
+        """
+        Raises an exception if the request failed or the response contains errors.
+        Returns the decoded response, so the body is only parsed once.
+        """
         response.raise_for_status()
-        response = response.json()
+        response = json_compat.loads(response.content)
         errors = response.get("errors", [])
         if not errors:
-            return
-
-        if len(errors) > 1:
-            logger.fatal("errors=%s", errors)
-            raise Exception("check nerdgraph_client.py")
+            return response
 
-        if errors[0].get("description", "").startswith("Rate limit exceeded"):
-            raise NerdGraphRateLimitError(errors[0])
+        for error in errors:
+            if error.get("description", "").startswith("Rate limit exceeded"):
+                raise NerdGraphRateLimitError(error)
 
-        if errors[0].get("message", "").startswith("Validation Error"):
+        if all(e.get("message", "").startswith("Validation Error") for e in errors):
             raise NerdGraphValidationError(response, query)
 
+        if len(errors) > 1:
+            logger.error("errors=%s", errors)
+            raise NerdGraphQueryError(
+                response,
+                query,
+                msg="%s errors were returned while executing a query: %s"
+                % (len(errors), "; ".join(e.get("message", "") for e in errors)),
+            )
+
         raise NerdGraphQueryError(response, query)
 
 
+def alias_mutation(query: str, alias: str):
+    """
+    Returns the single field of a mutation document, prefixed with an alias, so it
+    can be combined with other mutation fields in one document.
+    """
+    query = query.strip()
+    if not query.startswith("mutation"):
+        raise ValueError("Only mutation documents can be batched")
+    field = query[query.index("{") + 1 : query.rindex("}")].strip()
+    return "%s: %s" % (alias, field)
+
+
+def _wire_size(response, default: int):
+    """
+    Returns the number of bytes received for a response before it was decompressed.
+    """
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit():
+        return int(content_length)
+    try:
+        return response.raw.tell()
+    except (AttributeError, TypeError, ValueError, OSError):
+        return default
+
+
 class NerdGraphQueryError(Exception):
     def __init__(self, response, query, msg: str = None):
         if not msg:
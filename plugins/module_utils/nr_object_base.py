@@ -1,61 +1,482 @@
+import copy
+import hashlib
+import json
 import logging
+import os
+import tempfile
 
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.plugins.module_utils.lazy_log import (
+    as_json,
+)
 
 logger = logging.getLogger(__name__)
 
 
+_SCALAR_TYPES = frozenset([str, int, float, bool])
+
+
+def _sort_key(value):
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def normalize_value(value, unordered: bool = False):
+    """
+    Converts a value into plain JSON types so it can be hashed consistently.
+    If unordered is true, lists and sets are sorted so that their order is ignored.
+    """
+    if value is None or type(value) in _SCALAR_TYPES:
+        return value
+    if isinstance(value, NrObjectBase):
+        return value.fingerprint
+    if hasattr(value, "to_json"):
+        return normalize_value(value.to_json(), unordered)
+    if isinstance(value, (set, frozenset)):
+        unordered = True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [normalize_value(v, unordered) for v in value]
+        if unordered:
+            items.sort(key=_sort_key)
+        return items
+    if isinstance(value, dict):
+        return {str(k): normalize_value(v, unordered) for k, v in value.items()}
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+_PUBLIC_ATTRS = {}
+_FIELD_PLANS = {}
+_TYPE_CONVERTERS = {}
+_SELECTIONS = {}
+
+
+def public_attrs(cls):
+    """
+    Returns the names of the public slots defined on a class and its parents,
+    base classes first.
+    """
+    try:
+        return _PUBLIC_ATTRS[cls]
+    except KeyError:
+        pass
+
+    attrs = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get("__slots__", ()):
+            if not name.startswith("_") and name not in attrs:
+                attrs.append(name)
+    _PUBLIC_ATTRS[cls] = tuple(attrs)
+    return _PUBLIC_ATTRS[cls]
+
+
+def _to_json(value):
+    return value.to_json()
+
+
+def _list_to_json(value):
+    o = []
+    for val in value:
+        try:
+            o.append(val.to_json())
+        except AttributeError:
+            o.append(str(val))
+    return o
+
+
+def _unchanged(value):
+    return value
+
+
+def _converter_for_type(value_type):
+    if hasattr(value_type, "to_json"):
+        return _to_json
+    if issubclass(value_type, (list, set)):
+        return _list_to_json
+    if issubclass(value_type, dict):
+        return _unchanged
+    return str
+
+
+def convert_value(value):
+    """
+    Converts an attribute value for to_json output. The converter is looked up
+    by the value's type, and cached so each type is only inspected once.
+    """
+    value_type = type(value)
+    try:
+        converter = _TYPE_CONVERTERS[value_type]
+    except KeyError:
+        converter = _TYPE_CONVERTERS[value_type] = _converter_for_type(value_type)
+    return converter(value)
+
+
+def field_plan(cls):
+    """
+    Returns a tuple of (attribute name, converter) pairs used to serialize a class.
+    Classes can set specific converters with the _json_converters dict. The plan is
+    computed once per class.
+    """
+    try:
+        return _FIELD_PLANS[cls]
+    except KeyError:
+        pass
+
+    overrides = getattr(cls, "_json_converters", {})
+    _FIELD_PLANS[cls] = tuple(
+        (name, overrides.get(name, convert_value)) for name in public_attrs(cls)
+    )
+    return _FIELD_PLANS[cls]
+
+
+def render_selection(paths):
+    """
+    Renders dotted GraphQL field paths as the body of a selection set. Paths that
+    share a parent are merged, so ["signal.slideBy", "signal.aggregationWindow"]
+    becomes "signal { slideBy aggregationWindow }".
+    """
+    tree = dict()
+    for path in paths:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, dict())
+
+    def _render(node):
+        return " ".join(
+            "%s { %s }" % (name, _render(child)) if child else name
+            for name, child in node.items()
+        )
+
+    return _render(tree)
+
+
+class FingerprintedChild:
+    """
+    Mixin for values held in an NrObjectBase attribute, like incident terms and tags.
+    Setting a public attribute, or calling _changed after changing the value in
+    place, invalidates the fingerprint of the object that holds it.
+    """
+
+    __slots__ = ("_owner",)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            self._changed()
+
+    def _changed(self):
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            owner.invalidate_fingerprint()
+
+    def __getstate__(self):
+        # copies don't belong to the owner of the original
+        return None, {
+            name: getattr(self, name)
+            for klass in type(self).__mro__
+            for name in klass.__dict__.get("__slots__", ())
+            if name != "_owner" and hasattr(self, name)
+        }
+
+
+class ObservedList(list):
+    """
+    A list attribute of an NrObjectBase. Changing the list in place invalidates the
+    owner's fingerprint. Copies are plain lists.
+    """
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner, items=()):
+        super().__init__(items)
+        self._owner = owner
+        for item in self:
+            _adopt(owner, item)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(list(self), memo)
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+def _observed(name):
+    method = getattr(list, name)
+
+    def _method(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            for item in self:
+                _adopt(owner, item)
+            owner.invalidate_fingerprint()
+        return result
+
+    _method.__name__ = name
+    return _method
+
+
+for _name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(ObservedList, _name, _observed(_name))
+
+
+def _adopt(owner, value):
+    """
+    Returns value as it is stored in an attribute of owner. Lists are copied into an
+    ObservedList, and FingerprintedChild values are told their owner.
+    """
+    if isinstance(value, list):
+        return ObservedList(owner, value)
+    if isinstance(value, FingerprintedChild):
+        object.__setattr__(value, "_owner", owner)
+    return value
+
+
 class NrObjectBase:
+    __slots__ = ("_fingerprint", "name", "account_id")
+    # Subclasses extend this tuple with their own attributes to compare
+    _equality_attrs = ("name", "account_id")
+    # Attributes whose list values should be compared without regard to order
+    _unordered_attrs = frozenset()
+    # Maps attribute names to the dotted GraphQL field paths from_api_data reads them from
+    _search_fields = {}
+    # Attributes that are always fetched, because from_api_data can't work without them
+    _required_search_fields = ()
+
     def __init__(self, name: str, account_id: str):
+        self._fingerprint = None
         self.name = name
         self.account_id = str(account_id)
-        self._equality_attrs = set(["name", "account_id"])
 
-    def to_json(self):
-        o = {}
-        for k, v in self.__dict__.items():
-            if k.startswith("_"):
-                continue
-            if hasattr(v, "to_json"):
-                o[k] = v.to_json()
-                continue
-
-            if isinstance(v, list) or isinstance(v, set):
-                o[k] = self.__list_to_json(v)
-            elif isinstance(v, dict):
-                o[k] = v
-            else:
-                o[k] = str(v)
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+            return
+        object.__setattr__(self, name, _adopt(self, value))
+        object.__setattr__(self, "_fingerprint", None)
 
-        return o
+    @property
+    def fingerprint(self):
+        """
+        A hash of the normalized equality attributes. Two objects with the same
+        fingerprint are considered equal. The value is cached until the object
+        changes: a public attribute is set, a list attribute is changed in place, or a
+        FingerprintedChild it holds changes. Call invalidate_fingerprint after changing
+        any other value, like a dict, in place.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self._compute_fingerprint()
+        return self._fingerprint
+
+    def _compute_fingerprint(self):
+        # the standard json module is used so fingerprints don't depend on which
+        # json backend is installed
+        payload = json.dumps(
+            self.fingerprint_data(),
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def fingerprint_data(self):
+        return {
+            attr: normalize_value(
+                getattr(self, attr, None), attr in self._unordered_attrs
+            )
+            for attr in self._equality_attrs
+        }
+
+    def invalidate_fingerprint(self):
+        self._fingerprint = None
+
+    @classmethod
+    def selected_fields(cls, fields=None):
+        """
+        Returns the attributes fetched for a list of requested fields, which always
+        includes the required fields. If fields is empty, every searchable field is
+        selected.
+        """
+        if not fields:
+            return tuple(cls._search_fields)
+        unknown = sorted(set(fields).difference(cls._search_fields))
+        if unknown:
+            raise ValueError(
+                "Unknown fields %s. Valid fields are %s"
+                % (unknown, sorted(cls._search_fields))
+            )
+        return tuple(dict.fromkeys(cls._required_search_fields + tuple(fields)))
 
-    def __list_to_json(self, l):
-        if isinstance(l, set):
-            l = list(l)
+    @classmethod
+    def search_selection(cls, fields=None):
+        """
+        Returns the GraphQL selection set needed to read the requested fields.
+        Selections are cached per class and field list.
+        """
+        key = (cls, tuple(fields or ()))
+        try:
+            return _SELECTIONS[key]
+        except KeyError:
+            pass
 
-        o = []
-        for val in l:
-            try:
-                o.append(val.to_json())
-            except AttributeError:
-                o.append(str(val))
+        paths = []
+        for name in cls.selected_fields(fields):
+            paths.extend(cls._search_fields[name])
+        _SELECTIONS[key] = render_selection(paths)
+        return _SELECTIONS[key]
+
+    def to_json(self, fields=None):
+        """
+        Returns the object as a dict. If fields is given, only those attributes are
+        included. The fingerprint is left out in that case since it covers attributes
+        that may not have been fetched.
+        """
+        if fields:
+            return {
+                name: converter(getattr(self, name))
+                for name, converter in field_plan(type(self))
+                if name in fields
+            }
+        o = {
+            name: converter(getattr(self, name))
+            for name, converter in field_plan(type(self))
+        }
+        o["fingerprint"] = self.fingerprint
         return o
 
+    def differing_attrs(self, other):
+        self_data = self.fingerprint_data()
+        other_data = other.fingerprint_data()
+        return [
+            attr
+            for attr in sorted(self_data)
+            if self_data[attr] != other_data.get(attr)
+        ]
+
     def __eq__(self, other):
         if not isinstance(other, NrObjectBase):
             return False
 
-        logger.info("Comparing first: %s", self.to_json())
-        logger.info("To second: %s", other.to_json())
-        for attr in self._equality_attrs:
-            self_val = getattr(self, attr, None)
-            other_val = getattr(other, attr, None)
-            if isinstance(attr, list):
-                self_val, other_val = set(self_val), set(other_val)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Comparing first: %s", as_json(self))
+            logger.debug("To second: %s", as_json(other))
 
-            if self_val == other_val:
-                continue
+        if self.fingerprint == other.fingerprint:
+            return True
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s are different", self.differing_attrs(other))
+        return False
+
+
+class ObjectDiff:
+    """
+    The result of comparing desired objects with live objects. Updates are
+    tuples of (desired, live).
+    """
+
+    def __init__(self):
+        self.create = []
+        self.update = []
+        self.delete = []
+        self.unchanged = []
+
+    def __bool__(self):
+        return bool(self.create or self.update or self.delete)
+
+    def to_json(self):
+        return {
+            "create": [o.to_json() for o in self.create],
+            "update": [desired.to_json() for desired, _ in self.update],
+            "delete": [o.to_json() for o in self.delete],
+            "unchanged": len(self.unchanged),
+        }
+
+
+def diff_objects(desired, live, key=None):
+    """
+    Compares lists of desired and live objects. Objects are matched by key (the name
+    by default) and compared by fingerprint, so the cost is a dict lookup per object.
+    Live objects with no matching desired object are marked for deletion.
+    """
+    if key is None:
+        key = _name_key
+    live_by_key = {key(o): o for o in live}
+    matched = set()
+    diff = ObjectDiff()
+    for desired_obj in desired:
+        k = key(desired_obj)
+        live_obj = live_by_key.get(k)
+        if live_obj is None:
+            diff.create.append(desired_obj)
+            continue
+
+        matched.add(k)
+        if live_obj.fingerprint == desired_obj.fingerprint:
+            diff.unchanged.append(live_obj)
+        else:
+            diff.update.append((desired_obj, live_obj))
+
+    diff.delete = [o for k, o in live_by_key.items() if k not in matched]
+    return diff
+
+
+def _name_key(obj):
+    return obj.name
+
+
+def write_json_lines(objects, fp, encoder=None, record=None):
+    """
+    Writes each object's to_json output to a file object as one JSON document per
+    line. If record is given, it is called with each object to get the document
+    instead. Returns the number of objects written.
+    """
+    if encoder is None:
+        encoder = json_compat.JsonEncoder()
+    if record is None:
+        record = _to_json
+    count = 0
+    for obj in objects:
+        fp.write(encoder.encode(record(obj)))
+        fp.write("\n")
+        count += 1
+    return count
 
-            logger.info("%s is different", attr)
-            return False
 
-        return True
+def write_json_lines_file(objects, path: str, record=None):
+    """
+    Writes objects to a file with write_json_lines, as they are yielded. The file is
+    written to a temporary file first and then moved into place, so an interrupted
+    write never leaves a partial file. Returns the number of objects written.
+    """
+    path = os.path.expanduser(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=".%s." % os.path.basename(path)
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            count = write_json_lines(objects, fp, record=record)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
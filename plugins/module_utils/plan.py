@@ -0,0 +1,475 @@
+"""
+Computes the changes needed to bring an account to a desired state, using a dump of
+the live objects instead of the API, and applies a computed plan with batched
+mutations.
+
+Live dumps and desired states are dicts keyed by kind (alert_policy, nrql_condition,
+synthetic_monitor). A live dump has the raw API data of each object, as read by
+from_api_data. A desired state has dicts of object attributes, using the same names as
+the info modules return.
+"""
+
+import copy
+import gzip
+import logging
+import os
+import time
+
+from ansible.module_utils.common.validation import (
+    check_type_bool,
+    check_type_int,
+    check_type_list,
+    check_type_str,
+)
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    IncidentTerm,
+    NrqlAlertConditionBase,
+    NrqlStaticAlertCondition,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    diff_objects,
+    normalize_value,
+    public_attrs,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.objects import (
+    PingSyntheticMonitor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+PLAN_FORMAT_VERSION = 1
+PLAN_KINDS = ("alert_policy", "nrql_condition", "synthetic_monitor")
+
+# Policies are created before the conditions that reference them, and deleted after
+APPLY_ORDER = (
+    ("alert_policy", "create"),
+    ("alert_policy", "update"),
+    ("nrql_condition", "create"),
+    ("nrql_condition", "update"),
+    ("synthetic_monitor", "create"),
+    ("synthetic_monitor", "update"),
+    ("nrql_condition", "delete"),
+    ("synthetic_monitor", "delete"),
+    ("alert_policy", "delete"),
+)
+
+
+def load_json_file(path: str):
+    """
+    Reads a JSON file, which may be gzip compressed.
+    """
+    path = os.path.expanduser(path)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return json_compat.loads(f.read())
+
+
+def live_objects_from_dump(dump: dict, account_id: str):
+    """
+    Returns the objects of each kind in a live dump, built with from_api_data.
+    """
+    objects = {kind: [] for kind in PLAN_KINDS}
+    for data in dump.get("alert_policy") or []:
+        objects["alert_policy"].append(AlertPolicy.from_api_data(data))
+    for data in dump.get("nrql_condition") or []:
+        if not NrqlAlertConditionBase.is_supported_data(data):
+            logger.warning(
+                "Skipping condition %s with unsupported type %s",
+                data.get("name"),
+                data.get("type"),
+            )
+            continue
+        objects["nrql_condition"].append(
+            NrqlAlertConditionBase.from_api_data(data=data, account_id=account_id)
+        )
+    for data in dump.get("synthetic_monitor") or []:
+        if data.get("monitorType") != PingSyntheticMonitor.MONITOR_TYPE:
+            logger.warning(
+                "Skipping monitor %s with unsupported type %s",
+                data.get("name"),
+                data.get("monitorType"),
+            )
+            continue
+        objects["synthetic_monitor"].append(PingSyntheticMonitor.from_api_data(data))
+    return objects
+
+
+def object_state(obj):
+    """
+    Returns the public attributes of an object as plain JSON values, which
+    object_from_state can turn back into an equal object.
+    """
+    return {
+        attr: normalize_value(getattr(obj, attr, None), attr in obj._unordered_attrs)
+        for attr in public_attrs(type(obj))
+    }
+
+
+def _new_object(kind: str, data: dict, account_id: str):
+    if kind == "alert_policy":
+        return AlertPolicy(
+            name=data["name"],
+            incident_preference=data.get("incident_preference"),
+            account_id=account_id,
+        )
+    if kind == "nrql_condition":
+        return NrqlStaticAlertCondition(
+            name=data["name"], account_id=account_id, policy_id=data.get("policy_id")
+        )
+    if kind == "synthetic_monitor":
+        return PingSyntheticMonitor(name=data["name"], account_id=account_id)
+    raise ValueError("Unknown plan kind %s" % kind)
+
+
+# the types of the matching options of the alert_policy, nrql_static_alert_condition,
+# and ping_synthetic_monitor modules. Desired values are converted the same way the
+# modules convert their options, so values that were templated into strings (like
+# "True" or "60") are not planned as changes.
+_STATE_TYPES = {
+    "alert_policy": dict(id="str", incident_preference="str"),
+    "nrql_condition": dict(
+        guid="str",
+        id="str",
+        enabled="bool",
+        description="str",
+        policy_id="str",
+        nrql_query="str",
+        runbook_url="str",
+        data_aggregation_window="int",
+        data_aggregation_method="str",
+        data_aggregation_timer="int",
+        data_aggregation_delay="int",
+        data_slide_by="int",
+        evaluation_delay="int",
+    ),
+    "synthetic_monitor": dict(
+        guid="str",
+        id="str",
+        url="str",
+        period="str",
+        public_locations="list",
+        private_locations="list",
+        enabled="bool",
+        validation_string="str",
+        verify_ssl="bool",
+    ),
+}
+_TERM_TYPES = dict(
+    threshold="int", priority="str", operator="str", duration="int", occurrences="str"
+)
+_TYPE_CHECKS = dict(
+    str=check_type_str,
+    int=check_type_int,
+    bool=check_type_bool,
+    list=lambda value: [check_type_str(v) for v in check_type_list(value)],
+)
+
+
+def _convert(kind: str, name: str, attr: str, value, value_type: str):
+    # None is templated into the string "None"
+    if value is None or value == "None":
+        return None
+    if value_type != "list" and isinstance(value, (dict, list)):
+        raise ValueError(
+            "Invalid value for %s attribute %s of %s: expected a %s, got %r"
+            % (kind, attr, name, value_type, value)
+        )
+    try:
+        return _TYPE_CHECKS[value_type](value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            "Invalid value for %s attribute %s of %s: %s" % (kind, attr, name, e)
+        )
+
+
+def _incident_term(kind: str, name: str, term: dict):
+    unknown = sorted(set(term).difference(_TERM_TYPES))
+    if unknown:
+        raise ValueError("Unknown incident term attributes %s for %s" % (unknown, name))
+    return IncidentTerm(
+        **{
+            key: _convert(kind, name, "incident_terms." + key, value, _TERM_TYPES[key])
+            for key, value in term.items()
+        }
+    )
+
+
+def _state_value(kind: str, name: str, attr: str, value):
+    if attr == "incident_terms":
+        return [_incident_term(kind, name, term) for term in value or []]
+    if attr == "tags":
+        return EntityTags(value)
+    if attr in _STATE_TYPES[kind]:
+        return _convert(kind, name, attr, value, _STATE_TYPES[kind][attr])
+    return value
+
+
+def object_from_state(kind: str, data: dict, account_id: str, defaults=None):
+    """
+    Builds an object from a dict of attributes. Attributes that are not in data are
+    copied from defaults if it is given, and otherwise keep the object's defaults.
+    Values are converted to the types of the matching module options, and a
+    ValueError is raised if that isn't possible.
+    """
+    obj = _new_object(kind, data, account_id)
+    attrs = public_attrs(type(obj))
+    unknown = sorted(set(data).difference(attrs, ("policy_name", "fingerprint")))
+    if unknown:
+        raise ValueError(
+            "Unknown %s attributes %s for %s" % (kind, unknown, data.get("name"))
+        )
+    for attr in attrs:
+        if attr == "account_id":
+            continue
+        if attr in data:
+            setattr(obj, attr, _state_value(kind, obj.name, attr, data[attr]))
+        elif defaults is not None:
+            setattr(obj, attr, copy.deepcopy(getattr(defaults, attr)))
+    return obj
+
+
+def _policy_key(obj):
+    return obj.name
+
+
+def _condition_key(obj):
+    return (str(obj.policy_id), obj.name)
+
+
+def _monitor_key(obj):
+    return obj.name
+
+
+_KEYS = {
+    "alert_policy": _policy_key,
+    "nrql_condition": _condition_key,
+    "synthetic_monitor": _monitor_key,
+}
+
+
+class Planner:
+    """
+    Compares a desired state with live objects without calling the API. Objects are
+    matched by name (and policy, for conditions) and compared by fingerprint, so
+    even very large accounts are planned quickly.
+
+    Attributes that a desired object leaves out are taken from the matching live
+    object, so they are never reported as changes.
+    """
+
+    def __init__(self, account_id: str, live: dict):
+        self.account_id = str(account_id)
+        self.live = live
+        self.policy_ids = {p.name: str(p.id) for p in live.get("alert_policy", [])}
+
+    def _desired_objects(self, kind: str, states: list):
+        live_by_key = {_KEYS[kind](o): o for o in self.live.get(kind, [])}
+        objects = []
+        unresolved = dict()
+        for data in states:
+            data = dict(data)
+            if kind == "nrql_condition" and not data.get("policy_id"):
+                policy_name = data.get("policy_name")
+                if not policy_name:
+                    raise ValueError(
+                        "Condition %s needs a policy_id or policy_name" % data["name"]
+                    )
+                data["policy_id"] = self.policy_ids.get(policy_name)
+                if data["policy_id"] is None:
+                    # the policy doesn't exist yet, so the id is filled in when the
+                    # plan is applied
+                    data["policy_id"] = "policy:%s" % policy_name
+                    unresolved[len(objects)] = policy_name
+            key = _KEYS[kind](_new_object(kind, data, self.account_id))
+            objects.append(
+                object_from_state(
+                    kind, data, self.account_id, defaults=live_by_key.get(key)
+                )
+            )
+        return objects, unresolved
+
+    def plan(self, desired: dict, prune: bool = False):
+        """
+        Returns a plan with the actions for each kind in desired. Live objects that
+        are not in desired are only deleted if prune is true.
+        """
+        actions = []
+        summary = dict()
+        for kind in PLAN_KINDS:
+            if kind not in desired:
+                continue
+            objects, unresolved = self._desired_objects(kind, desired[kind] or [])
+            policy_names = {id(objects[i]): name for i, name in unresolved.items()}
+            diff = diff_objects(objects, self.live.get(kind, []), key=_KEYS[kind])
+            if not prune:
+                diff.delete = []
+
+            for obj in diff.create:
+                action = dict(kind=kind, op="create", object=object_state(obj))
+                if id(obj) in policy_names:
+                    action["policy_name"] = policy_names[id(obj)]
+                actions.append(action)
+            for obj, live_obj in diff.update:
+                actions.append(
+                    dict(
+                        kind=kind,
+                        op="update",
+                        object=object_state(obj),
+                        changes=obj.differing_attrs(live_obj),
+                    )
+                )
+            for obj in diff.delete:
+                actions.append(dict(kind=kind, op="delete", object=object_state(obj)))
+
+            summary[kind] = dict(
+                create=len(diff.create),
+                update=len(diff.update),
+                delete=len(diff.delete),
+                unchanged=len(diff.unchanged),
+            )
+
+        return dict(
+            version=PLAN_FORMAT_VERSION,
+            account_id=self.account_id,
+            created_at=time.time(),
+            summary=summary,
+            actions=actions,
+        )
+
+
+def write_plan(plan: dict, path: str):
+    path = os.path.expanduser(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json_compat.dumps_bytes(plan, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+def read_plan(path: str):
+    plan = load_json_file(path)
+    if plan.get("version") != PLAN_FORMAT_VERSION:
+        raise ValueError("Unsupported plan version %s" % plan.get("version"))
+    return plan
+
+
+class PlanExecutor:
+    """
+    Runs the mutations in a plan. Actions of the same kind and operation are sent
+    batch_size at a time as aliased fields of one mutation document.
+    """
+
+    def __init__(
+        self,
+        account_id: str,
+        policy_api=None,
+        condition_api=None,
+        monitor_api=None,
+        batch_size: int = 25,
+    ):
+        self.account_id = str(account_id)
+        self.apis = {
+            "alert_policy": policy_api,
+            "nrql_condition": condition_api,
+            "synthetic_monitor": monitor_api,
+        }
+        self.batch_size = batch_size
+        self.policy_ids = dict()
+        self.applied = dict()
+
+    def _object(self, action: dict):
+        data = dict(action["object"])
+        if action.get("policy_name"):
+            try:
+                data["policy_id"] = self.policy_ids[action["policy_name"]]
+            except KeyError:
+                raise Exception(
+                    "Policy %s for condition %s was not created by this plan"
+                    % (action["policy_name"], data["name"])
+                )
+        obj = object_from_state(action["kind"], data, self.account_id)
+        if action["kind"] == "nrql_condition" and action["op"] != "delete":
+            obj.validate_properties()
+        return obj
+
+    def _mutation(self, kind: str, op: str, obj):
+        try:
+            return getattr(obj, "%s_mutation" % op)()
+        except ValueError as e:
+            raise ValueError(
+                "Can't build the %s mutation for %s %s: %s" % (op, kind, obj.name, e)
+            )
+
+    def _record_result(self, kind: str, op: str, obj, result: dict):
+        if op != "create":
+            return
+        if kind == "alert_policy":
+            obj.id = result["id"]
+            self.policy_ids[obj.name] = str(obj.id)
+        elif kind == "nrql_condition":
+            obj.id = result["id"]
+            obj.guid = result["entityGuid"]
+        elif kind == "synthetic_monitor":
+            obj.id = result["monitor"]["id"]
+            obj.guid = result["monitor"]["guid"]
+
+    def apply(self, plan: dict):
+        """
+        Applies the actions in a plan and returns the number of objects changed for
+        each kind and operation.
+
+        Each action that succeeds is marked as applied in the plan, with the id of the
+        object it created, and actions that are already marked are skipped. If some
+        mutations fail, the plan can be written back and applied again to finish it.
+        """
+        if str(plan["account_id"]) != self.account_id:
+            raise ValueError(
+                "The plan is for account %s, not %s"
+                % (plan["account_id"], self.account_id)
+            )
+        groups = dict()
+        for action in plan["actions"]:
+            groups.setdefault((action["kind"], action["op"]), []).append(action)
+
+        for kind, op in APPLY_ORDER:
+            actions = []
+            for action in groups.get((kind, op), []):
+                if not action.get("applied"):
+                    actions.append(action)
+                elif kind == "alert_policy" and op == "create":
+                    self.policy_ids[action["object"]["name"]] = action["id"]
+            if not actions:
+                continue
+            objects = [self._object(action) for action in actions]
+            # every document in the group is built before it is sent, so a value
+            # that can't be serialized doesn't leave a batch partly applied
+            queries = [self._mutation(kind, op, obj) for obj in objects]
+            logger.info("Running %s %s mutations for %s", len(queries), op, kind)
+            results = self.apis[kind].run_mutations(queries, self.batch_size)
+
+            errors = dict()
+            for action, obj, result in zip(actions, objects, results):
+                if result and result.get("errors"):
+                    errors[obj.name] = result["errors"]
+                    continue
+                if not result:
+                    errors[obj.name] = "no result was returned"
+                    continue
+                self._record_result(kind, op, obj, result)
+                action["applied"] = True
+                if op == "create":
+                    action["id"] = str(obj.id)
+                counts = self.applied.setdefault(kind, dict())
+                counts[op] = counts.get(op, 0) + 1
+            if errors:
+                raise Exception("Failed to %s %s: %s" % (op, kind, errors))
+        return self.applied
@@ -0,0 +1,354 @@
+"""
+Tracks changes that were made without waiting for them to propagate through the
+New Relic API, so they can be verified later in a few batched searches.
+"""
+
+import contextlib
+import logging
+import os
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import (
+    search_literal,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    EntityTags,
+)
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+CONSISTENCY_MODES = ("strong", "mutation", "eventual")
+DEFAULT_PROPAGATION_FILE = "~/.ansible/newrelic_pending_propagation.json"
+
+
+def marker_key(marker: dict):
+    return "%s:%s:%s" % (
+        marker["kind"],
+        marker["account_id"],
+        marker.get("guid") or marker.get("id"),
+    )
+
+
+def policy_marker(policy, state: str = "present"):
+    return dict(
+        kind="alert_policy",
+        account_id=str(policy.account_id),
+        state=state,
+        id=str(policy.id),
+        name=policy.name,
+        fingerprint=policy.fingerprint,
+    )
+
+
+def monitor_marker(monitor, state: str = "present"):
+    return dict(
+        kind="synthetic_monitor",
+        account_id=str(monitor.account_id),
+        state=state,
+        id=monitor.id,
+        guid=monitor.guid,
+        name=monitor.name,
+        fingerprint=monitor.fingerprint,
+    )
+
+
+def entity_tags_marker(entity, changed_tags, state: str = "present"):
+    return dict(
+        kind="entity_tags",
+        account_id=str(entity.account_id),
+        state=state,
+        guid=entity.guid,
+        name=entity.name,
+        tags=changed_tags.to_json(),
+    )
+
+
+def _iter_results(results):
+    for result in results:
+        # registered results from a loop keep each item under "results"
+        if isinstance(result, dict) and isinstance(result.get("results"), list):
+            yield from _iter_results(result["results"])
+        else:
+            yield result
+
+
+def _marker_from_result(result: dict, account_id: str):
+    args = (result.get("invocation") or {}).get("module_args") or {}
+    account_id = str(args.get("account_id") or account_id)
+    state = args.get("state") or "present"
+
+    if isinstance(result.get("policy"), dict):
+        fingerprint = None
+        if args.get("incident_preference"):
+            fingerprint = AlertPolicy(
+                name=result["policy"]["name"],
+                incident_preference=args["incident_preference"],
+                account_id=account_id,
+            ).fingerprint
+        return dict(
+            kind="alert_policy",
+            account_id=account_id,
+            state=state,
+            id=str(result["policy"]["id"]),
+            name=result["policy"]["name"],
+            fingerprint=fingerprint,
+        )
+
+    if isinstance(result.get("monitor"), dict) and result["monitor"].get("guid"):
+        monitor = result["monitor"]
+        return dict(
+            kind="synthetic_monitor",
+            account_id=str(monitor.get("account_id") or account_id),
+            state=state,
+            id=monitor.get("id"),
+            guid=monitor["guid"],
+            name=monitor.get("name"),
+            fingerprint=monitor.get("fingerprint"),
+        )
+
+    if isinstance(result.get("changed_tags"), dict) and result.get("guid"):
+        return dict(
+            kind="entity_tags",
+            account_id=account_id,
+            state=state,
+            guid=result["guid"],
+            name=result.get("name"),
+            tags=result["changed_tags"],
+        )
+
+    return None
+
+
+def markers_from_results(results, account_id: str):
+    """
+    Builds markers from the registered results of alert_policy, ping_synthetic_monitor,
+    and entity_tags tasks. results is a list of results, or a single result such as
+    a looped task's. Results that did not change anything are skipped. If a result
+    already has a pending_propagation marker, it is used as is.
+    """
+    if isinstance(results, dict):
+        results = [results]
+    markers = []
+    for result in _iter_results(results):
+        if not isinstance(result, dict) or not result.get("changed"):
+            continue
+        if result.get("failed") or result.get("skipped"):
+            continue
+        if result.get("pending_propagation"):
+            markers.append(result["pending_propagation"])
+            continue
+        marker = _marker_from_result(result, account_id)
+        if marker is None:
+            logger.warning(
+                "Ignoring a result that did not come from a supported module"
+            )
+            continue
+        markers.append(marker)
+    return markers
+
+
+def backoff_delays(initial: float, maximum: float, factor: float, timeout: float):
+    """
+    Yields the delays between verification attempts. Each delay is factor times the
+    previous one, capped at maximum, and the delays stop once their sum would pass
+    the timeout.
+    """
+    elapsed = 0
+    delay = initial
+    while elapsed < timeout:
+        delay = min(delay, maximum, timeout - elapsed)
+        yield delay
+        elapsed += delay
+        delay *= factor
+
+
+class PendingPropagationStore:
+    """
+    A JSON file of pending propagation markers, keyed by object. Ansible runs tasks
+    for many hosts in parallel processes, so every read-modify-write happens under an
+    exclusive lock on a sidecar lock file.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str = None):
+        self.path = os.path.expanduser(path or DEFAULT_PROPAGATION_FILE)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = json_compat.loads(f.read())
+        except FileNotFoundError:
+            return dict()
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable propagation file %s: %s", self.path, e)
+            return dict()
+        if data.get("version") != self.FORMAT_VERSION:
+            return dict()
+        return data.get("markers", {})
+
+    def _write(self, markers: dict):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                json_compat.dumps_bytes(
+                    {"version": self.FORMAT_VERSION, "markers": markers}
+                )
+            )
+        os.replace(tmp_path, self.path)
+
+    def add(self, marker: dict):
+        """
+        Records a marker, replacing any pending marker for the same object.
+        """
+        marker = dict(marker, recorded_at=time.time())
+        with self._locked():
+            markers = self._read()
+            markers[marker_key(marker)] = marker
+            self._write(markers)
+        return marker
+
+    def load(self):
+        with self._locked():
+            return list(self._read().values())
+
+    def remove(self, keys):
+        keys = set(keys)
+        if not keys:
+            return
+        with self._locked():
+            markers = self._read()
+            for key in keys:
+                markers.pop(key, None)
+            self._write(markers)
+
+
+def _group_by_account(markers):
+    groups = dict()
+    for marker in markers:
+        groups.setdefault(marker["account_id"], []).append(marker)
+    return groups
+
+
+def _is_verified(marker, live_fingerprint):
+    if marker["state"] == "absent":
+        return live_fingerprint is None
+    if live_fingerprint is None:
+        return False
+    # markers built from registered results may not know the desired state, in
+    # which case the object only needs to exist
+    return marker.get("fingerprint") in (None, live_fingerprint)
+
+
+def verify_policy_markers(api, markers, batch_size: int = 25):
+    verified = []
+    for account_id, account_markers in _group_by_account(markers).items():
+        for i in range(0, len(account_markers), batch_size):
+            batch = account_markers[i : i + batch_size]
+            query = "ids: %s" % json_compat.dumps([m["id"] for m in batch])
+            live = dict()
+            cursor = ""
+            while True:
+                policies, cursor = api.get_policies_from_query(
+                    query, account_id=account_id, cursor=cursor
+                )
+                live.update({str(p.id): p.fingerprint for p in policies})
+                if not cursor:
+                    break
+            verified += [m for m in batch if _is_verified(m, live.get(m["id"]))]
+    return verified
+
+
+def verify_monitor_markers(api, markers, batch_size: int = 25):
+    verified = []
+    for account_id, account_markers in _group_by_account(markers).items():
+        for i in range(0, len(account_markers), batch_size):
+            batch = account_markers[i : i + batch_size]
+            query = "domain = 'SYNTH' AND type = 'MONITOR' AND id IN (%s)" % ", ".join(
+                search_literal(m["guid"]) for m in batch
+            )
+            live = dict()
+            cursor = ""
+            while True:
+                monitors, cursor = api.get_monitors_from_query(
+                    query, account_id=account_id, cursor=cursor
+                )
+                live.update({m.guid: m.fingerprint for m in monitors})
+                if not cursor:
+                    break
+            verified += [m for m in batch if _is_verified(m, live.get(m["guid"]))]
+    return verified
+
+
+def verify_entity_tags_markers(api, markers):
+    live = {
+        entity.guid: entity.tags
+        for entity in api.iter_entities_by_guids(
+            [m["guid"] for m in markers], tags_only=True
+        )
+    }
+    verified = []
+    for marker in markers:
+        tags = live.get(marker["guid"])
+        if tags is None:
+            continue
+        expected = EntityTags(marker["tags"])
+        if marker["state"] == "absent":
+            done = not any(tags.contains_tag(tag) for tag in expected)
+        else:
+            done = all(tags.contains_tag(tag) for tag in expected)
+        if done:
+            verified.append(marker)
+    return verified
+
+
+class PropagationVerifier:
+    """
+    Checks pending markers against the API, with one batched search per kind of
+    object and account for each attempt.
+    """
+
+    def __init__(self, policy_api=None, monitor_api=None, entity_api=None):
+        self.verifiers = {
+            "alert_policy": (policy_api, verify_policy_markers),
+            "synthetic_monitor": (monitor_api, verify_monitor_markers),
+            "entity_tags": (entity_api, verify_entity_tags_markers),
+        }
+
+    def verify(self, markers):
+        """
+        Returns the keys of the markers whose changes are visible in the API.
+        """
+        by_kind = dict()
+        for marker in markers:
+            by_kind.setdefault(marker["kind"], []).append(marker)
+
+        verified = set()
+        for kind, kind_markers in by_kind.items():
+            if kind not in self.verifiers:
+                raise ValueError("Unknown propagation marker kind %s" % kind)
+            api, verify = self.verifiers[kind]
+            verified.update(marker_key(m) for m in verify(api, kind_markers))
+        return verified
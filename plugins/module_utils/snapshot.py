@@ -0,0 +1,220 @@
+"""
+Exports every alert policy, NRQL alert condition, ping synthetic monitor, and entity's
+tags in an account to a gzip compressed file of JSON lines. Objects are written as
+each search page arrives, so memory use does not grow with the size of the account.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    NrqlAlertConditionBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    write_json_lines,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.objects import (
+    PingSyntheticMonitor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KINDS = ("alert_policy", "nrql_condition", "synthetic_monitor", "entity_tags")
+
+
+class AggregateFingerprint:
+    """
+    An order independent hash of many object fingerprints. Each fingerprint is added
+    to a running sum modulo 2**256, so the result does not depend on the order the
+    search APIs return objects in, and only the sum is kept in memory.
+    """
+
+    __slots__ = ("total", "count")
+    MODULUS = 2**256
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def add(self, fingerprint: str):
+        self.total = (self.total + int(fingerprint, 16)) % self.MODULUS
+        self.count += 1
+
+    def hexdigest(self):
+        return "%064x" % self.total
+
+
+def _file_sha256(path: str, chunk_size: int = 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AccountSnapshot:
+    """
+    Streams the objects in one account from the search APIs to a snapshot file.
+    Each line of the file is {"kind": ..., "object": ...}, where object is the
+    to_json output of the object.
+
+    The manifest has the number of objects of each kind, an aggregate of their
+    fingerprints, the number of objects skipped because their type is not supported,
+    and a checksum of the file. Two snapshots of an account with the
+    same aggregate fingerprint for a kind have the same objects of that kind.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        account_id: str,
+        policy_api=None,
+        condition_api=None,
+        monitor_api=None,
+        entity_api=None,
+    ):
+        self.account_id = str(account_id)
+        self.sources = {
+            "alert_policy": (policy_api, self._iter_policies),
+            "nrql_condition": (condition_api, self._iter_conditions),
+            "synthetic_monitor": (monitor_api, self._iter_monitors),
+            "entity_tags": (entity_api, self._iter_entities),
+        }
+        self.skipped = dict()
+
+    def _iter_policies(self, api):
+        return api.iter_policies_from_query("", self.account_id)
+
+    def _iter_conditions(self, api):
+        # baseline and outlier conditions can't be exported, so they are counted and
+        # skipped instead of stopping the whole snapshot
+        for data in api.iter_condition_data_from_query("", self.account_id):
+            if not NrqlAlertConditionBase.is_supported_data(data):
+                logger.warning(
+                    "Skipping condition %s, %s conditions are not supported",
+                    data.get("id"),
+                    data.get("type"),
+                )
+                self._skip("nrql_condition")
+                continue
+            yield NrqlAlertConditionBase.from_api_data(
+                data=data, account_id=self.account_id
+            )
+
+    def _skip(self, kind: str):
+        self.skipped[kind] = self.skipped.get(kind, 0) + 1
+
+    def _iter_monitors(self, api):
+        return api.iter_monitors_from_query(
+            "domain = 'SYNTH' AND type = 'MONITOR' AND monitorType = '%s' "
+            "AND accountId = %s"
+            % (PingSyntheticMonitor.MONITOR_TYPE, int(self.account_id)),
+            self.account_id,
+        )
+
+    def _iter_entities(self, api):
+        return api.iter_entities_from_query(
+            "accountId = %s" % int(self.account_id),
+            account_id=self.account_id,
+            tags_only=True,
+        )
+
+    @staticmethod
+    def _record(kind: str, obj, aggregate: AggregateFingerprint):
+        aggregate.add(obj.fingerprint)
+        return {"kind": kind, "object": obj.to_json()}
+
+    def iter_objects(self, kind: str):
+        try:
+            api, iter_kind = self.sources[kind]
+        except KeyError:
+            raise ValueError("Unknown snapshot kind %s" % kind)
+        return iter_kind(api)
+
+    def write(self, path: str, kinds=SNAPSHOT_KINDS, compresslevel: int = 6):
+        """
+        Writes the objects of each kind to path and returns the manifest. The file is
+        written to a temporary file first and then moved into place, so an interrupted
+        export never replaces a complete snapshot.
+        """
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot.")
+        os.close(fd)
+
+        started = time.time()
+        self.skipped = dict()
+        encoder = json_compat.JsonEncoder()
+        fingerprints = {kind: AggregateFingerprint() for kind in kinds}
+        try:
+            with gzip.open(
+                tmp_path, "wt", encoding="utf-8", compresslevel=compresslevel
+            ) as fp:
+                for kind in kinds:
+                    aggregate = fingerprints[kind]
+                    count = write_json_lines(
+                        self.iter_objects(kind),
+                        fp,
+                        encoder=encoder,
+                        record=lambda obj: self._record(kind, obj, aggregate),
+                    )
+                    logger.info("Wrote %s %s objects", count, kind)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return self.manifest(path, fingerprints, started)
+
+    def manifest(self, path: str, fingerprints: dict, started: float):
+        kinds = {
+            kind: {
+                "count": aggregate.count,
+                "fingerprint": aggregate.hexdigest(),
+                "skipped": self.skipped.get(kind, 0),
+            }
+            for kind, aggregate in fingerprints.items()
+        }
+        overall = hashlib.sha256(
+            "\n".join(
+                "%s=%s" % (kind, kinds[kind]["fingerprint"]) for kind in sorted(kinds)
+            ).encode("utf-8")
+        ).hexdigest()
+        return {
+            "version": self.FORMAT_VERSION,
+            "account_id": self.account_id,
+            "path": path,
+            "started_at": started,
+            "completed_at": time.time(),
+            "sha256": _file_sha256(path),
+            "fingerprint": overall,
+            "kinds": kinds,
+        }
+
+
+def write_manifest(manifest: dict, path: str):
+    path = os.path.expanduser(path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json_compat.dumps_bytes(manifest, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str):
+    """
+    Yields (kind, object data) for each line of a snapshot file.
+    """
+    with gzip.open(os.path.expanduser(path), "rt", encoding="utf-8") as fp:
+        for line in fp:
+            if line.strip():
+                record = json_compat.loads(line)
+                yield record["kind"], record["object"]
@@ -0,0 +1,299 @@
+"""
+Keeps a local copy of the alert policies, NRQL alert conditions, and ping synthetic
+monitors in an account up to date. Every object is listed on each sync, but only the
+fields needed to notice a change are read, and changed objects are read in full.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import (
+    guid_search_queries,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import arguments
+from ansible_collections.newrelic.core.plugins.module_utils.plan import (
+    PLAN_KINDS,
+    object_state,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.objects import (
+    PingSyntheticMonitor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SYNC_KINDS = PLAN_KINDS
+_MONITOR_QUERY = "domain = 'SYNTH' AND type = 'MONITOR' AND monitorType = '%s'" % (
+    PingSyntheticMonitor.MONITOR_TYPE
+)
+
+
+def projection_fingerprint(*values):
+    """
+    A hash of a few identifying values, used to notice changes to objects that the
+    API does not report an update time for.
+    """
+    payload = json.dumps(values, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _condition_marker(condition):
+    if condition.updated_at is not None:
+        return condition.updated_at
+    # fall back to the projection if the update time isn't returned
+    return projection_fingerprint(
+        str(condition.id), condition.name, str(condition.policy_id)
+    )
+
+
+def _monitor_marker(monitor):
+    return projection_fingerprint(monitor.guid, monitor.id, monitor.name)
+
+
+class SyncState:
+    """
+    The objects read by previous syncs of one account. For each kind, objects are
+    keyed by ID (or GUID, for monitors) and stored with their fingerprint, the value
+    used to notice changes cheaply, and their attributes.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, account_id: str):
+        self.account_id = str(account_id)
+        self.synced_at = None
+        # kind -> time of the last full sync of that kind
+        self.full_synced_at = dict()
+        # kind -> key -> {"fingerprint": str, "marker": value, "state": dict}
+        self.objects = {kind: dict() for kind in SYNC_KINDS}
+
+    def is_stale(self, max_age: int, kinds=SYNC_KINDS):
+        """
+        Returns true if any of the kinds has not had a full sync in max_age seconds.
+        """
+        now = time.time()
+        return any(
+            self.full_synced_at.get(kind) is None
+            or now - self.full_synced_at[kind] > max_age
+            for kind in kinds
+        )
+
+    def to_json(self):
+        return {
+            "version": self.FORMAT_VERSION,
+            "account_id": self.account_id,
+            "synced_at": self.synced_at,
+            "full_synced_at": self.full_synced_at,
+            "objects": self.objects,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict):
+        obj = cls(account_id=data["account_id"])
+        obj.synced_at = data.get("synced_at")
+        obj.full_synced_at = data.get("full_synced_at") or dict()
+        obj.objects.update(data.get("objects") or {})
+        return obj
+
+    def save(self, path: str):
+        """
+        Writes the state to a file. The file is replaced atomically so a concurrent
+        reader never sees a partial state.
+        """
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".sync_state.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json_compat.dumps_bytes(self.to_json()))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, account_id: str):
+        """
+        Reads a state from a file. Returns an empty state if the file does not exist,
+        can't be read, or is for a different account.
+        """
+        path = os.path.expanduser(path)
+        try:
+            with open(path, "rb") as f:
+                data = json_compat.loads(f.read())
+        except FileNotFoundError:
+            return cls(account_id=account_id)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable sync state %s: %s", path, e)
+            return cls(account_id=account_id)
+
+        if data.get("version") != cls.FORMAT_VERSION or str(
+            data.get("account_id")
+        ) != str(account_id):
+            logger.info("Sync state %s does not match this account, resyncing", path)
+            return cls(account_id=account_id)
+        return cls.from_json(data)
+
+
+class SyncChanges:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.deleted = []
+
+    def __bool__(self):
+        return bool(self.created or self.updated or self.deleted)
+
+    def to_json(self):
+        return {
+            "created": sorted(self.created),
+            "updated": sorted(self.updated),
+            "deleted": sorted(self.deleted),
+        }
+
+
+class IncrementalSync:
+    """
+    Updates a SyncState from the API.
+
+    - Policies only have a few small fields, so they are read in full and compared
+      by fingerprint.
+    - Conditions are first listed with only their IDs, policies, and update times.
+      Only the policies with new or updated conditions are then searched in full.
+      The condition search can't filter by update time, so every condition is still
+      listed, and the listing is what finds deleted conditions.
+    - Condition types that objects can't be created for (baseline, outlier) are
+      skipped with a warning.
+    - Monitors don't have an update time, so they are listed with only their
+      identifying fields. Monitors that are new or whose projection changed are then
+      read in full, in batches of GUIDs.
+
+    Any kind can be read in full with full=True, which also catches monitor changes
+    that the projection can't see.
+    """
+
+    def __init__(
+        self, state: SyncState, policy_api=None, condition_api=None, monitor_api=None
+    ):
+        self.state = state
+        self.account_id = state.account_id
+        self.policy_api = policy_api
+        self.condition_api = condition_api
+        self.monitor_api = monitor_api
+
+    def sync(self, kinds=SYNC_KINDS, full: bool = False):
+        """
+        Returns the SyncChanges for each kind.
+        """
+        started = time.time()
+        changes = dict()
+        for kind in kinds:
+            changes[kind] = getattr(self, "_sync_%s" % kind)(full)
+            logger.info("Synced %s: %s", kind, changes[kind].to_json())
+            if full:
+                self.state.full_synced_at[kind] = started
+        self.state.synced_at = started
+        return changes
+
+    def _store(self, kind: str, key: str, obj, marker, changes: SyncChanges):
+        stored = self.state.objects[kind].get(key)
+        if stored is None:
+            changes.created.append(key)
+        elif stored["fingerprint"] != obj.fingerprint:
+            changes.updated.append(key)
+        self.state.objects[kind][key] = dict(
+            fingerprint=obj.fingerprint, marker=marker, state=object_state(obj)
+        )
+
+    def _remove_missing(self, kind: str, seen: set, changes: SyncChanges):
+        for key in set(self.state.objects[kind]).difference(seen):
+            del self.state.objects[kind][key]
+            changes.deleted.append(key)
+
+    def _sync_alert_policy(self, full: bool):
+        changes = SyncChanges()
+        seen = set()
+        for policy in self.policy_api.iter_policies_from_query("", self.account_id):
+            key = str(policy.id)
+            seen.add(key)
+            self._store("alert_policy", key, policy, policy.fingerprint, changes)
+        self._remove_missing("alert_policy", seen, changes)
+        return changes
+
+    def _sync_nrql_condition(self, full: bool):
+        changes = SyncChanges()
+        stored = self.state.objects["nrql_condition"]
+        seen = set()
+        stale_policies = set()
+        for condition in self.condition_api.iter_conditions_from_query(
+            "",
+            self.account_id,
+            fields=None if full else ["updated_at"],
+            skip_unsupported=True,
+        ):
+            key = str(condition.id)
+            seen.add(key)
+            marker = _condition_marker(condition)
+            if full:
+                self._store("nrql_condition", key, condition, marker, changes)
+            elif key not in stored or stored[key]["marker"] != marker:
+                stale_policies.add(str(condition.policy_id))
+
+        for policy_id in sorted(stale_policies):
+            for condition in self.condition_api.iter_conditions_from_query(
+                arguments(dict(policyId=policy_id)),
+                self.account_id,
+                skip_unsupported=True,
+            ):
+                key = str(condition.id)
+                if key not in seen:
+                    # created after the listing, and picked up by the next sync
+                    continue
+                self._store(
+                    "nrql_condition",
+                    key,
+                    condition,
+                    _condition_marker(condition),
+                    changes,
+                )
+
+        self._remove_missing("nrql_condition", seen, changes)
+        return changes
+
+    def _sync_synthetic_monitor(self, full: bool):
+        changes = SyncChanges()
+        stored = self.state.objects["synthetic_monitor"]
+        query = "%s AND accountId = %s" % (_MONITOR_QUERY, int(self.account_id))
+        seen = set()
+        stale_guids = []
+        for monitor in self.monitor_api.iter_monitors_from_query(
+            query, self.account_id, fields=None if full else ["id"]
+        ):
+            seen.add(monitor.guid)
+            marker = _monitor_marker(monitor)
+            if full:
+                self._store("synthetic_monitor", monitor.guid, monitor, marker, changes)
+            elif monitor.guid not in stored or stored[monitor.guid]["marker"] != marker:
+                stale_guids.append(monitor.guid)
+
+        for guid_query in guid_search_queries(stale_guids):
+            for monitor in self.monitor_api.iter_monitors_from_query(
+                "%s AND %s" % (_MONITOR_QUERY, guid_query), self.account_id
+            ):
+                self._store(
+                    "synthetic_monitor",
+                    monitor.guid,
+                    monitor,
+                    _monitor_marker(monitor),
+                    changes,
+                )
+
+        self._remove_missing("synthetic_monitor", seen, changes)
+        return changes
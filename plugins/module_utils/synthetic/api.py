@@ -5,8 +5,15 @@ from ansible_collections.newrelic.core.plugins.module_utils.synthetic.objects im
     SyntheticMonitorBase,
     PingSyntheticMonitor,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import (
+    search_literal,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import string
 from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    DEFAULT_REQUEST_TIMEOUT,
     NerdGraphApiBase,
+    actor_document,
+    cursor_argument,
 )
 
 
@@ -30,18 +37,22 @@ class SyntheticMonitorApi(NerdGraphApiBase):
         api_key: str,
         wait_for_propegation: bool = True,
         propegation_timeout: int = 10,
+        compress_requests: bool = False,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
     ):
         super().__init__(
             api_key=api_key,
             wait_for_propegation=wait_for_propegation,
             propegation_timeout=propegation_timeout,
+            compress_requests=compress_requests,
+            request_timeout=request_timeout,
         )
 
     def get_monitor_by_name_and_account(self, name, account_id):
         existing_monitors, _ = (  # pylint: disable=disallowed-name
             self.get_monitors_from_query(
-                entity_search_query="domain = 'SYNTH' AND type = 'MONITOR' AND name = '%s'"
-                % name,
+                entity_search_query="domain = 'SYNTH' AND type = 'MONITOR' AND name = %s"
+                % search_literal(name),
                 account_id=account_id,
             )
         )
@@ -54,25 +65,41 @@ class SyntheticMonitorApi(NerdGraphApiBase):
             raise Exception("Multiple synthetic monitors matched name query....")
 
     def get_monitors_from_query(
-        self, entity_search_query: str, account_id: str, cursor: str = ""
+        self,
+        entity_search_query: str,
+        account_id: str,
+        cursor: str = "",
+        fields: list = None,
     ) -> list:
+        """
+        Returns one page of monitors matching the search, and the cursor for the next
+        page. If fields is given, only those monitor attributes are fetched.
+        """
         logger.info("Getting monitors from search '%s'", entity_search_query)
-        query_template = self.jinja_env.from_string(
-            SyntheticMonitorBase.J2_SEARCH_QUERY
-        )
-        query = query_template.render(
-            entity_search_query=entity_search_query,
-            account_id=account_id,
-            cursor=cursor,
+        query = actor_document(
+            [
+                SyntheticMonitorBase.SEARCH_FIELD
+                % dict(
+                    entity_search_query=string(entity_search_query),
+                    cursor=cursor_argument(cursor, " (cursor: %s)"),
+                    selection=SyntheticMonitorBase.search_selection(fields),
+                )
+            ]
         )
-        r = self.run_query(query=query)
-        try:
-            query_monitors = r["data"]["actor"]["entitySearch"]["results"]["entities"]
-            next_cursor = r["data"]["actor"]["entitySearch"]["results"]["nextCursor"]
-        except KeyError as e:
-            logger.fatal("Encountered key error on '%s'", e)
-            logger.fatal("response=%s", r)
-            raise Exception("Query response did not match excepted format")
+        with self.trace_page("entitySearch", account_id, cursor) as span:
+            r = self.run_query(query=query)
+            try:
+                query_monitors = r["data"]["actor"]["entitySearch"]["results"][
+                    "entities"
+                ]
+                next_cursor = r["data"]["actor"]["entitySearch"]["results"][
+                    "nextCursor"
+                ]
+            except KeyError as e:
+                logger.fatal("Encountered key error on '%s'", e)
+                logger.fatal("response=%s", r)
+                raise Exception("Query response did not match excepted format")
+            span.set_attribute("results", len(query_monitors))
 
         logger.info(
             "Found %s monitors. Next cursor is %s", len(query_monitors), next_cursor
@@ -82,6 +109,21 @@ class SyntheticMonitorApi(NerdGraphApiBase):
             found_monitors += [self.__create_monitor_from_data(monitor_data)]
         return found_monitors, next_cursor
 
+    def iter_monitors_from_query(
+        self, entity_search_query: str, account_id: str, fields: list = None
+    ):
+        """
+        Yields every monitor matching the search, following the result cursor.
+        """
+        cursor = ""
+        while True:
+            monitors, cursor = self.get_monitors_from_query(
+                entity_search_query, account_id, cursor=cursor, fields=fields
+            )
+            yield from monitors
+            if not cursor:
+                return
+
     def __create_monitor_from_data(self, monitor_data):
         if monitor_data["monitorType"] == PingSyntheticMonitor.MONITOR_TYPE:
             return PingSyntheticMonitor.from_api_data(monitor_data)
@@ -92,16 +134,14 @@ class SyntheticMonitorApi(NerdGraphApiBase):
         logger.info(
             "Deleting synthetic monitor %s with GUID %s", monitor.name, monitor.guid
         )
-        query_template = self.jinja_env.from_string(monitor.J2_DELETE_QUERY)
-        query = query_template.render(monitor=monitor)
+        query = monitor.delete_mutation()
         r = self.run_query(query=query)
         self.__wait_for_monitor_to_not_exist(monitor=monitor)
         return r["data"]["syntheticsDeleteMonitor"]["deletedGuid"]
 
     def create_monitor(self, monitor: SyntheticMonitorBase):
         logger.info("Creating synthetic monitor %s", monitor.name)
-        query_template = self.jinja_env.from_string(monitor.J2_CREATE_QUERY)
-        query = query_template.render(monitor=monitor)
+        query = monitor.create_mutation()
         r = self.run_query(query=query)
         logger.debug(r)
         self.raise_for_errors(
@@ -119,8 +159,7 @@ class SyntheticMonitorApi(NerdGraphApiBase):
         logger.info(
             "Updating synthetic monitor %s with GUID %s", monitor.name, monitor.guid
         )
-        query_template = self.jinja_env.from_string(monitor.J2_UPDATE_QUERY)
-        query = query_template.render(monitor=monitor)
+        query = monitor.update_mutation()
         r = self.run_query(query=query)
         logger.debug(r)
         monitor.guid = r["data"]["syntheticsUpdateSimpleBrowserMonitor"]["monitor"][
@@ -138,34 +177,38 @@ class SyntheticMonitorApi(NerdGraphApiBase):
         """
         if not self.wait_for_propegation:
             return
-        _time = 0
-        remote_monitor_def = None
-        while monitor != remote_monitor_def:
-            if _time > self.propegation_timeout:
-                raise Exception(
-                    "Timedout waiting for new monitor to exist in New Relic API"
+        with self.trace_propagation_wait("synthetic_monitor", monitor.account_id):
+            _time = 0
+            remote_monitor_def = None
+            while monitor != remote_monitor_def:
+                if _time > self.propegation_timeout:
+                    raise Exception(
+                        "Timedout waiting for new monitor to exist in New Relic API"
+                    )
+                time.sleep(3)
+                _time += 3
+                remote_monitor_def = self.get_monitor_by_name_and_account(
+                    name=monitor.name, account_id=monitor.account_id
                 )
-            time.sleep(3)
-            _time += 3
-            remote_monitor_def = self.get_monitor_by_name_and_account(
-                name=monitor.name, account_id=monitor.account_id
-            )
 
     def __wait_for_monitor_to_not_exist(self, monitor):
         if not self.wait_for_propegation:
             return
-        _time = 0
-        remote_monitor_def = True
-        while remote_monitor_def:
-            if _time > self.propegation_timeout:
-                raise Exception(
-                    "Timedout waiting for new monitor to be deleted in New Relic API"
+        with self.trace_propagation_wait(
+            "synthetic_monitor_deletion", monitor.account_id
+        ):
+            _time = 0
+            remote_monitor_def = True
+            while remote_monitor_def:
+                if _time > self.propegation_timeout:
+                    raise Exception(
+                        "Timedout waiting for new monitor to be deleted in New Relic API"
+                    )
+                time.sleep(3)
+                _time += 3
+                remote_monitor_def = self.get_monitor_by_name_and_account(
+                    name=monitor.name, account_id=monitor.account_id
                 )
-            time.sleep(3)
-            _time += 3
-            remote_monitor_def = self.get_monitor_by_name_and_account(
-                name=monitor.name, account_id=monitor.account_id
-            )
 
     def raise_for_errors(self, errors, monitor, action):
         if not errors:
@@ -3,6 +3,10 @@ import logging
 from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
     Entity,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import (
+    Enum,
+    enum,
+)
 from ansible_collections.newrelic.core.plugins.module_utils.synthetic.query_templates import (
     SyntheticMonitorBaseClassTemplates,
     PingSyntheticMonitorTemplates,
@@ -13,31 +17,55 @@ logger = logging.getLogger(__name__)
 
 
 class SyntheticMonitorBase(Entity):
-    J2_SEARCH_QUERY = SyntheticMonitorBaseClassTemplates.j2_get_from_search()
-    J2_DELETE_QUERY = SyntheticMonitorBaseClassTemplates.j2_delete()
+    __slots__ = (
+        "monitor_type",
+        "url",
+        "period",
+        "id",
+        "public_locations",
+        "private_locations",
+        "enabled",
+        "validation_string",
+        "verify_ssl",
+    )
+    _equality_attrs = Entity._equality_attrs + (
+        "entity_type",
+        "url",
+        "period",
+        "public_locations",
+        "private_locations",
+        "enabled",
+        "verify_ssl",
+        "monitor_type",
+        # validation string cannot be checked on existing monitors, so it is null
+        # unless explicitly set
+        "validation_string",
+    )
+    SEARCH_FIELD = SyntheticMonitorBaseClassTemplates.search_field()
     PUBLIC_LOCATION_NAMES_TO_IDS = {
         "San Francisco, CA, USA": "AWS_US_WEST_1",
         "Washington, DC, USA": "AWS_US_EAST_1",
         "Columbus, OH, USA": "AWS_US_EAST_2",
     }
+    _unordered_attrs = frozenset(["public_locations", "private_locations"])
+    _search_fields = {
+        "name": ("name",),
+        "account_id": ("accountId",),
+        "guid": ("guid",),
+        "id": ("monitorId",),
+        "monitor_type": ("monitorType",),
+        "url": ("monitoredUrl",),
+        "period": ("period",),
+        "enabled": ("monitorSummary.status",),
+        "public_locations": ("tags.key", "tags.values"),
+        "private_locations": ("tags.key", "tags.values"),
+        "verify_ssl": ("tags.key", "tags.values"),
+        "validation_string": ("tags.key", "tags.values"),
+    }
+    _required_search_fields = ("name", "account_id", "guid", "monitor_type")
 
     def __init__(self, name: str, account_id: str, id: str = None, guid: str = None):
         super().__init__(name=name, account_id=account_id, guid=guid)
-        self._equality_attrs.update(
-            [
-                "entity_type",
-                "url",
-                "period",
-                "public_locations",
-                "private_locations",
-                "enabled",
-                "verify_ssl",
-                "monitor_type",
-                # validation string cannot be checked on existing monitors, so it is null
-                # unless explicitly set
-                "validation_string",
-            ]
-        )
         self.entity_type = "MONITOR"
         self.monitor_type = None
         self.url = ""
@@ -73,18 +101,22 @@ class SyntheticMonitorBase(Entity):
     def from_api_data(cls, data):
         obj = cls(data["name"], account_id=data["accountId"])
 
-        obj.enabled = True if data["monitorSummary"]["status"] == "ENABLED" else False
-        obj.id = data["monitorId"]
+        # searches can select a subset of fields, so anything but the identity may
+        # be missing. Missing fields keep their default values.
+        if data.get("monitorSummary"):
+            obj.enabled = data["monitorSummary"]["status"] == "ENABLED"
+        obj.id = data.get("monitorId")
         obj.guid = data["guid"]
-        obj.url = data["monitoredUrl"]
-        logger.debug(
-            "Creating monitor from api data and got period of %s", data["period"]
-        )
-        obj.period = SyntheticMonitorBase.period_value_to_id(data["period"])
+        obj.url = data.get("monitoredUrl", obj.url)
+        if data.get("period") is not None:
+            logger.debug(
+                "Creating monitor from api data and got period of %s", data["period"]
+            )
+            obj.period = SyntheticMonitorBase.period_value_to_id(data["period"])
 
-        for tag in data["tags"]:
+        for tag in data.get("tags") or []:
             if tag["key"] == "privateLocation":
-                obj.private_locations = {tag["values"]}
+                obj.private_locations = list(tag["values"])
                 continue
             if tag["key"] == "publicLocation":
                 obj.public_locations = [
@@ -100,30 +132,44 @@ class SyntheticMonitorBase(Entity):
 
         return obj
 
-    def __eq__(self, other):
-        if not isinstance(other, SyntheticMonitorBase):
-            return False
-
-        for attr in self._equality_attrs:
-            if attr in ("public_locations", "private_locations"):
-                if set(getattr(self, attr)) == set(getattr(other, attr)):
-                    continue
-            if getattr(self, attr) == getattr(other, attr):
-                continue
-
-            logger.debug(
-                "%s   -   %s != %s", attr, getattr(self, attr), getattr(other, attr)
-            )
-            return False
-
-        return True
+    def delete_mutation(self):
+        return SyntheticMonitorBaseClassTemplates.delete_mutation(self)
 
 
 class PingSyntheticMonitor(SyntheticMonitorBase):
+    __slots__ = ()
     MONITOR_TYPE = "SIMPLE"
-    J2_CREATE_QUERY = PingSyntheticMonitorTemplates.j2_create()
-    J2_UPDATE_QUERY = PingSyntheticMonitorTemplates.j2_update()
 
     def __init__(self, name: str, account_id: str):
         super().__init__(name, account_id)
         self.monitor_type = PingSyntheticMonitor.MONITOR_TYPE
+
+    def graphql_input(self):
+        """
+        The monitor as a SyntheticsCreateSimpleMonitorInput object.
+        """
+        locations = dict()
+        if self.public_locations:
+            locations["public"] = list(self.public_locations)
+        if self.private_locations:
+            locations["private"] = [
+                dict(guid=location_guid) for location_guid in self.private_locations
+            ]
+        advanced_options = dict()
+        if self.validation_string:
+            advanced_options["responseValidationText"] = self.validation_string
+        advanced_options["useTlsValidation"] = self.verify_ssl
+        return dict(
+            locations=locations,
+            name=self.name,
+            period=enum(self.period),
+            status=Enum("ENABLED" if self.enabled else "DISABLED"),
+            uri=self.url,
+            advancedOptions=advanced_options,
+        )
+
+    def create_mutation(self):
+        return PingSyntheticMonitorTemplates.create_mutation(self)
+
+    def update_mutation(self):
+        return PingSyntheticMonitorTemplates.update_mutation(self)
@@ -1,51 +1,44 @@
 # Ansible search paths are really obscure, especially around text files. So instead we can store these
-# jinja templates as strings in a python file
+# documents in a python file
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import (
+    Field,
+    mutation,
+)
+
+
+MONITOR_RESULT_SELECTION = ("errors { description type }", "monitor { guid id name }")
+
+
 class SyntheticMonitorBaseClassTemplates:
     def __init__(self):
         pass
 
     @staticmethod
-    def j2_delete():
-        return """mutation {
-            syntheticsDeleteMonitor (guid: "{{ monitor.guid }}") {
-                deletedGuid
-            }
-        }"""
+    def delete_mutation(monitor):
+        return mutation(
+            Field(
+                "syntheticsDeleteMonitor",
+                args=dict(guid=monitor.guid),
+                selection=("deletedGuid",),
+            )
+        )
 
     @staticmethod
-    def j2_get_from_search():
-        return """{
-            actor {
-                entitySearch(query: "{{ entity_search_query }}") {
-                    results {% if cursor %}(cursor: "{{ cursor }}") {% endif %}{
-                        nextCursor
-                        entities {
-                            ... on SyntheticMonitorEntityOutline {
-                            guid
-                            name
-                            accountId
-                            entityType
-                            monitorId
-                            monitorType
-                            monitoredUrl
-                            period
-                            monitorSummary {
-                                locationsRunning
-                                status
-                                locationsFailing
-                                successRate
-                            }
-                            tags {
-                                key
-                                values
-                            }
-                            type
-                            }
+    def search_field():
+        """
+        The entitySearch field for monitors. Search documents only substitute plain
+        values, so this is a %-format string.
+        """
+        return """entitySearch(query: %(entity_search_query)s) {
+                results%(cursor)s {
+                    nextCursor
+                    entities {
+                        ... on SyntheticMonitorEntityOutline {
+                            %(selection)s
                         }
                     }
                 }
-            }
-        }"""
+            }"""
 
 
 class PingSyntheticMonitorTemplates:
@@ -53,58 +46,23 @@ class PingSyntheticMonitorTemplates:
         pass
 
     @staticmethod
-    def j2_create():
-        return (
-            "mutation {"
-            "  syntheticsCreateSimpleMonitor ("
-            "    accountId: {{ monitor.account_id }},"
-            "    %s"
-            "  ) {"
-            "    errors { description type }"
-            "    monitor { guid id name }"
-            "  }"
-            "}" % PingSyntheticMonitorTemplates.__monitor_config()
-        )
-
-    @staticmethod
-    def j2_update():
-        return (
-            "mutation {"
-            "  syntheticsUpdateSimpleBrowserMonitor ("
-            '    guid: "{{ monitor.guid }}"'
-            "    %s"
-            "  ) {"
-            "    errors { description type }"
-            "    monitor { guid id name }"
-            "  }"
-            "}" % PingSyntheticMonitorTemplates.__monitor_config()
+    def create_mutation(monitor):
+        return mutation(
+            Field(
+                "syntheticsCreateSimpleMonitor",
+                args=dict(
+                    accountId=int(monitor.account_id), monitor=monitor.graphql_input()
+                ),
+                selection=MONITOR_RESULT_SELECTION,
+            )
         )
 
     @staticmethod
-    def __monitor_config():
-        return (
-            "monitor: {"
-            "  locations: {"
-            "    {% if monitor.public_locations %}"
-            "    public: {{ monitor.public_locations | tojson }}"
-            "    {% endif %}"
-            "    {% if monitor.private_locations %}"
-            "    private: ["
-            "      {% for location_guid in monitor.private_locations %}"
-            '      {guid: "{{ location_guid }}"}'
-            "      {% endfor %}"
-            "    ]"
-            "    {% endif %}"
-            "  },"
-            '  name: "{{ monitor.name }}",'
-            "  period: {{ monitor.period }},"
-            "  status: {{ 'ENABLED' if monitor.enabled else 'DISABLED' }},"
-            '  uri: "{{ monitor.url }}",'
-            "  advancedOptions: {"
-            "    {% if monitor.validation_string %}"
-            '    responseValidationText: "{{ monitor.validation_string }}",'
-            "    {% endif %}"
-            "    useTlsValidation: {{ monitor.verify_ssl | tojson }}"
-            "  }"
-            "}"
+    def update_mutation(monitor):
+        return mutation(
+            Field(
+                "syntheticsUpdateSimpleBrowserMonitor",
+                args=dict(guid=monitor.guid, monitor=monitor.graphql_input()),
+                selection=MONITOR_RESULT_SELECTION,
+            )
         )
@@ -0,0 +1,188 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+
+logger = logging.getLogger(__name__)
+
+_OPERATION_RE = re.compile(r"(\w+)\s*\(")
+_ACCOUNT_RE = re.compile(r"(?:accountId:|account\(id:)\s*(\d+)")
+
+
+class NoopSpan:
+    """
+    Span returned when tracing is disabled. It is a shared singleton so
+    starting and ending a span costs no allocations.
+    """
+
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = NoopSpan()
+
+
+class NoopTracer:
+    enabled = False
+
+    def span(self, name, **attributes):
+        return _NOOP_SPAN
+
+    def close(self):
+        pass
+
+
+class Span:
+    recording = True
+
+    def __init__(self, tracer, name, trace_id, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.status = "ok"
+        self.start_time = None
+        self.end_time = None
+        self._start_counter = None
+        self._ended = False
+        self._stack = None
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self._start_counter = time.perf_counter()
+        self._stack = self.tracer._thread_stack()
+        self._stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error"] = "%s: %s" % (exc_type.__name__, exc)
+        self.end()
+        return False
+
+    def end(self):
+        if self._ended:
+            return
+        self._ended = True
+        self.end_time = time.time()
+        duration = time.perf_counter() - self._start_counter
+        self.attributes.setdefault("duration_ms", round(duration * 1000, 3))
+        if self._stack is not None and self in self._stack:
+            self._stack.remove(self)
+        self.tracer.export(self)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_json(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlFileTracer:
+    """
+    Records spans and appends them, one JSON document per line, to a local file.
+    The trace ID can be shared between tasks by setting the NR_TRACE_ID environment
+    variable, which lets an entire playbook run be correlated.
+
+    Each thread has its own stack of open spans. Spans started in a worker thread
+    with no open spans of its own are children of the innermost span of the thread
+    that created the tracer.
+    """
+
+    enabled = True
+
+    def __init__(self, path: str, trace_id: str = None):
+        self.path = os.path.expanduser(path)
+        self.trace_id = trace_id or os.environ.get("NR_TRACE_ID") or uuid.uuid4().hex
+        self._owner = threading.get_ident()
+        self._stacks = dict()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _thread_stack(self):
+        return self._stacks.setdefault(threading.get_ident(), [])
+
+    def span(self, name, **attributes):
+        stack = self._thread_stack() or self._stacks.get(self._owner) or []
+        parent_id = stack[-1].span_id if stack else None
+        return Span(self, name, self.trace_id, parent_id, attributes)
+
+    def export(self, span):
+        line = json_compat.dumps(span.to_json(), default=str) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a")
+                self._file.write(line)
+                self._file.flush()
+            except OSError as e:
+                logger.warning("Unable to write span to %s: %s", self.path, e)
+
+    def close(self):
+        for stack in list(self._stacks.values()):
+            while stack:
+                stack[-1].end()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_tracer = NoopTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer(tracer):
+    global _tracer
+    if tracer is not _tracer:
+        _tracer.close()
+    _tracer = tracer
+    return _tracer
+
+
+def configure_tracing(trace_file: str = None):
+    if trace_file:
+        return set_tracer(JsonlFileTracer(trace_file))
+    return set_tracer(NoopTracer())
+
+
+def query_operation(query: str):
+    """
+    Returns the first GraphQL field with arguments in a query, which is the
+    operation being performed (policiesSearch, alertsPolicyCreate, etc).
+    """
+    for match in _OPERATION_RE.finditer(query):
+        if match.group(1) != "account":
+            return match.group(1)
+    return "query"
+
+
+def query_account_id(query: str):
+    match = _ACCOUNT_RE.search(query)
+    return match.group(1) if match else None
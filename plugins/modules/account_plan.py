@@ -0,0 +1,163 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: account_plan
+short_description: Plans the changes needed to reach a desired state, without querying New Relic
+description:
+    - Compares a desired state for alert policies, NRQL alert conditions, and ping synthetic monitors with
+      a dump of the live objects in an account, and writes the creates, updates, and deletes needed to a plan file.
+    - No requests are sent to New Relic, so large accounts can be planned in seconds. Use
+      M(newrelic.core.account_plan_apply) to apply the plan.
+    - Objects are matched by name. Conditions are matched by name and policy.
+    - Attributes that a desired object leaves out are taken from the matching live object.
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    live_path:
+        description:
+            - The path to a JSON file with the live objects in the account. The file may be gzip compressed if
+              its name ends with C(.gz).
+            - The file has a list for each of the keys C(alert_policy), C(nrql_condition), and C(synthetic_monitor).
+              Each list has the raw NerdGraph data for the objects, as returned by the search queries.
+        required: true
+        type: path
+    desired:
+        description:
+            - The desired objects. Each of the keys C(alert_policy), C(nrql_condition), and C(synthetic_monitor)
+              may have a list of objects, using the attribute names returned by the info modules.
+            - Conditions must have either C(policy_id) or C(policy_name). If the policy does not exist yet,
+              the policy ID is filled in when the plan is applied.
+            - Only the kinds that are given are planned.
+        required: true
+        type: dict
+    plan_path:
+        description:
+            - The path of the plan file to write.
+        required: true
+        type: path
+    prune:
+        description:
+            - If true, live objects of a planned kind that are not in O(desired) are deleted.
+        required: false
+        type: bool
+        default: false
+"""
+
+EXAMPLES = r"""
+- name: Plan the alert changes
+  newrelic.core.account_plan:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    live_path: /tmp/live.json.gz
+    plan_path: /tmp/plan.json
+    desired:
+      alert_policy:
+        - name: payments
+          incident_preference: PER_CONDITION
+      nrql_condition:
+        - name: payments errors
+          policy_name: payments
+          enabled: true
+          nrql_query: SELECT count(*) FROM TransactionError WHERE appName = 'payments'
+          data_aggregation_window: 60
+          data_aggregation_method: EVENT_FLOW
+          data_aggregation_delay: 120
+          incident_terms:
+            - priority: CRITICAL
+              operator: ABOVE
+              threshold: 10
+              duration: 300
+              occurrences: ALL
+"""
+
+RETURN = r"""
+summary:
+    description: The number of objects to create, update, delete, and leave unchanged for each kind
+    type: dict
+    returned: on success
+    sample: {
+        "alert_policy": {"create": 1, "update": 0, "delete": 0, "unchanged": 12},
+        "nrql_condition": {"create": 1, "update": 3, "delete": 0, "unchanged": 5998}
+    }
+actions:
+    description: The number of planned creates, updates, and deletes
+    type: int
+    returned: on success
+    sample: 5
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+import logging
+
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.plan import (
+    Planner,
+    live_objects_from_dump,
+    load_json_file,
+    write_plan,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccountPlanModule(ModuleBase):
+    def plan(self):
+        live = live_objects_from_dump(
+            load_json_file(self.params["live_path"]), self.params["account_id"]
+        )
+        planner = Planner(self.params["account_id"], live)
+        return planner.plan(self.params["desired"], prune=self.params["prune"])
+
+
+def main():
+    module_args = {
+        **ModuleBase.shared_argument_spec(),
+        **dict(
+            live_path=dict(type="path", required=True),
+            desired=dict(type="dict", required=True),
+            plan_path=dict(type="path", required=True),
+            prune=dict(type="bool", required=False, default=False),
+        ),
+    }
+
+    # seed the result dict in the object
+    result = dict(changed=False)
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    nr_module = AccountPlanModule(module)
+    try:
+        plan = nr_module.plan()
+        result["summary"] = plan["summary"]
+        result["actions"] = len(plan["actions"])
+        result["changed"] = bool(plan["actions"])
+        if not module.check_mode:
+            write_plan(plan, module.params["plan_path"])
+    except Exception as e:
+        nr_module.exit_with_exception(result, e)
+
+    nr_module.exit(result)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.NOTSET)
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: account_plan_apply
+short_description: Applies a plan written by the account_plan module
+description:
+    - Runs the creates, updates, and deletes in a plan file written by M(newrelic.core.account_plan).
+      Nothing else in the account is read or changed.
+    - Changes of the same kind are sent in batches, as aliased fields of a single mutation.
+    - Policies are created before their conditions, and deleted after them.
+    - Each change that is applied is marked in the plan file, so if some changes fail, running this module
+      again with the same plan only sends the changes that are left.
+    - This module does not wait for changes to be visible in the API. Use M(newrelic.core.propagation_verify)
+      or a new dump of the account to confirm them.
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    plan_path:
+        description:
+            - The path of the plan file to apply.
+        required: true
+        type: path
+    batch_size:
+        description:
+            - The maximum number of changes to send in one request.
+        required: false
+        type: int
+        default: 25
+"""
+
+EXAMPLES = r"""
+- name: Apply the planned alert changes
+  newrelic.core.account_plan_apply:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    plan_path: /tmp/plan.json
+"""
+
+RETURN = r"""
+applied:
+    description:
+        - The number of objects changed for each kind and operation.
+        - Changes that were applied by an earlier run of the same plan are not counted.
+    type: dict
+    returned: always
+    sample: {
+        "alert_policy": {"create": 1},
+        "nrql_condition": {"create": 1, "update": 3}
+    }
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+import logging
+
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.plan import (
+    PlanExecutor,
+    read_plan,
+    write_plan,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.api import (
+    SyntheticMonitorApi,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccountPlanApplyModule(ModuleBase):
+    def __init__(self, module):
+        super().__init__(module)
+        api_args = dict(
+            api_key=self.params["api_key"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+        )
+        self.executor = PlanExecutor(
+            account_id=self.params["account_id"],
+            policy_api=AlertPolicyApi(**api_args),
+            condition_api=NrqlAlertConditionApi(**api_args),
+            monitor_api=SyntheticMonitorApi(**api_args),
+            batch_size=self.params["batch_size"],
+        )
+
+    def run(self, result):
+        plan = read_plan(self.params["plan_path"])
+        result["changed"] = any(not a.get("applied") for a in plan["actions"])
+        if self.module.check_mode:
+            result["applied"] = {}
+            return
+        try:
+            self.executor.apply(plan)
+        finally:
+            result["applied"] = self.executor.applied
+            if self.executor.applied:
+                write_plan(plan, self.params["plan_path"])
+
+
+def main():
+    module_args = {
+        **ModuleBase.shared_argument_spec(),
+        **dict(
+            plan_path=dict(type="path", required=True),
+            batch_size=dict(type="int", required=False, default=25),
+        ),
+    }
+
+    # seed the result dict in the object
+    result = dict(changed=False, applied={})
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    nr_module = AccountPlanApplyModule(module)
+    try:
+        nr_module.run(result)
+    except Exception as e:
+        nr_module.exit_with_exception(result, e)
+
+    nr_module.exit(result)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.NOTSET)
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: account_snapshot
+short_description: Exports the alerts, monitors, and entity tags in a New Relic account to a file
+description:
+    - Writes every alert policy, NRQL alert condition, ping synthetic monitor, and entity's tags in an
+      account to a gzip compressed file, with one JSON document per line.
+    - Objects are written as they are read from the search APIs, so memory use does not depend on
+      the size of the account.
+    - A manifest is written next to the snapshot with the number of objects of each kind and an
+      aggregate fingerprint for each kind. The aggregate fingerprints do not depend on the order
+      objects are returned in, so two snapshots can be compared using only their manifests.
+    - In check mode, nothing is read or written.
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    path:
+        description:
+            - The path of the snapshot file to write. An existing file is replaced.
+        required: true
+        type: path
+    manifest_path:
+        description:
+            - The path of the manifest file to write.
+            - By default, this is O(path) with C(.manifest.json) appended.
+        required: false
+        type: path
+    kinds:
+        description:
+            - The kinds of objects to export.
+        required: false
+        type: list
+        elements: str
+        choices: [alert_policy, nrql_condition, synthetic_monitor, entity_tags]
+        default: [alert_policy, nrql_condition, synthetic_monitor, entity_tags]
+    compression_level:
+        description:
+            - The gzip compression level, from 1 (fastest) to 9 (smallest).
+        required: false
+        type: int
+        default: 6
+"""
+
+EXAMPLES = r"""
+- name: Export the account
+  newrelic.core.account_snapshot:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    path: /backups/newrelic/111111.ndjson.gz
+
+- name: Export only the alert policies and conditions
+  newrelic.core.account_snapshot:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    path: /backups/newrelic/111111-alerts.ndjson.gz
+    kinds:
+      - alert_policy
+      - nrql_condition
+"""
+
+RETURN = r"""
+manifest:
+    description:
+        - The snapshot manifest.
+        - For each kind, RV(manifest.kinds) has the number of objects written, an aggregate of their
+          fingerprints, and the number of objects skipped because their type is not supported, such as
+          baseline and outlier NRQL conditions.
+    type: dict
+    returned: when not in check mode
+    sample: {
+        "version": 1,
+        "account_id": "111111",
+        "path": "/backups/newrelic/111111.ndjson.gz",
+        "manifest_path": "/backups/newrelic/111111.ndjson.gz.manifest.json",
+        "started_at": 1717171717.0,
+        "completed_at": 1717171777.0,
+        "sha256": "5d41...",
+        "fingerprint": "0f3c...",
+        "kinds": {
+            "alert_policy": {"count": 12, "fingerprint": "8a1e...", "skipped": 0},
+            "nrql_condition": {"count": 40, "fingerprint": "77b2...", "skipped": 2}
+        }
+    }
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+import logging
+
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import EntityApi
+from ansible_collections.newrelic.core.plugins.module_utils.snapshot import (
+    SNAPSHOT_KINDS,
+    AccountSnapshot,
+    write_manifest,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.api import (
+    SyntheticMonitorApi,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccountSnapshotModule(ModuleBase):
+    def __init__(self, module):
+        super().__init__(module)
+        api_args = dict(
+            api_key=self.params["api_key"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+        )
+        self.snapshot = AccountSnapshot(
+            account_id=self.params["account_id"],
+            policy_api=AlertPolicyApi(**api_args),
+            condition_api=NrqlAlertConditionApi(**api_args),
+            monitor_api=SyntheticMonitorApi(**api_args),
+            entity_api=EntityApi(**api_args),
+        )
+
+    def run(self, result):
+        result["changed"] = True
+        if self.module.check_mode:
+            return
+
+        manifest = self.snapshot.write(
+            self.params["path"],
+            kinds=self.params["kinds"],
+            compresslevel=self.params["compression_level"],
+        )
+        manifest["manifest_path"] = (
+            self.params["manifest_path"] or manifest["path"] + ".manifest.json"
+        )
+        write_manifest(manifest, manifest["manifest_path"])
+        result["manifest"] = manifest
+
+
+def main():
+    module_args = {
+        **ModuleBase.shared_argument_spec(),
+        **dict(
+            path=dict(type="path", required=True),
+            manifest_path=dict(type="path", required=False),
+            kinds=dict(
+                type="list",
+                elements="str",
+                required=False,
+                choices=list(SNAPSHOT_KINDS),
+                default=list(SNAPSHOT_KINDS),
+            ),
+            compression_level=dict(type="int", required=False, default=6),
+        ),
+    }
+
+    # seed the result dict in the object
+    result = dict(changed=False)
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    nr_module = AccountSnapshotModule(module)
+    try:
+        nr_module.run(result)
+    except Exception as e:
+        nr_module.exit_with_exception(result, e)
+
+    nr_module.exit(result)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.NOTSET)
+    main()
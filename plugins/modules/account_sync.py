@@ -0,0 +1,220 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: account_sync
+short_description: Keeps a local copy of the alerts and monitors in a New Relic account up to date
+description:
+    - Stores the alert policies, NRQL alert conditions, and ping synthetic monitors in an account
+      in a local state file, and reports which objects were created, updated, or deleted since the
+      last sync.
+    - After the first sync, only objects that changed are read in full. Conditions are checked
+      using the time they were last updated. Monitors are checked using their IDs and names, so
+      changes to other monitor settings are only found by a full sync.
+    - An incremental sync only reduces the size of the responses, not the number of requests.
+      Every condition and monitor in the account is still listed on each sync, page by page, so
+      deleted objects can be found. Objects that changed are then read in full with more requests,
+      so an incremental sync can send more requests than a full sync.
+    - Baseline and outlier NRQL conditions are not supported, and are skipped with a warning.
+    - A full sync is run when O(full=true), when the state file does not exist or is for a
+      different account, or when the last full sync is older than O(max_age) seconds.
+    - In check mode, the changes are reported but the state file is not updated.
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    state_path:
+        description:
+            - The path of the sync state file. The file is created if it does not exist.
+        required: true
+        type: path
+    kinds:
+        description:
+            - The kinds of objects to sync.
+        required: false
+        type: list
+        elements: str
+        choices: [alert_policy, nrql_condition, synthetic_monitor]
+        default: [alert_policy, nrql_condition, synthetic_monitor]
+    full:
+        description:
+            - If true, every object is read in full instead of only the objects that changed.
+        required: false
+        type: bool
+        default: false
+    max_age:
+        description:
+            - The number of seconds after a full sync that another full sync is run.
+        required: false
+        type: int
+        default: 86400
+    return_objects:
+        description:
+            - If true, the attributes of every synced object are returned in RV(objects).
+        required: false
+        type: bool
+        default: false
+"""
+
+EXAMPLES = r"""
+- name: Sync the account
+  newrelic.core.account_sync:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    state_path: /var/lib/newrelic/111111.sync.json
+  register: _sync
+
+- name: Show the conditions that changed
+  ansible.builtin.debug:
+    var: _sync.changes.nrql_condition
+
+- name: Force a full sync of the monitors
+  newrelic.core.account_sync:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    state_path: /var/lib/newrelic/111111.sync.json
+    kinds:
+      - synthetic_monitor
+    full: true
+"""
+
+RETURN = r"""
+full:
+    description:
+        - If the sync read every object in full.
+        - Incremental syncs list every object with smaller responses, but they don't send fewer requests.
+    type: bool
+    returned: always
+    sample: false
+changes:
+    description:
+        - The keys of the objects created, updated, or deleted since the last sync, for each kind.
+        - Policies and conditions are keyed by ID, and monitors by GUID.
+    type: dict
+    returned: always
+    sample: {
+        "nrql_condition": {"created": [], "updated": ["4444444"], "deleted": []}
+    }
+objects:
+    description: The attributes of every synced object, keyed by kind and then by object key
+    type: dict
+    returned: when O(return_objects=true)
+    sample: {
+        "alert_policy": {"3333333": {"name": "foo", "incident_preference": "PER_POLICY"}}
+    }
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+import logging
+
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.sync import (
+    SYNC_KINDS,
+    IncrementalSync,
+    SyncState,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.api import (
+    SyntheticMonitorApi,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccountSyncModule(ModuleBase):
+    def __init__(self, module):
+        super().__init__(module)
+        api_args = dict(
+            api_key=self.params["api_key"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+        )
+        self.policy_api = AlertPolicyApi(**api_args)
+        self.condition_api = NrqlAlertConditionApi(**api_args)
+        self.monitor_api = SyntheticMonitorApi(**api_args)
+
+    def run(self, result):
+        state = SyncState.load(self.params["state_path"], self.params["account_id"])
+        full = self.params["full"] or state.is_stale(
+            self.params["max_age"], kinds=self.params["kinds"]
+        )
+        syncer = IncrementalSync(
+            state,
+            policy_api=self.policy_api,
+            condition_api=self.condition_api,
+            monitor_api=self.monitor_api,
+        )
+        changes = syncer.sync(kinds=self.params["kinds"], full=full)
+
+        result["full"] = full
+        result["changed"] = any(changes.values())
+        result["changes"] = {kind: c.to_json() for kind, c in changes.items()}
+        if self.params["return_objects"]:
+            result["objects"] = {
+                kind: {
+                    key: stored["state"] for key, stored in state.objects[kind].items()
+                }
+                for kind in self.params["kinds"]
+            }
+
+        if not self.module.check_mode:
+            state.save(self.params["state_path"])
+
+
+def main():
+    module_args = {
+        **ModuleBase.shared_argument_spec(),
+        **dict(
+            state_path=dict(type="path", required=True),
+            kinds=dict(
+                type="list",
+                elements="str",
+                required=False,
+                choices=list(SYNC_KINDS),
+                default=list(SYNC_KINDS),
+            ),
+            full=dict(type="bool", required=False, default=False),
+            max_age=dict(type="int", required=False, default=86400),
+            return_objects=dict(type="bool", required=False, default=False),
+        ),
+    }
+
+    # seed the result dict in the object
+    result = dict(changed=False)
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    nr_module = AccountSyncModule(module)
+    try:
+        nr_module.run(result)
+    except Exception as e:
+        nr_module.exit_with_exception(result, e)
+
+    nr_module.exit(result)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.NOTSET)
+    main()
@@ -18,6 +18,7 @@ description: >-
 
 extends_documentation_fragment:
     - newrelic.core.module_base
+    - newrelic.core.account_fan_out
 
 options:
     name:
@@ -35,6 +36,40 @@ options:
             - The alert policy ID to which this condition should be added
         required: false
         type: str
+    fields:
+        description:
+            - The condition attributes to fetch and return. Only these fields are requested from New Relic.
+            - The V(id), V(name), V(account_id), V(entity_type), and V(policy_id) fields are always included.
+            - By default, all fields are returned.
+        required: false
+        type: list
+        elements: str
+        choices:
+            - id
+            - name
+            - account_id
+            - guid
+            - entity_type
+            - policy_id
+            - enabled
+            - description
+            - incident_terms
+            - updated_at
+            - nrql_query
+            - runbook_url
+            - data_aggregation_window
+            - data_aggregation_method
+            - data_aggregation_timer
+            - data_aggregation_delay
+            - data_slide_by
+            - evaluation_delay
+    output_file:
+        description:
+            - The path of a local file to write the matching conditions to, one JSON document per line.
+            - Each page of conditions is written as it is read, so searches that match too many conditions
+              to return can be exported. RV(conditions) is empty when this is set.
+        required: false
+        type: path
 """
 
 EXAMPLES = r"""
@@ -47,6 +82,16 @@ EXAMPLES = r"""
   register: _my_alert_conditions
 
 
+- name: Get Only The Names And Queries Of Alerts In A Policy
+  newrelic.core.alert_condition_info:
+    name_like: "%"
+    policy_id: "{{ _pol.policy.id }}"
+    fields: [name, nrql_query]
+    api_key: "{{ api_key }}"
+    account_id: "{{ account_id }}"
+  register: _my_alert_conditions
+
+
 - name: Get Alerts With The Exact Name 'MY ALERT'
   newrelic.core.synthetic_monitor_alert_condition_info:
     name: MY ALERT
@@ -61,6 +106,23 @@ EXAMPLES = r"""
     api_key: "{{ api_key }}"
     account_id: "{{ account_id }}"
   register: _my_alert_conditions
+
+
+- name: Export Every Alert In The Account To A File
+  newrelic.core.alert_condition_info:
+    name_like: "%"
+    api_key: "{{ api_key }}"
+    account_id: "{{ account_id }}"
+    output_file: /tmp/conditions.jsonl
+
+
+- name: Get Health Check Alerts In Every Sub-Account
+  newrelic.core.alert_condition_info:
+    name_like: Health Check %
+    api_key: "{{ api_key }}"
+    account_id: "{{ account_id }}"
+    account_ids: "{{ sub_account_ids }}"
+  register: _my_alert_conditions
 """
 
 RETURN = r"""
@@ -83,6 +145,27 @@ conditions:
             "type": "STATIC"
         }
     ]
+count:
+    description:
+        - The number of conditions written to O(output_file)
+    type: int
+    returned: when O(output_file) is set
+    sample: 1200
+conditions_by_account:
+    description:
+        - The matching conditions in each account, keyed by account ID
+    type: dict
+    returned: when O(account_ids) is set
+    sample: {
+        "1234": [
+            {
+                "id": "22222222",
+                "name": "Health Check One is down",
+                "policyId": "3333333",
+                "type": "STATIC"
+            }
+        ]
+    }
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -92,9 +175,20 @@ import logging
 from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
     NrqlAlertConditionApi,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    NrqlStaticAlertCondition,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.fan_out import (
+    fan_out_argument_spec,
+    search_accounts_from_params,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import arguments
 from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
     ModuleBase,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    write_json_lines_file,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -107,40 +201,96 @@ class MonitorAlertQueryModule(ModuleBase):
             self.params["api_key"],
             self.params["wait_for_propegation"],
             self.params["propegation_timeout"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
         )
 
     def formulate_query(self):
         if self.params["name_like"]:
-            entity_search_query = 'nameLike: "%s"' % self.params["name_like"]
+            criteria = dict(nameLike=self.params["name_like"])
         else:
-            entity_search_query = 'name: "%s"' % self.params["name"]
+            criteria = dict(name=self.params["name"])
 
         if self.params["policy_id"]:
-            entity_search_query += ', policyId: "%s"' % self.params["policy_id"]
+            criteria["policyId"] = self.params["policy_id"]
+
+        return arguments(criteria)
 
-        return entity_search_query
+    def output_fields(self):
+        if not self.params["fields"]:
+            return None
+        return NrqlStaticAlertCondition.selected_fields(self.params["fields"])
+
+    def run_by_account(self, entity_search_query):
+        by_account = search_accounts_from_params(
+            lambda cursors: self.api.get_conditions_from_accounts(
+                entity_search_query, cursors, fields=self.params["fields"]
+            ),
+            self.params,
+        )
+        fields = self.output_fields()
+        return {
+            account_id: [c.to_json(fields=fields) for c in conditions]
+            for account_id, conditions in by_account.items()
+        }
 
     def run(self, entity_search_query):
         conditions, next_cursor = self.api.get_conditions_from_query(
-            entity_search_query, self.params["account_id"]
+            entity_search_query, self.params["account_id"], fields=self.params["fields"]
         )
 
         while next_cursor:
             _conditions, next_cursor = self.api.get_conditions_from_query(
-                entity_search_query, self.params["account_id"]
+                entity_search_query,
+                self.params["account_id"],
+                cursor=next_cursor,
+                fields=self.params["fields"],
             )
             conditions += _conditions
 
-        return [c.to_json() for c in conditions]
+        fields = self.output_fields()
+        return [c.to_json(fields=fields) for c in conditions]
+
+    def write(self, entity_search_query, path):
+        """
+        Writes the matching conditions to a file as they are read, and returns the
+        number written.
+        """
+        if self.params["account_ids"]:
+            conditions = [
+                c
+                for cs in self.run_by_account(entity_search_query).values()
+                for c in cs
+            ]
+            return write_json_lines_file(conditions, path, record=dict)
+
+        fields = self.output_fields()
+        return write_json_lines_file(
+            self.api.iter_conditions_from_query(
+                entity_search_query,
+                self.params["account_id"],
+                fields=self.params["fields"],
+            ),
+            path,
+            record=lambda c: c.to_json(fields=fields),
+        )
 
 
 def main():
     module_args = {
         **ModuleBase.shared_argument_spec(),
+        **fan_out_argument_spec(),
         **dict(
             name=dict(type="str", required=False),
             name_like=dict(type="str", required=False),
             policy_id=dict(type="str", default=None, required=False),
+            fields=dict(
+                type="list",
+                elements="str",
+                required=False,
+                choices=list(NrqlStaticAlertCondition._search_fields),
+            ),
+            output_file=dict(type="path", required=False),
         ),
     }
 
@@ -158,7 +308,16 @@ def main():
 
     maq = MonitorAlertQueryModule(module)
     try:
-        result["conditions"] = maq.run(maq.formulate_query())
+        if module.params["output_file"]:
+            result["count"] = maq.write(
+                maq.formulate_query(), module.params["output_file"]
+            )
+        elif module.params["account_ids"]:
+            by_account = maq.run_by_account(maq.formulate_query())
+            result["conditions_by_account"] = by_account
+            result["conditions"] = [c for cs in by_account.values() for c in cs]
+        else:
+            result["conditions"] = maq.run(maq.formulate_query())
     except Exception as e:
         maq.exit_with_exception(result, e)
 
@@ -81,6 +81,9 @@ from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api imp
 from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
     ModuleBase,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    policy_marker,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +91,13 @@ logger = logging.getLogger(__name__)
 class AlertPolicyModule(ModuleBase):
     def __init__(self, module):
         super().__init__(module)
-        self.api = AlertPolicyApi(module.params["api_key"])
+        self.api = AlertPolicyApi(
+            module.params["api_key"],
+            self.waits_for_propagation(),
+            self.params["propegation_timeout"],
+            compress_requests=module.params["compress_requests"],
+            request_timeout=module.params["request_timeout"],
+        )
         self.live_policy = None
 
     def get_live_policy_from_newrelic(self):
@@ -107,23 +116,30 @@ class AlertPolicyModule(ModuleBase):
         new_policy = self.create_policy_object_based_on_params()
         if not self.live_policy:
             logger.info("Policy does not exist, it will be created.")
-            self.api.create_policy(new_policy)
             results["changed"] = True
+            self.set_diff(results, None, new_policy)
+            if self.module.check_mode:
+                return
+            self.api.create_policy(new_policy)
             results["policy"]["id"] = new_policy.id
+            self.record_pending_propagation(results, policy_marker(new_policy))
             return
 
         new_policy.id = self.live_policy.id
+        results["policy"]["id"] = self.live_policy.id
         if new_policy == self.live_policy:
             logger.info("Policy exists and matches desired state.")
-            results["policy"]["id"] = self.live_policy.id
             return
 
         logger.info(
             "Policy exists but does not match desired state, it will be updated."
         )
-        self.api.update_policy(alert_policy=new_policy)
         results["changed"] = True
-        results["policy"]["id"] = new_policy.id
+        self.set_diff(results, self.live_policy, new_policy)
+        if self.module.check_mode:
+            return
+        self.api.update_policy(alert_policy=new_policy)
+        self.record_pending_propagation(results, policy_marker(new_policy))
 
     def state_absent(self, results):
         if not self.live_policy:
@@ -131,7 +147,13 @@ class AlertPolicyModule(ModuleBase):
 
         results["changed"] = True
         results["policy"]["id"] = self.live_policy.id
+        self.set_diff(results, self.live_policy, None)
+        if self.module.check_mode:
+            return
         self.api.delete_policy(alert_policy=self.live_policy)
+        self.record_pending_propagation(
+            results, policy_marker(self.live_policy, state="absent")
+        )
 
     def create_policy_object_based_on_params(self):
         policy = AlertPolicy(
@@ -17,6 +17,7 @@ description: Looks up an alert policy
 
 extends_documentation_fragment:
     - newrelic.core.module_base
+    - newrelic.core.account_fan_out
 
 options:
     name:
@@ -30,6 +31,22 @@ options:
             - Patterns should be valid NRQL (wildcards are %)
         required: false
         type: str
+    fields:
+        description:
+            - The policy attributes to fetch and return. Only these fields are requested from New Relic.
+            - The V(id), V(name), and V(account_id) fields are always included.
+            - By default, all fields are returned.
+        required: false
+        type: list
+        elements: str
+        choices: [id, name, account_id, incident_preference]
+    output_file:
+        description:
+            - The path of a local file to write the matching policies to, one JSON document per line.
+            - Each page of policies is written as it is read, so searches that match too many policies
+              to return can be exported. RV(policies) is empty when this is set.
+        required: false
+        type: path
 """
 
 EXAMPLES = r"""
@@ -44,6 +61,25 @@ EXAMPLES = r"""
     name_like: '% production %'
     api_key: "{{ nr_api_key }}"
     account_id: 1234567
+
+- name: Lookup only the names and IDs of all policies
+  alert_policy_info:
+    fields: [id, name]
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+
+- name: Export all policies to a file
+  alert_policy_info:
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+    output_file: /tmp/policies.jsonl
+
+- name: Lookup production policies in every sub-account
+  alert_policy_info:
+    name_like: '% production %'
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+    account_ids: "{{ nr_sub_account_ids }}"
 """
 
 RETURN = r"""
@@ -60,6 +96,27 @@ policies:
             'incident_preference': "PREFERENCE"
         }
     ]
+count:
+    description:
+        - The number of policies written to O(output_file)
+    type: int
+    returned: when O(output_file) is set
+    sample: 250
+policies_by_account:
+    description:
+        - The matching policies in each account, keyed by account ID
+    type: dict
+    returned: when O(account_ids) is set
+    sample: {
+        "1234": [
+            {
+                'id': "123456",
+                'name': "foo",
+                'account_id': "1234",
+                'incident_preference': "PREFERENCE"
+            }
+        ]
+    }
 """
 from ansible.module_utils.basic import AnsibleModule
 
@@ -67,9 +124,20 @@ import logging
 from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
     AlertPolicyApi,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.fan_out import (
+    fan_out_argument_spec,
+    search_accounts_from_params,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.graphql import arguments
 from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
     ModuleBase,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    write_json_lines_file,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -78,49 +146,109 @@ logger = logging.getLogger(__name__)
 class AlertPolicyInfoModule(ModuleBase):
     def __init__(self, module):
         super().__init__(module)
-        self.api = AlertPolicyApi(module.params["api_key"])
+        self.api = AlertPolicyApi(
+            module.params["api_key"],
+            compress_requests=module.params["compress_requests"],
+            request_timeout=module.params["request_timeout"],
+        )
 
     def get_policy_by_exact_name(self):
         policy = self.api.get_policy_by_name_and_account(
-            name=self.params["name"], account_id=self.params["account_id"]
+            name=self.params["name"],
+            account_id=self.params["account_id"],
+            fields=self.params["fields"],
         )
         return [policy] if policy else []
 
     def get_policies_by_name_like(self):
         policies, next_cursor = self.api.get_policies_from_query(
-            entity_search_query='nameLike: "%s"' % self.params["name_like"],
+            entity_search_query=arguments(dict(nameLike=self.params["name_like"])),
             account_id=self.params["account_id"],
+            fields=self.params["fields"],
         )
         while next_cursor:
             _policies, next_cursor = self.api.get_policies_from_query(
-                entity_search_query='nameLike: "%s"' % self.params["name_like"],
+                entity_search_query=arguments(dict(nameLike=self.params["name_like"])),
                 account_id=self.params["account_id"],
                 cursor=next_cursor,
+                fields=self.params["fields"],
             )
             policies += _policies
         return policies
 
     def get_all_policies(self):
         policies, next_cursor = self.api.get_policies_from_query(
-            entity_search_query="", account_id=self.params["account_id"]
+            entity_search_query="",
+            account_id=self.params["account_id"],
+            fields=self.params["fields"],
         )
         while next_cursor:
             _policies, next_cursor = self.api.get_policies_from_query(
                 entity_search_query="",
                 account_id=self.params["account_id"],
                 cursor=next_cursor,
+                fields=self.params["fields"],
             )
             policies += _policies
         return policies
 
+    def search_query(self):
+        if self.params["name"]:
+            return arguments(dict(name=self.params["name"]))
+        if self.params["name_like"]:
+            return arguments(dict(nameLike=self.params["name_like"]))
+        return ""
+
+    def get_policies_by_account(self):
+        entity_search_query = self.search_query()
+        return search_accounts_from_params(
+            lambda cursors: self.api.get_policies_from_accounts(
+                entity_search_query, cursors, fields=self.params["fields"]
+            ),
+            self.params,
+        )
+
+    def output_fields(self):
+        if not self.params["fields"]:
+            return None
+        return AlertPolicy.selected_fields(self.params["fields"])
+
+    def write(self, path):
+        """
+        Writes the matching policies to a file as they are read, and returns the
+        number written.
+        """
+        if self.params["account_ids"]:
+            policies = [p for ps in self.get_policies_by_account().values() for p in ps]
+        elif self.params["name"]:
+            policies = self.get_policy_by_exact_name()
+        else:
+            policies = self.api.iter_policies_from_query(
+                self.search_query(),
+                self.params["account_id"],
+                fields=self.params["fields"],
+            )
+        fields = self.output_fields()
+        return write_json_lines_file(
+            policies, path, record=lambda p: p.to_json(fields=fields)
+        )
+
 
 def run_module():
     # define available arguments/parameters a user can pass to the module
     module_args = {
         **ModuleBase.shared_argument_spec(),
+        **fan_out_argument_spec(),
         **dict(
             name=dict(type="str", required=False),
             name_like=dict(type="str", required=False),
+            fields=dict(
+                type="list",
+                elements="str",
+                required=False,
+                choices=list(AlertPolicy._search_fields),
+            ),
+            output_file=dict(type="path", required=False),
         ),
     }
 
@@ -134,8 +262,15 @@ def run_module():
     )
     apim = AlertPolicyInfoModule(module)
 
+    by_account = None
     try:
-        if module.params["name"]:
+        if module.params["output_file"]:
+            result["count"] = apim.write(module.params["output_file"])
+            result["policies"] = []
+        elif module.params["account_ids"]:
+            by_account = apim.get_policies_by_account()
+            result["policies"] = [p for ps in by_account.values() for p in ps]
+        elif module.params["name"]:
             result["policies"] = apim.get_policy_by_exact_name()
         elif module.params["name_like"]:
             result["policies"] = apim.get_policies_by_name_like()
@@ -144,7 +279,13 @@ def run_module():
     except Exception as e:
         apim.exit_with_exception(result, e)
 
-    result["policies"] = [p.to_json() for p in result["policies"]]
+    fields = apim.output_fields()
+    result["policies"] = [p.to_json(fields=fields) for p in result["policies"]]
+    if by_account is not None:
+        result["policies_by_account"] = {
+            account_id: [p.to_json(fields=fields) for p in policies]
+            for account_id, policies in by_account.items()
+        }
     apim.exit(result)
 
 
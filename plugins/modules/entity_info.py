@@ -12,10 +12,10 @@ __metaclass__ = type
 DOCUMENTATION = r"""
 ---
 module: entity_info
-short_description: Manages tags on a New Relic entity
+short_description: Lookup entities in New Relic
 description:
-    - Manages the tags on a New Relic entity.
-    - You can overwrite tags, append new tags, or remove tags all together.
+    - Looks up New Relic entities by GUID, or with an entity search query.
+    - All matching entities are returned, following result pages as needed.
 
 extends_documentation_fragment:
     - newrelic.core.module_base
@@ -23,49 +23,64 @@ extends_documentation_fragment:
 options:
     guid:
         description:
-            - The GUID of the entity to manage
-        required: true
+            - The GUID of a single entity to lookup.
+            - The module fails if the entity does not exist.
+        required: false
+        type: str
+    guids:
+        description:
+            - A list of entity GUIDs to lookup.
+            - GUIDs are looked up in batches. GUIDs that do not exist are left out of the results.
+        required: false
+        type: list
+        elements: str
+    query:
+        description:
+            - An entity search query, for example C(domain = 'APM' AND tags.env = 'prod').
+            - See the New Relic entitySearch documentation for the query syntax.
+        required: false
         type: str
 """
 
 EXAMPLES = r"""
 - name: Gather Entity Info
-  newrelic.info.entity_info:
+  newrelic.core.entity_info:
     api_key: NRAK-11111111111111111111111
     guid: 222222-222222222-2222222222-222222222
     account_id: 111111
+
+- name: Gather info for several entities
+  newrelic.core.entity_info:
+    api_key: NRAK-11111111111111111111111
+    guids:
+      - 222222-222222222-2222222222-222222222
+      - 333333-333333333-3333333333-333333333
+    account_id: 111111
+
+- name: Gather info for all production APM entities
+  newrelic.core.entity_info:
+    api_key: NRAK-11111111111111111111111
+    query: "domain = 'APM' AND tags.env = 'prod'"
+    account_id: 111111
 """
 
 RETURN = r"""
-guid:
-    description: The entity GUID
-    type: str
-    returned: on success
-    sample: 123456
-name:
-    description: The entity name
-    type: str
-    returned: on success
-    sample: some-name
-changed_tags:
-    description: Dictionary of tags that are changed. Includes their new and old values
-    type: dict
+entities:
+    description: List of dictionaries that describe the matching entities
+    type: list
     returned: on success
-    sample: {
-        "example": {
-            "new_values": [
-                "2",
-                "1",
-                "buzz",
-                "bizz"
-            ],
-            "old_values": [
-                "1",
-                "buzz",
-                "2"
-            ]
+    sample: [
+        {
+            "guid": "222222-222222222-2222222222-222222222",
+            "name": "some-name",
+            "account_id": "111111",
+            "type": "APPLICATION",
+            "entity_type": "APM_APPLICATION_ENTITY",
+            "tags": {
+                "env": ["prod"]
+            }
         }
-    }
+    ]
 """
 from ansible.module_utils.basic import AnsibleModule
 
@@ -87,29 +102,45 @@ class EntityInfo(ModuleBase):
             self.params["api_key"],
             self.params["wait_for_propegation"],
             self.params["propegation_timeout"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+        )
+
+    def get_entities(self):
+        if self.params["guid"]:
+            return [self.api.get_entity_by_guid(self.params["guid"])]
+        if self.params["guids"]:
+            return list(self.api.iter_entities_by_guids(self.params["guids"]))
+        return list(
+            self.api.iter_entities_from_query(
+                self.params["query"], account_id=self.params["account_id"]
+            )
         )
-        self.entity = self.api.get_entity_by_guid(self.params["guid"])
 
 
 def main():
     module_args = {
         **ModuleBase.shared_argument_spec(),
         **dict(
-            guid=dict(type="str", required=True),
+            guid=dict(type="str", required=False),
+            guids=dict(type="list", elements="str", required=False),
+            query=dict(type="str", required=False),
         ),
     }
 
     # seed the result dict in the object
-    result = dict(changed=False)
+    result = dict(changed=False, entities=[])
 
     module = AnsibleModule(
         argument_spec=module_args,
         supports_check_mode=True,
+        mutually_exclusive=[("guid", "guids", "query")],
+        required_one_of=[("guid", "guids", "query")],
     )
 
     nr_module = EntityInfo(module)
     try:
-        result["entities"] = [nr_module.entity.to_json()]
+        result["entities"] = [e.to_json() for e in nr_module.get_entities()]
 
     except Exception as e:
         nr_module.exit_with_exception(result, e)
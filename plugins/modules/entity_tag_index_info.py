@@ -0,0 +1,219 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: entity_tag_index_info
+short_description: Finds New Relic entities by their tags using a local index
+description:
+    - Looks up entities in an account by their tags.
+    - The tags for every entity in the account are loaded once and stored in a local index file.
+      Later lookups are answered from the index, without querying New Relic.
+    - The index is rebuilt when it is older than O(max_age), and specific entities can be refreshed
+      with O(refresh_guids).
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    index_path:
+        description:
+            - The path to the file used to store the tag index.
+            - The file is created if it does not exist.
+        required: true
+        type: path
+    max_age:
+        description:
+            - The age, in seconds, after which the index is rebuilt from New Relic.
+        required: false
+        type: int
+        default: 3600
+    rebuild:
+        description:
+            - If true, the index is always rebuilt from New Relic.
+        required: false
+        type: bool
+        default: false
+    refresh_guids:
+        description:
+            - A list of entity GUIDs whose tags should be re-read before searching.
+            - Use this after changing the tags of a few entities, instead of rebuilding the whole index.
+        required: false
+        type: list
+        elements: str
+        default: []
+    tags:
+        description:
+            - Tags that matching entities must have. Each key maps to a value, or a list of values.
+            - An entity matches a key if it has any of the values. An empty list or null matches any value.
+        required: false
+        type: dict
+        default: {}
+    missing_tags:
+        description:
+            - Tag keys that matching entities must not have.
+        required: false
+        type: list
+        elements: str
+        default: []
+"""
+
+EXAMPLES = r"""
+- name: Find entities owned by the payments team
+  newrelic.core.entity_tag_index_info:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    index_path: /tmp/nr_tag_index.json
+    tags:
+      team: payments
+
+- name: Find entities that are missing an env tag
+  newrelic.core.entity_tag_index_info:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    index_path: /tmp/nr_tag_index.json
+    missing_tags:
+      - env
+
+- name: Refresh an entity after changing its tags
+  newrelic.core.entity_tag_index_info:
+    api_key: NRAK-11111111111111111111111
+    account_id: 111111
+    index_path: /tmp/nr_tag_index.json
+    refresh_guids:
+      - 222222-222222222-2222222222-222222222
+    tags:
+      env: [prod, staging]
+"""
+
+RETURN = r"""
+guids:
+    description: The GUIDs of the matching entities
+    type: list
+    returned: on success
+    sample: ["222222-222222222-2222222222-222222222"]
+entities:
+    description: The matching entities and their tags
+    type: list
+    returned: on success
+    sample: [
+        {
+            "guid": "222222-222222222-2222222222-222222222",
+            "name": "some-name",
+            "type": "APPLICATION",
+            "account_id": "111111",
+            "tags": {
+                "team": ["payments"]
+            }
+        }
+    ]
+index:
+    description: Details about the index that answered the query
+    type: dict
+    returned: on success
+    sample: {
+        "entity_count": 1200,
+        "updated_at": 1717171717.0,
+        "rebuilt": false,
+        "refreshed": 1
+    }
+"""
+from ansible.module_utils.basic import AnsibleModule
+
+import logging
+
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import EntityApi
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_index import (
+    TagIndex,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class EntityTagIndexInfo(ModuleBase):
+    def __init__(self, module):
+        super().__init__(module)
+        self.api = EntityApi(
+            self.params["api_key"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+        )
+        self.tag_index = TagIndex.load(
+            self.params["index_path"], self.params["account_id"]
+        )
+        self.rebuilt = False
+        self.refreshed = 0
+
+    def update_index(self):
+        changed = False
+        if self.params["rebuild"] or self.tag_index.is_stale(self.params["max_age"]):
+            self.tag_index.build(self.api)
+            self.rebuilt = changed = True
+        elif self.params["refresh_guids"]:
+            self.tag_index.refresh_entities(self.api, self.params["refresh_guids"])
+            self.refreshed = len(self.params["refresh_guids"])
+            changed = True
+
+        if changed:
+            self.tag_index.save(self.params["index_path"])
+
+    def search(self):
+        return self.tag_index.search(
+            tags=self.params["tags"], missing_tags=self.params["missing_tags"]
+        )
+
+
+def main():
+    module_args = {
+        **ModuleBase.shared_argument_spec(),
+        **dict(
+            index_path=dict(type="path", required=True),
+            max_age=dict(type="int", required=False, default=3600),
+            rebuild=dict(type="bool", required=False, default=False),
+            refresh_guids=dict(type="list", elements="str", required=False, default=[]),
+            tags=dict(type="dict", required=False, default={}),
+            missing_tags=dict(type="list", elements="str", required=False, default=[]),
+        ),
+    }
+
+    # seed the result dict in the object
+    result = dict(changed=False)
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    nr_module = EntityTagIndexInfo(module)
+    try:
+        nr_module.update_index()
+        guids = nr_module.search()
+        result["guids"] = guids
+        result["entities"] = [nr_module.tag_index.entity_json(g) for g in guids]
+        result["index"] = dict(
+            entity_count=len(nr_module.tag_index),
+            updated_at=nr_module.tag_index.updated_at,
+            rebuilt=nr_module.rebuilt,
+            refreshed=nr_module.refreshed,
+        )
+    except Exception as e:
+        nr_module.exit_with_exception(result, e)
+
+    nr_module.exit(result)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.NOTSET)
+    main()
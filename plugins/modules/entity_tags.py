@@ -138,6 +138,16 @@ from ansible_collections.newrelic.core.plugins.module_utils.entity.query_templat
 from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
     EntityTags,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_diff import (
+    TagDiff,
+    diff_entity_tags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.lazy_log import (
+    minified,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    entity_tags_marker,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -147,98 +157,76 @@ class EntityTagModule(ModuleBase):
         super().__init__(module)
         self.api = EntityApi(
             self.params["api_key"],
-            self.params["wait_for_propegation"],
+            self.waits_for_propagation(),
             self.params["propegation_timeout"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
         )
         self.entity = self.api.get_entity_by_guid(self.params["guid"])
         self.param_tags = EntityTags(self.params["tags"])
 
-    def get_tags_to_remove(self):
-        logging.info("Calculating the tags the need keys or values removed.")
-        removed_keys = EntityTags()
-        removed_values = EntityTags()
-        for tag in self.param_tags:
-            if not self.entity.tags.contains_tag(tag):
-                continue
-
-            if tag.values:
-                removed = self.entity.tags.remove_values(tag)
-                if removed:
-                    removed_values.add_tag(removed)
-            else:
-                removed = self.entity.tags.remove_key(tag.name)
-                if removed:
-                    removed_keys.add_tag(removed)
-
-        logging.info("The following tag keys will be removed: %s", removed_keys)
-        logging.info("The following tag values will be removed: %s", removed_values)
-        return removed_keys, removed_values
-
-    def get_tags_to_add_or_update(self):
-        tags_to_update = EntityTags()
-        tags_to_replace = EntityTags()
-        for param_tag in self.param_tags:
-            if self.params["append"]:
-                new_tag = self.entity.tags.add_tag(param_tag)
-                if new_tag:
-                    logger.debug("Tag %s will be updated", new_tag.name)
-                    tags_to_update.add_tag(new_tag)
-            else:
-                new_tag = self.entity.tags.replace_tag(param_tag)
-                if new_tag:
-                    logger.debug("Tag %s will be replaced", new_tag.name)
-                    tags_to_replace.add_tag(new_tag)
-
-        logging.info("The following tags need to be updated: %s", tags_to_update)
-        logging.info("The following tags need to be replaced: %s", tags_to_replace)
-        return tags_to_update, tags_to_replace
-
-    def add_tags(self, tag_changes: tuple):
-        tags_to_update = tag_changes[0]
-        tags_to_replace = tag_changes[1]
-        if not self.params["append"]:
-            self.remove_tags((tags_to_replace, []))
-        query_template = self.api.jinja_env.from_string(
-            EntityQueryTemplates.j2_add_or_update_tags()
+    def get_tag_diff(self):
+        logger.info("Calculating the tag changes for the entity.")
+        diff = diff_entity_tags(
+            self.entity.tags,
+            self.param_tags,
+            state=self.params["state"],
+            append=self.params["append"],
+            guid=self.entity.guid,
         )
-        query = query_template.render(
-            guid=self.entity.guid, tags=tags_to_update.merge(tags_to_replace)
+        logger.info("The following tags need to be updated: %s", diff.adds)
+        logger.info("The following tags need to be replaced: %s", diff.replacements)
+        logger.info("The following tag keys will be removed: %s", diff.key_removals)
+        logger.info("The following tag values will be removed: %s", diff.value_removals)
+        return diff
+
+    def apply_tag_diff(self, diff: TagDiff):
+        if self.params["state"] == "absent":
+            self.remove_tags(diff)
+        else:
+            self.add_tags(diff)
+
+    def add_tags(self, diff: TagDiff):
+        if len(diff.replacements) > 0:
+            self.remove_tag_keys(list(diff.replacements.tags))
+        query = EntityQueryTemplates.add_or_update_tags(
+            self.entity.guid, diff.tags_to_add
         )
         self.__run_query_with_error_catch(
             query=query, error_key="taggingAddTagsToEntity"
         )
 
-    def remove_tags(self, tag_changes: tuple):
-        removed_values = tag_changes[1]
-        removed_key_names = [t.name for t in tag_changes[0]]
+    def remove_tags(self, diff: TagDiff):
+        self.remove_tag_keys(list(diff.key_removals.tags))
 
-        if removed_key_names:
+        if len(diff.value_removals) > 0:
             logger.info(
-                "Removing any tags with the following keys from entity: %s.",
-                removed_key_names,
+                "Removing specific values from entity: %s.", diff.value_removals
             )
-            query_template = self.api.jinja_env.from_string(
-                EntityQueryTemplates.j2_remove_tags_by_keys()
+            query = EntityQueryTemplates.remove_tag_values(
+                self.entity.guid, diff.value_removals
             )
-            query = query_template.render(
-                guid=self.entity.guid, tag_names=removed_key_names
-            )
-            self.__run_query_with_error_catch(
-                query=query, error_key="taggingDeleteTagFromEntity"
-            )
-
-        if len(removed_values) > 0:
-            logger.info("Removing specific values from entity: %s.", removed_values)
-            query_template = self.api.jinja_env.from_string(
-                EntityQueryTemplates.j2_remove_tag_values()
-            )
-            query = query_template.render(guid=self.entity.guid, tags=removed_values)
             self.__run_query_with_error_catch(
                 query=query, error_key="taggingDeleteTagValuesFromEntity"
             )
 
+    def remove_tag_keys(self, removed_key_names: list):
+        if not removed_key_names:
+            return
+
+        logger.info(
+            "Removing any tags with the following keys from entity: %s.",
+            removed_key_names,
+        )
+        query = EntityQueryTemplates.remove_tags_by_keys(
+            self.entity.guid, removed_key_names
+        )
+        self.__run_query_with_error_catch(
+            query=query, error_key="taggingDeleteTagFromEntity"
+        )
+
     def __run_query_with_error_catch(self, query, error_key):
-        logger.debug("query=%s", "".join(query.split()))
+        logger.debug("query=%s", minified(query))
         r = self.api.run_query(query=query)
         try:
             errors = r["data"][error_key]["errors"]
@@ -260,29 +248,32 @@ class EntityTagModule(ModuleBase):
         _time_increment = 3
         if not self.api.wait_for_propegation:
             return
-        _time = 0
-        while _time < self.api.propegation_timeout:
-            time.sleep(_time_increment)
-            _time += _time_increment
-            remote_entity_def = self.api.get_entity_by_guid(self.params["guid"])
-            for tag in changed:
-                if (
-                    remote_entity_def.tags.contains_tag(tag)
-                    and self.params["state"] == "absent"
-                ) or (
-                    not remote_entity_def.tags.contains_tag(tag)
-                    and self.params["state"] == "present"
-                ):
+        with self.api.trace_propagation_wait(
+            "entity_tags", self.entity.account_id, guid=self.entity.guid
+        ):
+            _time = 0
+            while _time < self.api.propegation_timeout:
+                time.sleep(_time_increment)
+                _time += _time_increment
+                remote_entity_def = self.api.get_entity_by_guid(self.params["guid"])
+                for tag in changed:
+                    if (
+                        remote_entity_def.tags.contains_tag(tag)
+                        and self.params["state"] == "absent"
+                    ) or (
+                        not remote_entity_def.tags.contains_tag(tag)
+                        and self.params["state"] == "present"
+                    ):
+                        break
+                else:
                     break
             else:
-                break
-        else:
-            raise Exception(
-                "Timedout waiting for new tags to be shown in New Relic API"
-            )
+                raise Exception(
+                    "Timedout waiting for new tags to be shown in New Relic API"
+                )
 
-        # wait one more time because the nr api really does mess with you sometimes
-        time.sleep(_time_increment)
+            # wait one more time because the nr api really does mess with you sometimes
+            time.sleep(_time_increment)
 
 
 def main():
@@ -309,20 +300,24 @@ def main():
         result["name"] = nr_module.entity.name
         result["guid"] = nr_module.entity.guid
 
-        if module.params["state"] == "present":
-            tag_changes = nr_module.get_tags_to_add_or_update()
-        else:
-            tag_changes = nr_module.get_tags_to_remove()
-
-        all_changes = tag_changes[0].merge(tag_changes[1])
-        result["changed_tags"] = all_changes.to_json()
-        if result["changed_tags"]:
+        tag_diff = nr_module.get_tag_diff()
+        result["changed_tags"] = tag_diff.to_json()
+        if tag_diff:
             result["changed"] = True
-            if module.params["state"] == "absent":
-                nr_module.remove_tags(tag_changes)
-            else:
-                nr_module.add_tags(tag_changes)
-            nr_module._wait_for_tag_changes(all_changes)
+            new_tags = tag_diff.apply_to(nr_module.entity.tags)
+            nr_module.set_diff(result, nr_module.entity.tags, new_tags)
+            if not module.check_mode:
+                nr_module.apply_tag_diff(tag_diff)
+                nr_module.entity.tags = new_tags
+                nr_module._wait_for_tag_changes(tag_diff.changed_tags())
+                nr_module.record_pending_propagation(
+                    result,
+                    entity_tags_marker(
+                        nr_module.entity,
+                        tag_diff.changed_tags(),
+                        state=module.params["state"],
+                    ),
+                )
 
     except Exception as e:
         nr_module.exit_with_exception(result, e)
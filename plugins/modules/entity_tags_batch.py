@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: entity_tags_batch
+short_description: Manages the tags of the New Relic entities for every host in a play batch
+description:
+    - Applies the same changes as M(newrelic.core.entity_tags) for many hosts at once. Each host's
+      options are read from the host variable named by O(host_var).
+    - This is an action plugin. It runs in the controller process, so use it with C(run_once)
+      instead of running M(newrelic.core.entity_tags) once per host with C(delegate_to).
+    - Without C(run_once), each host only manages its own tags, so nothing is batched.
+    - The entities of all hosts are read with a few batched searches, and the tag changes are
+      sent as aliased mutations, O(batch_size) entities per request.
+    - The results for each host are returned in RV(results), keyed by inventory hostname.
+    - Hosts that are missing O(host_var) are skipped. If a host's options are invalid or its entity
+      does not exist, the task fails after the changes for the other hosts are applied.
+    - Two hosts can not manage the same entity in one batch.
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    host_var:
+        description:
+            - The name of the host variable with each host's entity_tags options.
+            - The variable is a dict with the C(guid), C(tags), C(state), and C(append) options of
+              M(newrelic.core.entity_tags). C(state) defaults to V(present) and C(append) to V(true).
+            - The variable is resolved and templated for each host as if the task ran on that host,
+              so it can be an inventory, play, role, or fact variable.
+        type: str
+        default: newrelic_entity_tags
+    hosts:
+        description:
+            - The inventory hosts to manage tags for.
+            - By default, every host in the current play batch is used when C(run_once) is set.
+              Otherwise only the current host is used.
+        type: list
+        elements: str
+        required: false
+    batch_size:
+        description:
+            - The number of entities to read or change in each request.
+        type: int
+        default: 25
+
+attributes:
+    action:
+        support: full
+    check_mode:
+        support: full
+    diff_mode:
+        support: full
+"""
+
+EXAMPLES = r"""
+- name: Tag the entities for all hosts
+  hosts: webservers
+  vars:
+    newrelic_entity_tags:
+      guid: "{{ nr_entity_guid }}"
+      tags:
+        team: [payments]
+        role: ["{{ group_names | first }}"]
+  tasks:
+    - name: Apply the tags
+      newrelic.core.entity_tags_batch:
+        api_key: NRAK-11111111111111111111111
+        account_id: 111111
+      run_once: true
+      register: _tags
+
+    - name: Show the tags that changed for this host
+      ansible.builtin.debug:
+        var: _tags.results[inventory_hostname].changed_tags
+"""
+
+RETURN = r"""
+results:
+    description:
+        - The result for each host, keyed by inventory hostname.
+        - Each result has the same keys as the result of M(newrelic.core.entity_tags).
+    type: dict
+    returned: always
+    sample: {
+        "web01": {
+            "changed": true,
+            "name": "web01",
+            "guid": "MXxBUE18QVBQTElDQVRJT058MQ",
+            "changed_tags": {"team": ["payments"]}
+        },
+        "web02": {
+            "changed": false,
+            "skipped": true,
+            "msg": "newrelic_entity_tags is not defined for this host"
+        }
+    }
+"""
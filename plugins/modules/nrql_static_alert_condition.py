@@ -157,6 +157,30 @@ options:
             - THe length of time after data is received before it is evaluated.
         type: int
         required: false
+    prefetch:
+        description:
+            - If true, every condition in the policy is fetched in one search and stored in
+              O(prefetch_cache_file). Later tasks for conditions in the same policy are looked
+              up from the cache instead of searching New Relic.
+            - Use this when many conditions in one policy are managed in the same play.
+            - Conditions changed by this module are marked in the cache, and are looked up
+              directly until the policy is fetched again.
+        type: bool
+        default: false
+    prefetch_cache_file:
+        description:
+            - Path to the controller local file where prefetched conditions are stored.
+            - Only used if O(prefetch) is true.
+            - If this is unset, the NR_CONDITION_CACHE_FILE environment variable will be used instead.
+        type: path
+        default: ~/.ansible/newrelic_condition_cache.json
+    prefetch_ttl:
+        description:
+            - The number of seconds that the prefetched conditions of a policy are used before
+              the policy is fetched again.
+            - Only used if O(prefetch) is true.
+        type: int
+        default: 300
 """
 
 EXAMPLES = r"""
@@ -176,6 +200,17 @@ EXAMPLES = r"""
       threshold: 1
       duration: 300
       occurrences: ALL
+
+- name: Manage Many Alerts In One Policy
+  newrelic.core.nrql_static_alert_condition:
+    name: "{{ item.name }}"
+    nrql_query: "{{ item.query }}"
+    policy_id: "{{ _infra_policy.policy_id }}"
+    prefetch: true
+    critical_incident:
+      operator: ABOVE
+      threshold: "{{ item.threshold }}"
+  loop: "{{ infra_alerts }}"
 """
 
 RETURN = r"""
@@ -189,7 +224,7 @@ condition:
         'guid': "FSDAJRFOIJ3E21321JL321"
     }
 """
-from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import AnsibleModule, env_fallback
 
 import logging
 from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
@@ -199,6 +234,10 @@ from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.obje
 from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
     NrqlAlertConditionApi,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.cache import (
+    DEFAULT_CONDITION_CACHE_FILE,
+    PolicyConditionCache,
+)
 from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
     ModuleBase,
 )
@@ -214,9 +253,19 @@ class NrqlStaticAlertConditionModule(ModuleBase):
             self.params["api_key"],
             self.params["wait_for_propegation"],
             self.params["propegation_timeout"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+            condition_cache=self.condition_cache(),
         )
         self.live_condition = None
 
+    def condition_cache(self):
+        if not self.params["prefetch"]:
+            return None
+        return PolicyConditionCache(
+            self.params["prefetch_cache_file"], ttl=self.params["prefetch_ttl"]
+        )
+
     def get_live_condition_from_newrelic(self):
         """
         This function attempts to lookup the alert condition from New Relic.
@@ -234,14 +283,19 @@ class NrqlStaticAlertConditionModule(ModuleBase):
     def state_present(self, results):
         condition = self.create_condition_object_based_on_params()
         if not self.live_condition:
-            self.api.create_condition(condition)
             results["changed"] = True
+            self.set_diff(results, None, condition)
+            if not self.module.check_mode:
+                self.api.create_condition(condition)
 
         elif condition != self.live_condition:
             condition.id = self.live_condition.id
             condition.guid = self.live_condition.guid
-            self.api.update_condition(condition=condition)
             results["changed"] = True
+            self.set_diff(results, self.live_condition, condition)
+            if not self.module.check_mode:
+                self.api.update_condition(condition=condition)
+
         else:
             condition = self.live_condition
 
@@ -253,6 +307,9 @@ class NrqlStaticAlertConditionModule(ModuleBase):
 
         results["changed"] = True
         results["condition"] = self.live_condition.output_identity_dict()
+        self.set_diff(results, self.live_condition, None)
+        if self.module.check_mode:
+            return
         self.api.delete_condition(condition=self.live_condition)
 
     def create_condition_object_based_on_params(self):
@@ -371,6 +428,13 @@ def main():
                     ),
                 ),
             ),
+            prefetch=dict(type="bool", default=False),
+            prefetch_cache_file=dict(
+                type="path",
+                default=DEFAULT_CONDITION_CACHE_FILE,
+                fallback=(env_fallback, ["NR_CONDITION_CACHE_FILE"]),
+            ),
+            prefetch_ttl=dict(type="int", default=300),
         ),
     }
 
@@ -127,6 +127,9 @@ from ansible_collections.newrelic.core.plugins.module_utils.synthetic.objects im
 from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
     ModuleBase,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    monitor_marker,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -137,8 +140,10 @@ class PingSyntheticMonitorModule(ModuleBase):
         super().__init__(module)
         self.api = SyntheticMonitorApi(
             self.params["api_key"],
-            self.params["wait_for_propegation"],
+            self.waits_for_propagation(),
             self.params["propegation_timeout"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
         )
         self.live_monitor = None
 
@@ -158,9 +163,15 @@ class PingSyntheticMonitorModule(ModuleBase):
         new_monitor = self.create_monitor_object_based_on_params()
         if not self.live_monitor:
             logger.info("Monitor does not exist, it will be created.")
-            self.api.create_monitor(new_monitor)
             results["changed"] = True
+            self.set_diff(results, None, new_monitor)
+            if self.module.check_mode:
+                results["monitor"] = new_monitor.to_json()
+                return
+            self.api.create_monitor(new_monitor)
+            # the monitor's guid and id are only known after it is created
             results["monitor"] = new_monitor.to_json()
+            self.record_pending_propagation(results, monitor_marker(new_monitor))
             return
 
         new_monitor.id = self.live_monitor.id
@@ -173,17 +184,30 @@ class PingSyntheticMonitorModule(ModuleBase):
         logger.info(
             "Monitor exists but does not match desired state, it will be updated."
         )
-        self.api.update_monitor(monitor=new_monitor)
         results["changed"] = True
         results["monitor"] = new_monitor.to_json()
+        self.set_diff(results, self.live_monitor, new_monitor)
+        if self.module.check_mode:
+            return
+        self.api.update_monitor(monitor=new_monitor)
+        self.record_pending_propagation(results, monitor_marker(new_monitor))
 
     def state_absent(self, results):
         if not self.live_monitor:
             return
 
         results["changed"] = True
-        results["monitor"] = {"id": self.live_monitor.id}
+        results["monitor"] = {
+            "id": self.live_monitor.id,
+            "guid": self.live_monitor.guid,
+        }
+        self.set_diff(results, self.live_monitor, None)
+        if self.module.check_mode:
+            return
         self.api.delete_monitor(monitor=self.live_monitor)
+        self.record_pending_propagation(
+            results, monitor_marker(self.live_monitor, state="absent")
+        )
 
     def create_monitor_object_based_on_params(self):
         monitor = PingSyntheticMonitor(
@@ -0,0 +1,262 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024, mikemorency
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: propagation_verify
+short_description: Verifies that pending changes are visible in the New Relic API
+description:
+    - When modules run with O(consistency=mutation) or O(consistency=eventual), they return as soon
+      as New Relic accepts a change and record a pending propagation marker in O(propagation_file).
+    - This module reads the pending markers and checks that each change can be seen in the API.
+      Objects are looked up with one batched search per kind of object and account, and the searches
+      are repeated on a single backoff schedule until every change is visible or O(propegation_timeout) is reached.
+    - Changes can also be passed in with O(results), the registered results of earlier tasks. This lets
+      tasks run with O(wait_for_propegation=false) and have all of their changes checked at once.
+    - Verified markers are removed from the file, except in check mode.
+    - Alert policies, synthetic monitors, and entity tags are supported.
+
+extends_documentation_fragment:
+    - newrelic.core.module_base
+
+options:
+    kinds:
+        description:
+            - Only verify markers for these kinds of objects.
+            - By default, all pending markers are verified.
+        required: false
+        type: list
+        elements: str
+        choices: [alert_policy, synthetic_monitor, entity_tags]
+    results:
+        description:
+            - Registered results of M(newrelic.core.alert_policy), M(newrelic.core.ping_synthetic_monitor), and
+              M(newrelic.core.entity_tags) tasks. This can be a single registered result, such as the
+              result of a looped task, or a list of them.
+            - Results that did not change anything are ignored.
+            - These are verified along with any markers in O(propagation_file).
+        required: false
+        type: raw
+        default: []
+    initial_delay:
+        description:
+            - The number of seconds to wait before searching again after the first search.
+        required: false
+        type: float
+        default: 1
+    max_delay:
+        description:
+            - The maximum number of seconds to wait between searches.
+        required: false
+        type: float
+        default: 15
+    backoff_factor:
+        description:
+            - The wait between searches is multiplied by this after each search.
+        required: false
+        type: float
+        default: 2
+    fail_on_pending:
+        description:
+            - If true, the module fails when some changes are still not visible after the timeout.
+        required: false
+        type: bool
+        default: true
+"""
+
+EXAMPLES = r"""
+- name: Create policies without waiting for each one
+  newrelic.core.alert_policy:
+    name: "{{ item }}"
+    consistency: eventual
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+  loop: "{{ policy_names }}"
+
+- name: Check that all of the changes are visible
+  newrelic.core.propagation_verify:
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+    propegation_timeout: 60
+
+- name: Tag entities without waiting for each one
+  newrelic.core.entity_tags:
+    guid: "{{ item }}"
+    tags:
+      team: payments
+    wait_for_propegation: false
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+  loop: "{{ entity_guids }}"
+  register: _tags
+
+- name: Check all of the tag changes at once
+  newrelic.core.propagation_verify:
+    results: "{{ _tags }}"
+    api_key: "{{ nr_api_key }}"
+    account_id: 1234567
+    propegation_timeout: 120
+"""
+
+RETURN = r"""
+verified:
+    description: The markers for changes that are visible in the API
+    type: list
+    returned: always
+    sample: [
+        {
+            "kind": "alert_policy",
+            "account_id": "1234567",
+            "state": "present",
+            "id": "123456",
+            "name": "foo",
+            "fingerprint": "0f3c...",
+            "recorded_at": 1717171717.0
+        }
+    ]
+pending:
+    description: The markers for changes that were still not visible when the timeout was reached
+    type: list
+    returned: always
+    sample: []
+attempts:
+    description: The number of times the pending changes were searched for
+    type: int
+    returned: always
+    sample: 2
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+import logging
+import time
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import EntityApi
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    ModuleBase,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    PendingPropagationStore,
+    PropagationVerifier,
+    backoff_delays,
+    marker_key,
+    markers_from_results,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.api import (
+    SyntheticMonitorApi,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class PropagationVerifyModule(ModuleBase):
+    def __init__(self, module):
+        super().__init__(module)
+        api_args = dict(
+            api_key=self.params["api_key"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
+        )
+        self.verifier = PropagationVerifier(
+            policy_api=AlertPolicyApi(**api_args),
+            monitor_api=SyntheticMonitorApi(**api_args),
+            entity_api=EntityApi(**api_args),
+        )
+        self.store = PendingPropagationStore(self.params["propagation_file"])
+
+    def load_markers(self):
+        markers = {marker_key(m): m for m in self.store.load()}
+        for marker in markers_from_results(
+            self.params["results"], self.params["account_id"]
+        ):
+            markers.setdefault(marker_key(marker), marker)
+        markers = list(markers.values())
+        if self.params["kinds"]:
+            markers = [m for m in markers if m["kind"] in self.params["kinds"]]
+        return markers
+
+    def run(self, result):
+        pending = self.load_markers()
+        verified = []
+        delays = backoff_delays(
+            initial=self.params["initial_delay"],
+            maximum=self.params["max_delay"],
+            factor=self.params["backoff_factor"],
+            timeout=self.params["propegation_timeout"],
+        )
+        while pending:
+            result["attempts"] += 1
+            verified_keys = self.verifier.verify(pending)
+            verified += [m for m in pending if marker_key(m) in verified_keys]
+            pending = [m for m in pending if marker_key(m) not in verified_keys]
+            delay = next(delays, None)
+            if not pending or delay is None:
+                break
+            logger.info(
+                "%s changes are not visible yet, checking again in %s seconds",
+                len(pending),
+                delay,
+            )
+            time.sleep(delay)
+
+        if not self.module.check_mode:
+            self.store.remove(marker_key(m) for m in verified)
+        result["verified"] = verified
+        result["pending"] = pending
+
+
+def main():
+    module_args = {
+        **ModuleBase.shared_argument_spec(),
+        **dict(
+            kinds=dict(
+                type="list",
+                elements="str",
+                required=False,
+                choices=["alert_policy", "synthetic_monitor", "entity_tags"],
+            ),
+            results=dict(type="raw", required=False, default=[]),
+            initial_delay=dict(type="float", required=False, default=1),
+            max_delay=dict(type="float", required=False, default=15),
+            backoff_factor=dict(type="float", required=False, default=2),
+            fail_on_pending=dict(type="bool", required=False, default=True),
+        ),
+    }
+
+    # seed the result dict in the object
+    result = dict(changed=False, verified=[], pending=[], attempts=0)
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    nr_module = PropagationVerifyModule(module)
+    try:
+        nr_module.run(result)
+        if result["pending"] and module.params["fail_on_pending"]:
+            raise Exception(
+                "Timed out waiting for %s changes to be shown in New Relic API"
+                % len(result["pending"])
+            )
+    except Exception as e:
+        nr_module.exit_with_exception(result, e)
+
+    nr_module.exit(result)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.NOTSET)
+    main()
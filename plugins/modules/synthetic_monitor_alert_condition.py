@@ -173,6 +173,8 @@ class SyntheticMonitorAlertConditionModule(ModuleBase):
             self.params["api_key"],
             self.params["wait_for_propegation"],
             self.params["propegation_timeout"],
+            compress_requests=self.params["compress_requests"],
+            request_timeout=self.params["request_timeout"],
         )
         self.live_condition = None
 
@@ -193,14 +195,18 @@ class SyntheticMonitorAlertConditionModule(ModuleBase):
     def state_present(self, results):
         condition = self.create_condition_object_based_on_params()
         if not self.live_condition:
-            self.api.create_condition(condition)
             results["changed"] = True
+            self.set_diff(results, None, condition)
+            if not self.module.check_mode:
+                self.api.create_condition(condition)
 
         elif condition != self.live_condition:
             condition.id = self.live_condition.id
             condition.guid = self.live_condition.guid
-            self.api.update_condition(condition=condition)
             results["changed"] = True
+            self.set_diff(results, self.live_condition, condition)
+            if not self.module.check_mode:
+                self.api.update_condition(condition=condition)
 
         else:
             condition = self.live_condition
@@ -213,6 +219,9 @@ class SyntheticMonitorAlertConditionModule(ModuleBase):
 
         results["changed"] = True
         results["condition"] = self.live_condition.output_identity_dict()
+        self.set_diff(results, self.live_condition, None)
+        if self.module.check_mode:
+            return
         self.api.delete_condition(condition=self.live_condition)
 
     def create_condition_object_based_on_params(self):
@@ -234,7 +243,7 @@ class SyntheticMonitorAlertConditionModule(ModuleBase):
         _cond.data_aggregation_method = self.params["data_aggregation_method"]
         _cond.data_aggregation_timer = self.params["data_aggregation_timer"]
         _cond.data_aggregation_delay = self.params["data_aggregation_delay"]
-        _cond.signal_slide_by = None
+        _cond.data_slide_by = None
         if self.params["critical_incident"]:
             _cond.incident_terms.append(
                 IncidentTerm(
@@ -0,0 +1,77 @@
+"""
+Measures the time each module spends importing the collection's own code, using
+python -X importtime in a new interpreter per module. Modules over the budget are
+listed, and the script exits with a non-zero status.
+
+Run with the collection on the python path, for example:
+    cd ~/.ansible/collections && python ansible_collections/newrelic/core/tests/benchmarks/bench_import_time.py
+"""
+
+import os
+import subprocess
+import sys
+
+from ansible_collections.newrelic.core.plugins.module_utils import nerdgraph_api_base
+
+
+# The total time spent importing the collection's own code, in microseconds. This is
+# a loose budget to catch heavy work being added at import time
+COLLECTION_IMPORT_BUDGET_US = 150000
+
+COLLECTION_ROOT = os.path.dirname(os.path.abspath(nerdgraph_api_base.__file__))
+for _ in range(5):
+    COLLECTION_ROOT = os.path.dirname(COLLECTION_ROOT)
+MODULES_DIR = os.path.join(
+    COLLECTION_ROOT, "ansible_collections", "newrelic", "core", "plugins", "modules"
+)
+
+
+def collection_import_time(module: str):
+    """
+    Imports a module in a new interpreter and returns the self time in microseconds
+    of every collection package it imported.
+    """
+    env = dict(os.environ, PYTHONPATH=COLLECTION_ROOT)
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import ansible_collections.newrelic.core.plugins.modules.%s" % module,
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if name.strip().startswith("ansible_collections.newrelic.core"):
+            total += int(self_us)
+    return total
+
+
+def main():
+    modules = sorted(
+        name[:-3]
+        for name in os.listdir(MODULES_DIR)
+        if name.endswith(".py") and not name.startswith("_")
+    )
+    over_budget = []
+    for module in modules:
+        us = collection_import_time(module)
+        print("%-40s %8sus" % (module, us))
+        if us >= COLLECTION_IMPORT_BUDGET_US:
+            over_budget.append(module)
+
+    if over_budget:
+        print("over the %sus budget: %s" % (COLLECTION_IMPORT_BUDGET_US, over_budget))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures decoding a large nrqlConditionsSearch page. The 'old' number reproduces
+run_query decoding every response twice with the standard json module, and 'new'
+decodes once with the backend picked by json_compat.
+
+Run with the collection on the python path, for example:
+    cd ~/.ansible/collections && python ansible_collections/newrelic/core/tests/benchmarks/bench_json_decode.py
+"""
+
+import json
+import timeit
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+from ansible_collections.newrelic.core.tests.benchmarks.bench_lazy_logging import (
+    condition_data,
+    search_response,
+)
+
+
+OBJECT_COUNT = 10000
+
+
+def old_decode(content):
+    json.loads(content)
+    return json.loads(content)
+
+
+def main():
+    content = json.dumps(
+        search_response([condition_data(i) for i in range(OBJECT_COUNT)])
+    ).encode("utf-8")
+
+    old = timeit.timeit(lambda: old_decode(content), number=5) / 5
+    new = timeit.timeit(lambda: json_compat.loads(content), number=5) / 5
+
+    print("page size:          %.1f MB" % (len(content) / 1024 / 1024))
+    print("backend:            %s" % json_compat.BACKEND)
+    print("old (per page):     %.4fs" % old)
+    print("new (per page):     %.4fs" % new)
+    print("speedup:            %.1fx" % (old / new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measures the cost of comparing and looking up 10k alert conditions with logging
+set to WARNING. The 'eager' numbers reproduce the old behavior of serializing both
+objects for a log message on every comparison.
+
+Run with the collection on the python path, for example:
+    cd ~/.ansible/collections && python ansible_collections/newrelic/core/tests/benchmarks/bench_lazy_logging.py
+"""
+
+import logging
+import timeit
+from unittest import mock
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    NrqlAlertConditionBase,
+)
+
+
+OBJECT_COUNT = 10000
+logger = logging.getLogger("bench")
+
+
+def condition_data(i):
+    return {
+        "description": "condition %s" % i,
+        "enabled": True,
+        "entityGuid": "GUID%s" % i,
+        "id": str(i),
+        "name": "condition-%s" % i,
+        "nrql": {"query": "SELECT count(*) FROM Transaction WHERE appId = %s" % i},
+        "runbookUrl": None,
+        "policyId": "1",
+        "signal": {
+            "aggregationDelay": 120,
+            "aggregationMethod": "EVENT_FLOW",
+            "aggregationTimer": None,
+            "aggregationWindow": 60,
+            "evaluationDelay": None,
+            "fillOption": "NONE",
+            "fillValue": None,
+            "slideBy": None,
+        },
+        "terms": [
+            {
+                "priority": "CRITICAL",
+                "operator": "ABOVE",
+                "threshold": 1,
+                "thresholdDuration": 300,
+                "thresholdOccurrences": "ALL",
+            }
+        ],
+        "type": "STATIC",
+    }
+
+
+def search_response(conditions):
+    return {
+        "data": {
+            "actor": {
+                "account": {
+                    "alerts": {
+                        "nrqlConditionsSearch": {
+                            "nextCursor": None,
+                            "nrqlConditions": conditions,
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+
+def eager_compare(pairs):
+    # the comparison as it was done before lazy logging
+    for a, b in pairs:
+        logger.info("Comparing first: %s", a.to_json())
+        logger.info("To second: %s", b.to_json())
+        a == b
+
+
+def lazy_compare(pairs):
+    for a, b in pairs:
+        a == b
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    data = [condition_data(i) for i in range(OBJECT_COUNT)]
+    api = NrqlAlertConditionApi(api_key="bench")
+    with mock.patch.object(api, "run_query", return_value=search_response(data)):
+        lookup = timeit.timeit(
+            lambda: api.get_conditions_from_query("", account_id="1"), number=3
+        )
+
+    left = [NrqlAlertConditionBase.from_api_data(d, account_id="1") for d in data]
+    right = [NrqlAlertConditionBase.from_api_data(d, account_id="1") for d in data]
+    pairs = list(zip(left, right))
+    eager = timeit.timeit(lambda: eager_compare(pairs), number=3)
+    lazy = timeit.timeit(lambda: lazy_compare(pairs), number=3)
+
+    print("objects:            %s" % OBJECT_COUNT)
+    print("lookup (per run):   %.4fs" % (lookup / 3))
+    print("compare eager:      %.4fs" % (eager / 3))
+    print("compare lazy:       %.4fs" % (lazy / 3))
+    print("speedup:            %.1fx" % (eager / lazy))
+
+
+if __name__ == "__main__":
+    main()
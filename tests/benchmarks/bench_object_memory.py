@@ -0,0 +1,120 @@
+"""
+Compares the memory used by 100k alert conditions and policies with the previous
+dict based object model and the current slot based model.
+
+Run with the collection on the python path, for example:
+    cd ~/.ansible/collections && python ansible_collections/newrelic/core/tests/benchmarks/bench_object_memory.py
+"""
+
+import gc
+import tracemalloc
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    IncidentTerm,
+    NrqlStaticAlertCondition,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+
+
+OBJECT_COUNT = 100000
+
+
+class LegacyObject:
+    # The per-instance __dict__ and _equality_attrs set used before __slots__
+    def __init__(self, name, account_id):
+        self.name = name
+        self.account_id = str(account_id)
+        self._equality_attrs = set(["name", "account_id"])
+
+
+class LegacyAlertPolicy(LegacyObject):
+    def __init__(self, name, incident_preference, account_id, id=None):
+        super().__init__(name, account_id)
+        self.id = id
+        self.incident_preference = incident_preference
+        self._equality_attrs.update(["incident_preference"])
+
+
+class LegacyIncidentTerm:
+    def __init__(self, threshold, priority, operator, duration, occurrences):
+        self.threshold = int(threshold)
+        self._priority = priority
+        self.operator = operator
+        self.duration = int(duration)
+        self.occurrences = occurrences
+
+
+class LegacyNrqlStaticAlertCondition(LegacyObject):
+    def __init__(self, name, account_id, policy_id, id=None):
+        super().__init__(name, account_id)
+        self.guid = None
+        self.tags = dict()
+        self._equality_attrs.update(["tags"])
+        self.id = id
+        self.entity_type = None
+        self.enabled = False
+        self.description = ""
+        self.policy_id = policy_id
+        self.incident_terms = []
+        self._equality_attrs.update(
+            ["entity_type", "description", "policy_id", "incident_terms"]
+        )
+        self.entity_type = "STATIC"
+        self.nrql_query = ""
+        self.runbook_url = None
+        self.description = None
+        self.data_aggregation_window = None
+        self.data_aggregation_method = None
+        self.data_aggregation_timer = None
+        self.data_aggregation_delay = None
+        self.data_slide_by = None
+        self._equality_attrs.update(
+            [
+                "runbook_url",
+                "nrql_query",
+                "data_aggregation_window",
+                "data_aggregation_method",
+                "data_aggregation_timer",
+                "data_aggregation_delay",
+                "data_slide_by",
+                "evaluation_delay",
+            ]
+        )
+
+
+def build(condition_cls, term_cls, policy_cls):
+    objects = []
+    for i in range(OBJECT_COUNT):
+        condition = condition_cls("condition", account_id="1", policy_id="2", id=i)
+        condition.incident_terms.append(term_cls(1, "CRITICAL", "ABOVE", 60, "ALL"))
+        condition.incident_terms.append(term_cls(1, "WARNING", "ABOVE", 60, "ALL"))
+        objects.append(condition)
+        objects.append(policy_cls("policy", "PER_POLICY", account_id="1", id=i))
+    return objects
+
+
+def measure(condition_cls, term_cls, policy_cls):
+    gc.collect()
+    tracemalloc.start()
+    objects = build(condition_cls, term_cls, policy_cls)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+
+def main():
+    legacy = measure(
+        LegacyNrqlStaticAlertCondition, LegacyIncidentTerm, LegacyAlertPolicy
+    )
+    slots = measure(NrqlStaticAlertCondition, IncidentTerm, AlertPolicy)
+    print("conditions and policies: %s each" % OBJECT_COUNT)
+    print("dict model:              %.1f MiB" % (legacy / 1024 / 1024))
+    print("slot model:              %.1f MiB" % (slots / 1024 / 1024))
+    print("reduction:               %.0f%%" % (100 - slots * 100 / legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from unittest import mock
+
+from ansible.playbook.task import Task
+
+from ansible_collections.newrelic.core.plugins.action.entity_tags_batch import (
+    ActionModule,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+
+
+def _entity(guid, tags):
+    entity = Entity(name="name-%s" % guid, account_id="1234", guid=guid)
+    entity.tags = EntityTags(tags)
+    return entity
+
+
+class TestEntityTagsBatch:
+    def __prepare(self, mocker, args, check_mode=False, run_once=True):
+        self.mock_api = mock.Mock()
+        self.mock_api.iter_entities_by_guids.return_value = [
+            _entity("a", dict(team=["x"])),
+            _entity("b", dict(team=["y"])),
+        ]
+        mocker.patch(
+            "ansible_collections.newrelic.core.plugins.action.entity_tags_batch.EntityApi",
+            return_value=self.mock_api,
+        )
+        task = Task()
+        task.args = dict(dict(api_key="foo", account_id="1234"), **args)
+        task.check_mode = check_mode
+        task.diff = False
+        task.run_once = run_once
+        play_context = mock.Mock(check_mode=check_mode)
+        return ActionModule(
+            task=task,
+            connection=mock.Mock(),
+            play_context=play_context,
+            loader=mock.Mock(),
+            templar=mock.Mock(),
+            shared_loader_obj=mock.Mock(),
+        )
+
+    def task_vars(self):
+        return dict(
+            inventory_hostname="web02",
+            ansible_play_batch=["web01", "web02", "web03"],
+            hostvars=dict(
+                web01=dict(newrelic_entity_tags=dict(guid="a", tags=dict(team=["x"]))),
+                web02=dict(
+                    newrelic_entity_tags=dict(
+                        guid="b", tags=dict(team=["z"]), append=False
+                    )
+                ),
+                web03=dict(),
+            ),
+        )
+
+    def test_batch(self, mocker):
+        action = self.__prepare(mocker, dict(wait_for_propegation=False))
+        result = action.run(task_vars=self.task_vars())
+
+        assert result["changed"] is True
+        assert not result.get("failed")
+        assert result["results"]["web01"]["changed"] is False
+        assert result["results"]["web02"]["changed_tags"] == {"team": ["z"]}
+        assert result["results"]["web03"]["skipped"] is True
+        self.mock_api.iter_entities_by_guids.assert_called_once()
+        self.mock_api.apply_tag_diffs.assert_called_once()
+
+    def test_check_mode(self, mocker):
+        action = self.__prepare(mocker, dict(), check_mode=True)
+        result = action.run(task_vars=self.task_vars())
+
+        assert result["changed"] is True
+        assert result["diff"][0]["before_header"] == "web02"
+        self.mock_api.apply_tag_diffs.assert_not_called()
+
+    def test_without_run_once(self, mocker):
+        action = self.__prepare(
+            mocker, dict(wait_for_propegation=False), run_once=False
+        )
+        result = action.run(task_vars=self.task_vars())
+
+        assert list(result["results"]) == ["web02"]
+        assert result["results"]["web02"]["changed_tags"] == {"team": ["z"]}
+
+    def test_play_vars(self, mocker):
+        action = self.__prepare(mocker, dict(wait_for_propegation=False))
+        play_vars = dict(
+            newrelic_entity_tags=dict(guid="{{ guid }}", tags=dict(team=["x"]))
+        )
+        variable_manager = mock.Mock()
+        variable_manager.get_vars.side_effect = lambda play, host, task: dict(
+            play_vars, guid=host
+        )
+        variable_manager._inventory.get_host.side_effect = dict(
+            web01="a", web02="b", web03="c"
+        ).get
+        mocker.patch.object(
+            action._task, "get_variable_manager", return_value=variable_manager
+        )
+        mocker.patch.object(action._task, "get_play")
+        action._templar.copy_with_new_env.side_effect = lambda available_variables: (
+            mock.Mock(
+                template=lambda value: dict(value, guid=available_variables["guid"])
+            )
+        )
+        self.mock_api.iter_entities_by_guids.return_value.append(
+            _entity("c", dict(team=["x"]))
+        )
+        result = action.run(task_vars=self.task_vars())
+
+        assert result["results"]["web01"]["changed"] is False
+        assert result["results"]["web02"]["changed"] is True
+        assert result["results"]["web03"]["guid"] == "c"
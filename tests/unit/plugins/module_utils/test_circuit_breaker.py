@@ -0,0 +1,201 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils import circuit_breaker
+from ansible_collections.newrelic.core.plugins.module_utils.circuit_breaker import (
+    CircuitBreaker,
+    NerdGraphCircuitOpenError,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    NerdGraphApiBase,
+)
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [1000.0]
+    mocker.patch.object(circuit_breaker.time, "time", side_effect=lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker_path(tmp_path):
+    yield str(tmp_path / "breaker.json")
+    circuit_breaker.configure_circuit_breaker()
+
+
+def _record(breaker, successes: int, failures: int):
+    # successes are only counted after a failure
+    for _ in range(failures):
+        breaker.record(success=False)
+    for _ in range(successes):
+        breaker.record(success=True)
+
+
+def _response(mocker, status_code: int):
+    response = mocker.Mock()
+    response.status_code = status_code
+    response.content = b'{"data": {}}'
+    response.headers = {}
+    return response
+
+
+class TestCircuitBreaker:
+    def test_opens_at_failure_rate(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, failure_rate=0.5, min_requests=10)
+
+        _record(breaker, 5, 4)
+        assert breaker.state() == "closed"
+        breaker.record(success=False)
+        assert breaker.state() == "open"
+        with pytest.raises(NerdGraphCircuitOpenError, match="5 of the last 10"):
+            breaker.before_request()
+
+    def test_needs_min_requests(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, min_requests=10)
+
+        _record(breaker, 0, 9)
+        assert breaker.state() == "closed"
+        breaker.before_request()
+
+    def test_old_requests_leave_the_window(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, min_requests=10, window=60)
+
+        _record(breaker, 0, 9)
+        clock[0] += 61
+        breaker.record(success=False)
+        assert breaker.state() == "closed"
+
+    def test_state_is_shared(self, clock, breaker_path):
+        _record(CircuitBreaker(breaker_path, min_requests=4), 0, 4)
+
+        with pytest.raises(NerdGraphCircuitOpenError):
+            CircuitBreaker(breaker_path).before_request()
+
+    def test_half_open_probe(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, cooldown=30, min_requests=2)
+        _record(breaker, 0, 2)
+
+        clock[0] += 31
+        # only one task sends the probe, the others keep failing
+        breaker.before_request()
+        assert breaker.state() == "half_open"
+        with pytest.raises(NerdGraphCircuitOpenError):
+            breaker.before_request()
+
+        breaker.record(success=False)
+        assert breaker.state() == "open"
+        with pytest.raises(NerdGraphCircuitOpenError):
+            breaker.before_request()
+
+        clock[0] += 31
+        breaker.before_request()
+        breaker.record(success=True)
+        assert breaker.state() == "closed"
+        breaker.before_request()
+
+    def test_lost_probe_is_replaced(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, cooldown=30, min_requests=2)
+        _record(breaker, 0, 2)
+        clock[0] += 31
+        breaker.before_request()
+
+        clock[0] += 31
+        breaker.before_request()
+        assert breaker.state() == "half_open"
+
+    def test_successes_are_not_written(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, min_requests=2)
+
+        _record(breaker, 5, 0)
+        assert not os.path.exists(breaker_path)
+
+        _record(breaker, 1, 1)
+        clock[0] += 61
+        breaker.record(success=True)
+        with open(breaker_path, "rb") as f:
+            before = f.read()
+        breaker.record(success=True)
+        with open(breaker_path, "rb") as f:
+            assert f.read() == before
+
+    def test_successes_after_a_failure_are_counted(self, clock, breaker_path):
+        breaker = CircuitBreaker(breaker_path, failure_rate=0.5, min_requests=4)
+
+        _record(breaker, 3, 1)
+        breaker.record(success=False)
+        assert breaker.state() == "closed"
+        breaker.record(success=False)
+        assert breaker.state() == "open"
+
+    def test_unreadable_file(self, clock, breaker_path):
+        with open(breaker_path, "w") as f:
+            f.write("not json")
+
+        breaker = CircuitBreaker(breaker_path)
+        breaker.before_request()
+        assert breaker.state() == "closed"
+
+
+class TestRunQuery:
+    def test_failures_open_the_breaker(self, mocker, clock, breaker_path):
+        import requests
+
+        circuit_breaker.configure_circuit_breaker(breaker_path)
+        post = mocker.patch(
+            "requests.post", side_effect=requests.exceptions.ConnectionError("down")
+        )
+        api = NerdGraphApiBase("key")
+        for _ in range(circuit_breaker.DEFAULT_MIN_REQUESTS):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                api.run_query("{ actor { user { id } } }")
+
+        with pytest.raises(NerdGraphCircuitOpenError, match="Remove %s" % breaker_path):
+            api.run_query("{ actor { user { id } } }")
+        assert post.call_count == circuit_breaker.DEFAULT_MIN_REQUESTS
+
+    def test_timeouts_are_failures(self, mocker, clock, breaker_path):
+        import requests
+
+        circuit_breaker.configure_circuit_breaker(breaker_path)
+        post = mocker.patch("requests.post", side_effect=requests.exceptions.Timeout())
+        api = NerdGraphApiBase("key", request_timeout=5)
+        for _ in range(circuit_breaker.DEFAULT_MIN_REQUESTS):
+            with pytest.raises(requests.exceptions.Timeout):
+                api.run_query("{ actor { user { id } } }")
+
+        assert post.call_args.kwargs["timeout"] == 5
+        assert circuit_breaker.get_circuit_breaker().state() == "open"
+
+    def test_server_errors_are_failures(self, mocker, clock, breaker_path):
+        import requests
+
+        circuit_breaker.configure_circuit_breaker(breaker_path)
+        response = _response(mocker, 503)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("503")
+        mocker.patch("requests.post", return_value=response)
+        api = NerdGraphApiBase("key")
+        for _ in range(circuit_breaker.DEFAULT_MIN_REQUESTS):
+            with pytest.raises(requests.exceptions.HTTPError):
+                api.run_query("{ actor { user { id } } }")
+
+        assert circuit_breaker.get_circuit_breaker().state() == "open"
+
+    def test_client_errors_are_not_failures(self, mocker, clock, breaker_path):
+        import requests
+
+        circuit_breaker.configure_circuit_breaker(breaker_path)
+        response = _response(mocker, 400)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("400")
+        mocker.patch("requests.post", return_value=response)
+        api = NerdGraphApiBase("key")
+        for _ in range(circuit_breaker.DEFAULT_MIN_REQUESTS):
+            with pytest.raises(requests.exceptions.HTTPError):
+                api.run_query("{ actor { user { id } } }")
+
+        assert circuit_breaker.get_circuit_breaker().state() == "closed"
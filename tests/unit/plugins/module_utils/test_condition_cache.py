@@ -0,0 +1,80 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.cache import (
+    PolicyConditionCache,
+)
+
+
+def _data(name):
+    return {"id": "1-%s" % name, "name": name, "policyId": "10", "type": "STATIC"}
+
+
+class TestPolicyConditionCache:
+    def test_policy_is_fetched_once(self, tmp_path):
+        cache = PolicyConditionCache(str(tmp_path / "cache.json"))
+        fetches = []
+
+        def fetch_policy():
+            fetches.append(1)
+            return [_data("a"), _data("b")]
+
+        assert cache.lookup("1", "10", "a", fetch_policy) == (True, _data("a"))
+        assert cache.lookup("1", "10", "c", fetch_policy) == (True, None)
+        assert len(fetches) == 1
+
+        cache.invalidate("1", "10", "a")
+        assert cache.lookup("1", "10", "a", fetch_policy) == (False, None)
+        assert cache.lookup("1", "10", "b", fetch_policy) == (True, _data("b"))
+        assert len(fetches) == 1
+
+        expired = PolicyConditionCache(str(tmp_path / "cache.json"), ttl=-1)
+        assert expired.lookup("1", "10", "a", fetch_policy) == (True, _data("a"))
+        assert len(fetches) == 2
+
+    def test_duplicate_names(self, tmp_path):
+        cache = PolicyConditionCache(str(tmp_path / "cache.json"))
+        duplicates = [_data("a"), dict(_data("a"), id="2-a"), _data("b")]
+
+        with pytest.raises(Exception, match="Multiple alert conditions matched"):
+            cache.lookup("1", "10", "a", lambda: duplicates)
+        assert cache.lookup("1", "10", "b", lambda: duplicates) == (True, _data("b"))
+
+
+class TestCachedConditionApi:
+    def test_lookups_and_mutations(self, mocker, tmp_path):
+        api = NrqlAlertConditionApi(
+            api_key="foo",
+            condition_cache=PolicyConditionCache(str(tmp_path / "cache.json")),
+        )
+        search = mocker.patch.object(
+            api,
+            "get_condition_data_from_query",
+            side_effect=[
+                ([_data("a")], "next"),
+                ([_data("b")], None),
+                ([dict(_data("a"), description="new")], None),
+            ],
+        )
+
+        assert api.get_condition_by_name_policy_and_account("a", "10", "1").id == "1-a"
+        assert api.get_condition_by_name_policy_and_account("b", "10", "1").id == "1-b"
+        assert api.get_condition_by_name_policy_and_account("c", "10", "1") is None
+        assert search.call_count == 2
+        assert search.call_args_list[0].args[0] == 'policyId: "10"'
+
+        condition = api.get_condition_by_name_policy_and_account("a", "10", "1")
+        mocker.patch.object(api, "run_query")
+        api.delete_condition(condition)
+
+        # changed conditions are looked up directly
+        condition = api.get_condition_by_name_policy_and_account("a", "10", "1")
+        assert condition.description == "new"
+        assert search.call_count == 3
+        assert search.call_args.args[0] == 'name: "a", policyId: "10"'
@@ -0,0 +1,104 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import threading
+
+from unittest import mock
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.fan_out import (
+    RateLimiter,
+    account_cursor_chunks,
+    search_accounts,
+)
+
+
+def test_account_cursor_chunks():
+    cursors = {str(i): "" for i in range(5)}
+    chunks = account_cursor_chunks(cursors, size=2)
+    assert [list(c) for c in chunks] == [["0", "1"], ["2", "3"], ["4"]]
+
+
+def test_rate_limiter_is_shared_by_key():
+    limiter = RateLimiter.for_key("key-a", 10)
+    assert RateLimiter.for_key("key-a", 20) is limiter
+    assert limiter.interval == 0.05
+    assert RateLimiter.for_key("key-b", 10) is not limiter
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=2)
+    with mock.patch(
+        "ansible_collections.newrelic.core.plugins.module_utils.fan_out.time.sleep"
+    ) as sleep:
+        limiter.acquire()
+        limiter.acquire()
+    assert sleep.call_count == 1
+    assert 0 < sleep.call_args.args[0] <= 0.5
+
+
+def test_search_accounts_follows_each_cursor():
+    calls = []
+    lock = threading.Lock()
+
+    def fetch_page(cursors):
+        with lock:
+            calls.append(dict(cursors))
+        pages = dict()
+        for account_id, cursor in cursors.items():
+            if account_id == "1" and not cursor:
+                pages[account_id] = (["1-a"], "next")
+            else:
+                pages[account_id] = (["%s-%s" % (account_id, cursor or "a")], None)
+        return pages
+
+    limiter = mock.Mock()
+    results = search_accounts(
+        fetch_page,
+        ["1", "2", "3", 1],
+        max_workers=2,
+        rate_limiter=limiter,
+        accounts_per_query=2,
+    )
+
+    assert results == {"1": ["1-a", "1-next"], "2": ["2-a"], "3": ["3-a"]}
+    assert sorted(map(sorted, calls)) == [["1"], ["1", "2"], ["3"]]
+    assert limiter.acquire.call_count == 3
+
+
+def test_multi_account_document(mocker):
+    api = AlertPolicyApi(api_key="foo")
+    run_query = mocker.patch.object(
+        api,
+        "run_query",
+        return_value={
+            "data": {
+                "actor": {
+                    "a%s"
+                    % i: {
+                        "alerts": {
+                            "policiesSearch": {
+                                "nextCursor": None,
+                                "policies": [
+                                    {"id": "9", "name": "p", "accountId": account_id}
+                                ],
+                            }
+                        }
+                    }
+                    for i, account_id in enumerate(["11", "22"])
+                }
+            }
+        },
+    )
+
+    pages = api.get_policies_from_accounts("", {"11": "", "22": "abc"}, fields=["name"])
+
+    query = run_query.call_args.kwargs["query"]
+    assert "a0: account(id: 11)" in query
+    assert "a1: account(id: 22)" in query
+    assert 'cursor: "abc"' in query
+    assert run_query.call_count == 1
+    assert [p.account_id for p in pages["22"][0]] == ["22"]
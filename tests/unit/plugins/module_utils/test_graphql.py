@@ -0,0 +1,282 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import re
+from unittest import mock
+
+import pytest
+from hypothesis import given, strategies as st
+
+from ansible_collections.newrelic.core.plugins.module_utils import graphql
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    IncidentTerm,
+    NrqlStaticAlertCondition,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import (
+    search_literal,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.query_templates import (
+    EntityQueryTemplates,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_diff import (
+    diff_entity_tags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    NerdGraphApiBase,
+)
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n"}
+_ESCAPES.update(r="\r", t="\t")
+_TOKEN_RE = re.compile(r"\.\.\.|[!$&()\[\]{}:=@|]|[_A-Za-z][_0-9A-Za-z]*|-?\d+(\.\d+)?")
+
+
+def _lex(document: str):
+    """
+    Splits a document into (kind, value) tokens following the lexical grammar in the
+    GraphQL spec, and decodes string values. Anything the spec doesn't allow raises
+    a ValueError.
+    """
+    tokens = []
+    i = 0
+    while i < len(document):
+        char = document[i]
+        if char in " \t\n\r,":
+            i += 1
+        elif char == '"':
+            i += 1
+            code_units = []
+            while document[i] != '"':
+                char = document[i]
+                if char < " " and char != "\t":
+                    raise ValueError("control character in string at %s" % i)
+                if char == "\\":
+                    escape = document[i + 1]
+                    if escape == "u":
+                        code_units.append(chr(int(document[i + 2 : i + 6], 16)))
+                        i += 6
+                        continue
+                    code_units.append(_ESCAPES[escape])
+                    i += 2
+                else:
+                    code_units.append(char)
+                    i += 1
+            i += 1
+            # escaped surrogate pairs are combined into one character
+            value = "".join(code_units).encode("utf-16", "surrogatepass")
+            tokens.append(("string", value.decode("utf-16")))
+        else:
+            match = _TOKEN_RE.match(document, i)
+            if not match:
+                raise ValueError("unexpected %r at %s" % (char, i))
+            tokens.append(("token", match.group(0)))
+            i = match.end()
+    return tokens
+
+
+def _strings(document: str):
+    return [value for kind, value in _lex(document) if kind == "string"]
+
+
+def _assert_balanced(document: str):
+    depth = 0
+    for kind, value in _lex(document):
+        if kind == "token" and value in "{[(":
+            depth += 1
+        elif kind == "token" and value in "}])":
+            depth -= 1
+            assert depth >= 0
+    assert depth == 0
+
+
+def _unquote_search_literal(literal: str):
+    assert literal[0] == literal[-1] == "'"
+    # quotes and backslashes only appear escaped inside the literal
+    assert re.fullmatch(r"(?:[^'\\]|\\.)*", literal[1:-1], flags=re.DOTALL)
+    return re.sub(r"\\(.)", r"\1", literal[1:-1], flags=re.DOTALL)
+
+
+class _CapturingApi(NerdGraphApiBase):
+    def __init__(self):
+        super().__init__("key")
+        self.bodies = []
+
+    def run_query(self, query: str):
+        body, _, _ = self.encode_request(query)
+        self.bodies.append(body)
+        return {"data": {}}
+
+
+# hypothesis doesn't generate unpaired surrogates for text() by default
+_text = st.text()
+
+
+class TestValue:
+    def test_scalars(self):
+        assert graphql.value(None) == "null"
+        assert graphql.value(True) == "true"
+        assert graphql.value(False) == "false"
+        assert graphql.value(5) == "5"
+        assert graphql.value(1.5) == "1.5"
+        assert graphql.value(graphql.Enum("EVENT_FLOW")) == "EVENT_FLOW"
+        assert graphql.value('say "hi"\n\\') == '"say \\"hi\\"\\n\\\\"'
+
+    def test_collections(self):
+        assert (
+            graphql.value(dict(a=[1, "b"], c=dict(d=None)))
+            == '{a: [1, "b"], c: {d: null}}'
+        )
+        assert graphql.value({"b", "a"}) == '["a", "b"]'
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            graphql.Enum("not valid")
+        with pytest.raises(ValueError):
+            graphql.Enum("null")
+        with pytest.raises(ValueError):
+            graphql.value({"bad key": 1})
+        with pytest.raises(ValueError):
+            graphql.value(float("nan"))
+        with pytest.raises(TypeError):
+            graphql.value(object())
+
+    def test_identifier(self):
+        assert graphql.identifier("123") == 123
+        assert graphql.identifier("MXxBUE18") == "MXxBUE18"
+        assert graphql.identifier(None) is None
+
+
+class TestDocuments:
+    def test_condition(self):
+        condition = NrqlStaticAlertCondition("cpu", "1234", "55", id="99")
+        condition.enabled = True
+        condition.nrql_query = 'SELECT max(cpu) FROM Host WHERE name = "a\\b"'
+        condition.data_aggregation_window = 60
+        condition.data_aggregation_method = "EVENT_FLOW"
+        condition.data_aggregation_delay = 120
+        condition.data_aggregation_timer = 60
+        condition.incident_terms = [IncidentTerm(90, "CRITICAL", "ABOVE", 600, "ALL")]
+
+        query = condition.create_mutation()
+
+        assert query.startswith("mutation {\n  alertsNrqlConditionStaticCreate(")
+        assert "accountId: 1234, policyId: 55" in query
+        assert 'query: "SELECT max(cpu) FROM Host WHERE name = \\"a\\\\b\\""' in query
+        # EVENT_FLOW conditions don't have an aggregation timer
+        assert "signal: {aggregationDelay: 120, aggregationWindow: 60" in query
+        assert "aggregationTimer" not in query
+        assert "description" not in query
+        assert (
+            "terms: [{threshold: 90, thresholdDuration: 600, "
+            "thresholdOccurrences: ALL, operator: ABOVE, priority: CRITICAL}]" in query
+        )
+        assert condition.update_mutation().count("id: 99") == 1
+        assert condition.delete_mutation() == (
+            "mutation {\n  alertsConditionDelete(accountId: 1234, id: 99) { id }\n}"
+        )
+
+    def test_batch_tag_changes(self):
+        diff = diff_entity_tags(
+            EntityTags({"one": ["1"], "two": ["2", "3"]}),
+            EntityTags({"one": ["4"], "two": ["3"]}),
+            state="present",
+            append=False,
+            guid="abc",
+        )
+        removal = diff_entity_tags(
+            EntityTags({"two": ["2", "3"]}),
+            EntityTags({"two": ["2"]}),
+            state="absent",
+            guid="def",
+        )
+
+        query = EntityQueryTemplates.batch_tag_changes([diff, removal])
+
+        assert query.splitlines()[1:-1] == [
+            '  removeKeys0: taggingDeleteTagFromEntity(guid: "abc", tagKeys: ["one", "two"])'
+            " { errors { message type } }",
+            '  addTags0: taggingAddTagsToEntity(guid: "abc", tags: [{key: "one", values:'
+            ' ["4"]}, {key: "two", values: ["3"]}]) { errors { message type } }',
+            '  removeValues1: taggingDeleteTagValuesFromEntity(guid: "def", tagValues:'
+            ' [{key: "two", value: "2"}]) { errors { message type } }',
+        ]
+
+    def test_search_account_id(self):
+        api = NrqlAlertConditionApi("key")
+        search = dict(nrqlConditions=[], nextCursor=None)
+        api.run_query = mock.Mock(
+            return_value=dict(
+                data=dict(
+                    actor=dict(account=dict(alerts=dict(nrqlConditionsSearch=search)))
+                )
+            )
+        )
+
+        api.get_condition_data_from_query("", "1234")
+        assert "account(id: 1234)" in api.run_query.call_args.kwargs["query"]
+
+        api.run_query.reset_mock()
+        with pytest.raises(ValueError):
+            api.get_condition_data_from_query("", "1) { injected } account(id: 2")
+        api.run_query.assert_not_called()
+
+
+class TestEscaping:
+    @given(_text)
+    def test_string_round_trip(self, text):
+        quoted = graphql.string(text)
+
+        assert _lex(quoted) == [("string", text)]
+        assert json.loads(quoted) == text
+
+    @given(_text, st.characters(min_codepoint=0xD800, max_codepoint=0xDFFF), _text)
+    def test_unpaired_surrogates_are_rejected(self, before, surrogate, after):
+        with pytest.raises(ValueError, match="unpaired surrogate"):
+            graphql.string(before + surrogate + after)
+
+    @given(_text)
+    def test_search_literal_round_trip(self, text):
+        literal = search_literal(text)
+
+        assert _unquote_search_literal(literal) == text
+        # the query is sent as a GraphQL string, so it must survive that escaping too
+        assert _strings(graphql.string("name = %s" % literal)) == ["name = " + literal]
+
+    @given(_text, _text, st.text(min_size=1), st.text(min_size=1))
+    def test_condition_document(self, name, nrql_query, description, runbook_url):
+        condition = NrqlStaticAlertCondition(name, "1234", "55", id="99")
+        condition.nrql_query = nrql_query
+        condition.description = description
+        condition.runbook_url = runbook_url
+        condition.data_aggregation_method = "EVENT_FLOW"
+        condition.incident_terms = [IncidentTerm(90, "CRITICAL", "ABOVE", 600, "ALL")]
+
+        for query in (condition.create_mutation(), condition.update_mutation()):
+            _assert_balanced(query)
+            assert _strings(query) == [name, description, nrql_query, runbook_url]
+
+    @given(st.lists(st.tuples(_text, _text), min_size=1, max_size=30))
+    def test_batched_mutations(self, names_and_queries):
+        conditions = []
+        for name, nrql_query in names_and_queries:
+            condition = NrqlStaticAlertCondition(name, "1234", "55")
+            condition.nrql_query = nrql_query
+            conditions.append(condition)
+        api = _CapturingApi()
+
+        api.run_mutations([c.create_mutation() for c in conditions], batch_size=7)
+
+        strings = []
+        for body in api.bodies:
+            query = json.loads(body)["query"]
+            _assert_balanced(query)
+            strings += _strings(query)
+        assert strings == [value for pair in names_and_queries for value in pair]
@@ -0,0 +1,40 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import datetime
+import importlib
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils import json_compat
+
+
+@pytest.fixture(params=json_compat.BACKENDS)
+def backend(request, monkeypatch):
+    try:
+        importlib.import_module(request.param)
+    except ImportError:
+        pytest.skip("%s is not installed" % request.param)
+    monkeypatch.setenv("NR_JSON_BACKEND", request.param)
+    yield importlib.reload(json_compat)
+    monkeypatch.delenv("NR_JSON_BACKEND")
+    importlib.reload(json_compat)
+
+
+def test_round_trip(backend):
+    data = {"b": [1, 2.5, None, True], "a": {"ü": "✓"}}
+
+    assert backend.loads(backend.dumps(data)) == data
+    assert backend.loads(backend.dumps_bytes(data)) == data
+    assert backend.loads(backend.dumps(data).encode("utf-8")) == data
+    assert backend.dumps(data, sort_keys=True).index('"a"') == 1
+
+
+def test_default(backend):
+    day = datetime.date(2024, 1, 2)
+
+    assert backend.loads(backend.dumps({"day": day}, default=str)) == {
+        "day": "2024-01-02"
+    }
+    assert backend.loads(backend.JsonEncoder().encode([day])) == ["2024-01-02"]
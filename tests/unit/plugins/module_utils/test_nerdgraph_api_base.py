@@ -0,0 +1,112 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import gzip
+import json
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base import (
+    NerdGraphApiBase,
+    NerdGraphQueryError,
+    alias_mutation,
+)
+
+
+def _response(mocker, data, wire_bytes=None):
+    content = json.dumps(data).encode("utf-8")
+    response = mocker.Mock()
+    response.status_code = 200
+    response.content = content
+    response.headers = {"Content-Length": str(wire_bytes or len(content))}
+    response.json.return_value = data
+    return response
+
+
+class TestCompression:
+    def test_small_requests_are_not_compressed(self, mocker):
+        post = mocker.patch(
+            "requests.post",
+            return_value=_response(mocker, {"data": {}}),
+        )
+        api = NerdGraphApiBase("key", compress_requests=True)
+
+        assert api.run_query("{ actor { user { id } } }") == {"data": {}}
+        headers = post.call_args.kwargs["headers"]
+        assert headers["Accept-Encoding"] == "gzip"
+        assert "Content-Encoding" not in headers
+        assert json.loads(post.call_args.kwargs["data"])["query"].startswith("{ actor")
+
+    def test_large_requests_are_compressed(self, mocker):
+        post = mocker.patch(
+            "requests.post",
+            return_value=_response(mocker, {"data": {}}, wire_bytes=10),
+        )
+        query = "mutation { %s }" % ("x" * NerdGraphApiBase.COMPRESS_MIN_BYTES)
+
+        NerdGraphApiBase("key").run_query(query)
+        assert "Content-Encoding" not in post.call_args.kwargs["headers"]
+
+        NerdGraphApiBase("key", compress_requests=True).run_query(query)
+        assert post.call_args.kwargs["headers"]["Content-Encoding"] == "gzip"
+        body = post.call_args.kwargs["data"]
+        assert len(body) < NerdGraphApiBase.COMPRESS_MIN_BYTES
+        assert json.loads(gzip.decompress(body))["query"] == query
+
+
+class TestBatchedMutations:
+    def test_alias_mutation(self):
+        query = "mutation {  alertsPolicyDelete(accountId: 1, id: 2) { id } }"
+        assert (
+            alias_mutation(query, "m3")
+            == "m3: alertsPolicyDelete(accountId: 1, id: 2) { id }"
+        )
+
+    def test_run_mutations(self, mocker):
+        api = NerdGraphApiBase("key")
+        run_query = mocker.patch.object(
+            api,
+            "run_query",
+            side_effect=[
+                {"data": {"m0": {"id": 1}, "m1": {"id": 2}}},
+                {"data": {"m0": {"id": 3}}},
+            ],
+        )
+        queries = ["mutation { delete(id: %s) { id } }" % i for i in range(3)]
+
+        assert api.run_mutations(queries, batch_size=2) == [
+            {"id": 1},
+            {"id": 2},
+            {"id": 3},
+        ]
+        assert run_query.call_count == 2
+        assert "m1: delete(id: 1)" in run_query.call_args_list[0].kwargs["query"]
+
+    def test_run_mutations_partial_errors(self, mocker):
+        response = {
+            "data": {"m0": {"id": 1}, "m1": None, "m2": None},
+            "errors": [
+                {"message": "bad", "path": ["m1"]},
+                {"message": "worse", "path": ["m1", "id"]},
+                {"message": "no path"},
+            ],
+        }
+        mocker.patch("requests.post", return_value=_response(mocker, response))
+        queries = ["mutation { delete(id: %s) { id } }" % i for i in range(3)]
+
+        results = NerdGraphApiBase("key").run_mutations(queries)
+        assert results[0] == {"id": 1}
+        assert [e["message"] for e in results[1]["errors"]] == [
+            "bad",
+            "worse",
+            "no path",
+        ]
+        assert [e["message"] for e in results[2]["errors"]] == ["no path"]
+
+    def test_multiple_errors_without_data(self, mocker):
+        response = {"data": None, "errors": [{"message": "a"}, {"message": "b"}]}
+        mocker.patch("requests.post", return_value=_response(mocker, response))
+
+        with pytest.raises(NerdGraphQueryError, match="2 errors .*: a; b"):
+            NerdGraphApiBase("key").run_mutations(["mutation { delete(id: 1) }"])
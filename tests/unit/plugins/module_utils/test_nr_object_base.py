@@ -0,0 +1,171 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import copy
+import io
+import json
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    IncidentTerm,
+    NrqlAlertConditionBase,
+    NrqlStaticAlertCondition,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+    Tag,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.nr_object_base import (
+    diff_objects,
+    write_json_lines,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.synthetic.objects import (
+    PingSyntheticMonitor,
+    SyntheticMonitorBase,
+)
+
+
+def _policy(name, preference="PER_POLICY", id=None):
+    return AlertPolicy(name=name, incident_preference=preference, account_id="1", id=id)
+
+
+class TestFingerprint:
+    def test_fingerprint_ignores_identifiers(self):
+        assert _policy("a").fingerprint == _policy("a", id="5").fingerprint
+        assert _policy("a").fingerprint != _policy("b").fingerprint
+
+    def test_fingerprint_is_invalidated_on_change(self):
+        policy = _policy("a")
+        before = policy.fingerprint
+        policy.incident_preference = "PER_CONDITION"
+        assert policy.fingerprint != before
+        assert policy.to_json()["fingerprint"] == policy.fingerprint
+
+    def test_equality_after_change_in_place(self):
+        one = NrqlStaticAlertCondition(name="a", account_id="1", policy_id="2")
+        two = NrqlStaticAlertCondition(name="a", account_id="1", policy_id="2")
+        assert one == two
+
+        one.incident_terms.append(IncidentTerm(90, "CRITICAL", "ABOVE", 600, "ALL"))
+        assert one != two
+        assert one.fingerprint != two.fingerprint
+
+        two.incident_terms.append(IncidentTerm(90, "CRITICAL", "ABOVE", 600, "ALL"))
+        assert one == two
+
+        # nested objects tell their owner when they change
+        two.incident_terms[0].threshold = 95
+        assert one != two
+        assert diff_objects([one], [two]).update == [(one, two)]
+
+        del two.incident_terms[0]
+        assert one.fingerprint != two.fingerprint
+
+    def test_entity_tags_change_in_place(self):
+        one = Entity(name="a", account_id="1")
+        two = Entity(name="a", account_id="1")
+        one.tags = EntityTags(dict(team=["a"]))
+        two.tags = EntityTags(dict(team=["a"]))
+        assert one == two
+
+        one.tags.add_tag(Tag("env", ["prod"]))
+        assert one != two
+
+    def test_copies_are_detached(self):
+        one = NrqlStaticAlertCondition(name="a", account_id="1", policy_id="2")
+        one.incident_terms.append(IncidentTerm(90, "CRITICAL", "ABOVE", 600, "ALL"))
+        before = one.fingerprint
+
+        terms = copy.deepcopy(one.incident_terms)
+        assert type(terms) is list
+        terms[0].threshold = 1
+        assert one.fingerprint == before
+
+    def test_unordered_attrs(self):
+        one = PingSyntheticMonitor(name="a", account_id="1")
+        two = PingSyntheticMonitor(name="a", account_id="1")
+        one.public_locations = ["AWS_US_WEST_1", "AWS_US_EAST_1"]
+        two.public_locations = ["AWS_US_EAST_1", "AWS_US_WEST_1"]
+        assert one == two
+
+
+class TestDiffObjects:
+    def test_diff(self):
+        live = [_policy("same", id="1"), _policy("changed", id="2"), _policy("old")]
+        desired = [_policy("same"), _policy("changed", "PER_CONDITION"), _policy("new")]
+
+        diff = diff_objects(desired, live)
+
+        assert [o.name for o in diff.create] == ["new"]
+        assert [(d.name, l.id) for d, l in diff.update] == [("changed", "2")]
+        assert [o.name for o in diff.delete] == ["old"]
+        assert [o.id for o in diff.unchanged] == ["1"]
+        assert diff
+
+
+class TestSerialization:
+    def test_to_json(self):
+        assert _policy("a", id=1).to_json() == {
+            "name": "a",
+            "account_id": "1",
+            "id": "1",
+            "incident_preference": "PER_POLICY",
+            "fingerprint": _policy("a").fingerprint,
+        }
+
+    def test_streaming(self):
+        policies = [_policy("a"), _policy("b")]
+        fp = io.StringIO()
+        assert write_json_lines(policies, fp) == 2
+        assert [json.loads(line) for line in fp.getvalue().splitlines()] == [
+            p.to_json() for p in policies
+        ]
+
+        fp = io.StringIO()
+        assert write_json_lines(policies, fp, record=lambda p: p.name) == 2
+        assert fp.getvalue().splitlines() == ['"a"', '"b"']
+
+
+class TestFieldProjection:
+    def test_selection(self):
+        assert AlertPolicy.search_selection(["name"]) == "id name accountId"
+        assert (
+            NrqlStaticAlertCondition.search_selection(
+                ["data_slide_by", "nrql_query", "data_aggregation_window"]
+            )
+            == "id name type policyId signal { slideBy aggregationWindow } nrql { query }"
+        )
+        assert "monitorSummary" not in SyntheticMonitorBase.search_selection(["url"])
+        assert "monitorSummary { status }" in SyntheticMonitorBase.search_selection()
+
+        with pytest.raises(ValueError):
+            AlertPolicy.search_selection(["nope"])
+
+    def test_partial_api_data(self):
+        condition = NrqlAlertConditionBase.from_api_data(
+            {"id": "1", "name": "a", "policyId": "2", "type": "STATIC"},
+            account_id="1",
+        )
+        assert condition.nrql_query == ""
+        assert condition.data_slide_by is None
+        assert condition.incident_terms == []
+
+        monitor = PingSyntheticMonitor.from_api_data(
+            {"name": "a", "accountId": "1", "guid": "g", "monitorType": "SIMPLE"}
+        )
+        assert monitor.guid == "g"
+        assert monitor.public_locations == []
+
+        fields = AlertPolicy.selected_fields(["incident_preference"])
+        assert _policy("a", id=1).to_json(fields=fields) == {
+            "name": "a",
+            "account_id": "1",
+            "id": "1",
+            "incident_preference": "PER_POLICY",
+        }
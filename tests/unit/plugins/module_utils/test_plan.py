@@ -0,0 +1,280 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.plan import (
+    PlanExecutor,
+    Planner,
+    live_objects_from_dump,
+    object_from_state,
+    object_state,
+)
+
+
+def _policy_data(i, incident_preference="PER_POLICY"):
+    return dict(
+        id=str(i),
+        name="policy-%s" % i,
+        accountId=1,
+        incidentPreference=incident_preference,
+    )
+
+
+def _condition_data(i, policy_id="1"):
+    return dict(
+        id=str(100 + i),
+        name="condition-%s" % i,
+        type="STATIC",
+        policyId=policy_id,
+        enabled=True,
+        description="d",
+        entityGuid="guid-%s" % i,
+        runbookUrl=None,
+        nrql=dict(query="SELECT count(*) FROM Transaction"),
+        signal=dict(
+            aggregationWindow=60,
+            aggregationMethod="EVENT_FLOW",
+            aggregationDelay=120,
+            aggregationTimer=None,
+            slideBy=None,
+            evaluationDelay=None,
+        ),
+        terms=[
+            dict(
+                priority="CRITICAL",
+                operator="ABOVE",
+                threshold=1,
+                thresholdDuration=300,
+                thresholdOccurrences="ALL",
+            )
+        ],
+    )
+
+
+_TERM = dict(
+    threshold=1, priority="CRITICAL", operator="ABOVE", duration=300, occurrences="ALL"
+)
+
+LIVE_DUMP = dict(
+    alert_policy=[_policy_data(1), _policy_data(2)],
+    nrql_condition=[_condition_data(1), _condition_data(2)],
+)
+
+
+class TestPlanner:
+    def setup_method(self):
+        self.planner = Planner("1", live_objects_from_dump(LIVE_DUMP, "1"))
+
+    def test_unsupported_conditions_are_skipped(self):
+        baseline = dict(_condition_data(3), type="BASELINE")
+        live = live_objects_from_dump(
+            dict(LIVE_DUMP, nrql_condition=[_condition_data(1), baseline]), "1"
+        )
+
+        assert [c.name for c in live["nrql_condition"]] == ["condition-1"]
+
+    def test_state_round_trip(self):
+        for objects in self.planner.live.values():
+            for obj in objects:
+                kind = {
+                    "AlertPolicy": "alert_policy",
+                    "NrqlStaticAlertCondition": "nrql_condition",
+                }[type(obj).__name__]
+                copy = object_from_state(kind, object_state(obj), "1")
+                assert copy.fingerprint == obj.fingerprint
+
+    def test_templated_values_are_converted(self):
+        def stringify(value):
+            if isinstance(value, dict):
+                return {k: stringify(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [stringify(v) for v in value]
+            return value if isinstance(value, str) else str(value)
+
+        # the output of alert_condition_info after it was templated into strings
+        desired = [
+            dict(stringify(c.to_json()), policy_name="policy-1")
+            for c in self.planner.live["nrql_condition"]
+        ]
+        assert desired[0]["enabled"] == "True"
+        assert desired[0]["data_aggregation_timer"] == "None"
+        assert desired[0]["incident_terms"][0]["threshold"] == "1"
+
+        plan = self.planner.plan(dict(nrql_condition=desired))
+        assert plan["actions"] == []
+
+    def test_invalid_values(self):
+        with pytest.raises(ValueError, match="attribute enabled of c"):
+            object_from_state("nrql_condition", dict(name="c", enabled="maybe"), "1")
+        with pytest.raises(ValueError, match="attribute data_aggregation_window"):
+            object_from_state(
+                "nrql_condition", dict(name="c", data_aggregation_window=[60]), "1"
+            )
+        with pytest.raises(ValueError, match="incident_terms.threshold"):
+            object_from_state(
+                "nrql_condition",
+                dict(name="c", incident_terms=[dict(_TERM, threshold="high")]),
+                "1",
+            )
+
+    def test_plan(self):
+        plan = self.planner.plan(
+            dict(
+                alert_policy=[
+                    dict(name="policy-1", incident_preference="PER_POLICY"),
+                    dict(name="policy-2", incident_preference="PER_CONDITION"),
+                    dict(name="policy-3", incident_preference="PER_POLICY"),
+                ],
+                nrql_condition=[
+                    # only the attributes that are given are compared
+                    dict(name="condition-1", policy_name="policy-1", enabled=True),
+                    dict(name="condition-2", policy_id="1", description="new"),
+                    dict(
+                        name="condition-3",
+                        policy_name="policy-3",
+                        nrql_query="SELECT 1",
+                    ),
+                ],
+            )
+        )
+
+        assert plan["summary"] == dict(
+            alert_policy=dict(create=1, update=1, delete=0, unchanged=1),
+            nrql_condition=dict(create=1, update=1, delete=0, unchanged=1),
+        )
+        by_op = {(a["kind"], a["op"]): a for a in plan["actions"]}
+        update = by_op[("nrql_condition", "update")]
+        assert update["changes"] == ["description"]
+        assert update["object"]["id"] == "102"
+        assert update["object"]["nrql_query"] == "SELECT count(*) FROM Transaction"
+        assert by_op[("nrql_condition", "create")]["policy_name"] == "policy-3"
+        assert by_op[("alert_policy", "update")]["object"]["id"] == "2"
+
+    def test_prune(self):
+        desired = dict(
+            alert_policy=[dict(name="policy-1", incident_preference="PER_POLICY")]
+        )
+        assert self.planner.plan(desired)["actions"] == []
+
+        plan = self.planner.plan(desired, prune=True)
+        assert [(a["op"], a["object"]["name"]) for a in plan["actions"]] == [
+            ("delete", "policy-2")
+        ]
+
+
+class TestPlanExecutor:
+    def test_apply(self, mocker):
+        policy_api = AlertPolicyApi("key")
+        condition_api = NrqlAlertConditionApi("key")
+        policy_query = mocker.patch.object(
+            policy_api,
+            "run_query",
+            return_value={"data": {"m0": {"id": 7}}},
+        )
+        condition_query = mocker.patch.object(
+            condition_api,
+            "run_query",
+            return_value={
+                "data": {
+                    "m0": {"id": 8, "entityGuid": "a"},
+                    "m1": {"id": 9, "entityGuid": "b"},
+                }
+            },
+        )
+        planner = Planner("1", live_objects_from_dump(LIVE_DUMP, "1"))
+        plan = planner.plan(
+            dict(
+                alert_policy=[dict(name="new", incident_preference="PER_POLICY")],
+                nrql_condition=[
+                    dict(name="c", policy_name="new", nrql_query="SELECT 1"),
+                    dict(name="d", policy_name="new", nrql_query="SELECT 2"),
+                ],
+            )
+        )
+
+        executor = PlanExecutor(
+            "1", policy_api=policy_api, condition_api=condition_api, batch_size=25
+        )
+        assert executor.apply(plan) == dict(
+            alert_policy=dict(create=1), nrql_condition=dict(create=2)
+        )
+
+        assert policy_query.call_count == 1
+        condition_mutation = condition_query.call_args.kwargs["query"]
+        assert condition_mutation.count("alertsNrqlConditionStaticCreate") == 2
+        assert "m1: alertsNrqlConditionStaticCreate" in condition_mutation
+        assert "policyId: 7" in condition_mutation.replace("  ", " ")
+
+    def test_partial_failure_can_be_resumed(self, mocker):
+        policy_api = AlertPolicyApi("key")
+        condition_api = NrqlAlertConditionApi("key")
+        mocker.patch.object(
+            policy_api, "run_query", return_value={"data": {"m0": {"id": 7}}}
+        )
+        condition_query = mocker.patch.object(
+            condition_api,
+            "run_query",
+            side_effect=[
+                {
+                    "data": {
+                        "m0": {"id": 8, "entityGuid": "a"},
+                        "m1": {"errors": [{"description": "bad"}]},
+                    }
+                },
+                {"data": {"m0": {"id": 9, "entityGuid": "b"}}},
+            ],
+        )
+        planner = Planner("1", live_objects_from_dump(LIVE_DUMP, "1"))
+        plan = planner.plan(
+            dict(
+                alert_policy=[dict(name="new", incident_preference="PER_POLICY")],
+                nrql_condition=[
+                    dict(name="c", policy_name="new", nrql_query="SELECT 1"),
+                    dict(name="d", policy_name="new", nrql_query="SELECT 2"),
+                ],
+            )
+        )
+
+        executor = PlanExecutor("1", policy_api=policy_api, condition_api=condition_api)
+        with pytest.raises(Exception, match="Failed to create nrql_condition"):
+            executor.apply(plan)
+        assert executor.applied == dict(
+            alert_policy=dict(create=1), nrql_condition=dict(create=1)
+        )
+        assert [a.get("applied", False) for a in plan["actions"]] == [
+            True,
+            True,
+            False,
+        ]
+
+        executor = PlanExecutor("1", policy_api=policy_api, condition_api=condition_api)
+        assert executor.apply(plan) == dict(nrql_condition=dict(create=1))
+        mutation = condition_query.call_args.kwargs["query"]
+        assert mutation.count("alertsNrqlConditionStaticCreate") == 1
+        assert "policyId: 7" in mutation.replace("  ", " ")
+
+    def test_unserializable_object(self, mocker):
+        policy_api = AlertPolicyApi("key")
+        run_query = mocker.patch.object(policy_api, "run_query")
+        planner = Planner("1", live_objects_from_dump(LIVE_DUMP, "1"))
+        plan = planner.plan(
+            dict(
+                alert_policy=[
+                    dict(name="good", incident_preference="PER_POLICY"),
+                    dict(name="bad\udc80", incident_preference="PER_POLICY"),
+                ]
+            )
+        )
+
+        executor = PlanExecutor("1", policy_api=policy_api)
+        with pytest.raises(ValueError, match="create mutation for alert_policy bad"):
+            executor.apply(plan)
+        run_query.assert_not_called()
@@ -0,0 +1,115 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+from unittest import mock
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.snapshot import (
+    AccountSnapshot,
+    AggregateFingerprint,
+    read_snapshot,
+)
+
+
+def _policy(i):
+    return AlertPolicy(
+        name="policy-%s" % i, incident_preference="PER_POLICY", account_id="1", id=i
+    )
+
+
+def _entity(guid):
+    entity = Entity(name="name-%s" % guid, account_id="1", guid=guid)
+    entity.tags = EntityTags(dict(team=["payments"]))
+    return entity
+
+
+class TestAggregateFingerprint:
+    def test_order_independent(self):
+        fingerprints = [_policy(i).fingerprint for i in range(5)]
+        forward, backward = AggregateFingerprint(), AggregateFingerprint()
+        for fp in fingerprints:
+            forward.add(fp)
+        for fp in reversed(fingerprints):
+            backward.add(fp)
+
+        assert forward.hexdigest() == backward.hexdigest()
+        assert forward.count == 5
+
+        backward.add(_policy(5).fingerprint)
+        assert forward.hexdigest() != backward.hexdigest()
+
+
+class TestAccountSnapshot:
+    def setup_method(self):
+        self.policy_api = mock.Mock()
+        self.policy_api.iter_policies_from_query.side_effect = lambda *a: iter(
+            [_policy(1), _policy(2)]
+        )
+        self.entity_api = mock.Mock()
+        self.entity_api.iter_entities_from_query.side_effect = lambda *a, **k: iter(
+            [_entity("a")]
+        )
+        self.snapshot = AccountSnapshot(
+            account_id="1", policy_api=self.policy_api, entity_api=self.entity_api
+        )
+
+    def test_write(self, tmp_path):
+        path = str(tmp_path / "snapshot.ndjson.gz")
+        manifest = self.snapshot.write(path, kinds=["alert_policy", "entity_tags"])
+
+        records = list(read_snapshot(path))
+        assert [kind for kind, _ in records] == [
+            "alert_policy",
+            "alert_policy",
+            "entity_tags",
+        ]
+        assert records[0][1] == json.loads(json.dumps(_policy(1).to_json()))
+        assert manifest["kinds"]["alert_policy"]["count"] == 2
+        assert manifest["kinds"]["entity_tags"]["count"] == 1
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".snapshot")]
+
+    def test_manifest_is_stable(self, tmp_path):
+        first = self.snapshot.write(str(tmp_path / "a.gz"), kinds=["alert_policy"])
+        self.policy_api.iter_policies_from_query.side_effect = lambda *a: iter(
+            [_policy(2), _policy(1)]
+        )
+        second = self.snapshot.write(str(tmp_path / "b.gz"), kinds=["alert_policy"])
+
+        assert first["fingerprint"] == second["fingerprint"]
+        assert first["kinds"] == second["kinds"]
+
+    def test_unsupported_conditions_are_skipped(self, tmp_path):
+        condition_api = NrqlAlertConditionApi("key")
+        page = [
+            {"id": "1", "name": "static", "policyId": "10", "type": "STATIC"},
+            {"id": "2", "name": "baseline", "policyId": "10", "type": "BASELINE"},
+            {"id": "3", "name": "outlier", "policyId": "10", "type": "OUTLIER"},
+        ]
+        search = dict(nrqlConditions=page, nextCursor=None)
+        condition_api.run_query = mock.Mock(
+            return_value=dict(
+                data=dict(
+                    actor=dict(account=dict(alerts=dict(nrqlConditionsSearch=search)))
+                )
+            )
+        )
+        snapshot = AccountSnapshot(account_id="1", condition_api=condition_api)
+        path = str(tmp_path / "snapshot.ndjson.gz")
+
+        manifest = snapshot.write(path, kinds=["nrql_condition"])
+
+        assert [obj["name"] for _, obj in read_snapshot(path)] == ["static"]
+        assert manifest["kinds"]["nrql_condition"]["count"] == 1
+        assert manifest["kinds"]["nrql_condition"]["skipped"] == 2
@@ -0,0 +1,140 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from unittest import mock
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.api import (
+    NrqlAlertConditionApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_condition.objects import (
+    NrqlStaticAlertCondition,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.sync import (
+    IncrementalSync,
+    SyncState,
+)
+
+
+def _policy(i):
+    return AlertPolicy(
+        name="policy-%s" % i, incident_preference="PER_POLICY", account_id="1", id=i
+    )
+
+
+def _condition(i, policy_id, updated_at, description=""):
+    condition = NrqlStaticAlertCondition(
+        name="condition-%s" % i, account_id="1", policy_id=policy_id, id=i
+    )
+    condition.description = description
+    condition.updated_at = updated_at
+    return condition
+
+
+class TestSyncState:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "state.json")
+        state = SyncState(account_id="1")
+        state.synced_at = 5
+        state.objects["alert_policy"]["1"] = dict(fingerprint="a", marker="a", state={})
+        state.save(path)
+
+        loaded = SyncState.load(path, "1")
+        assert loaded.synced_at == 5
+        assert loaded.objects["alert_policy"] == state.objects["alert_policy"]
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".sync_state")]
+
+        assert SyncState.load(path, "2").objects["alert_policy"] == {}
+        assert SyncState.load(str(tmp_path / "missing.json"), "1").synced_at is None
+
+
+class TestIncrementalSync:
+    def setup_method(self):
+        self.conditions = {
+            "1": _condition("1", "10", 100),
+            "2": _condition("2", "20", 200),
+        }
+        self.condition_api = mock.Mock()
+        self.condition_api.iter_conditions_from_query.side_effect = self._conditions
+        self.policy_api = mock.Mock()
+        self.policy_api.iter_policies_from_query.side_effect = lambda *a: iter(
+            [_policy("10"), _policy("20")]
+        )
+        self.state = SyncState(account_id="1")
+
+    def _conditions(self, query, account_id, fields=None, skip_unsupported=False):
+        conditions = list(self.conditions.values())
+        if query:
+            policy_id = query.split('"')[1]
+            conditions = [c for c in conditions if c.policy_id == policy_id]
+        return iter(conditions)
+
+    def _sync(self, **kwargs):
+        syncer = IncrementalSync(
+            self.state, policy_api=self.policy_api, condition_api=self.condition_api
+        )
+        return syncer.sync(kinds=["alert_policy", "nrql_condition"], **kwargs)
+
+    def test_only_changed_policies_are_refetched(self):
+        changes = self._sync(full=True)
+        assert changes["nrql_condition"].created == ["1", "2"]
+        self.condition_api.iter_conditions_from_query.reset_mock()
+
+        # nothing changed, so only the projection is read
+        changes = self._sync()
+        assert not any(changes.values())
+        assert self.condition_api.iter_conditions_from_query.call_count == 1
+        call = self.condition_api.iter_conditions_from_query.call_args
+        assert call.kwargs["fields"] == ["updated_at"]
+        self.condition_api.iter_conditions_from_query.reset_mock()
+
+        self.conditions["2"] = _condition("2", "20", 300, description="new")
+        del self.conditions["1"]
+        changes = self._sync()
+        assert changes["nrql_condition"].to_json() == {
+            "created": [],
+            "updated": ["2"],
+            "deleted": ["1"],
+        }
+        queries = [
+            c.args[0]
+            for c in self.condition_api.iter_conditions_from_query.call_args_list
+        ]
+        assert queries == ["", 'policyId: "20"']
+        assert (
+            self.state.objects["nrql_condition"]["2"]["state"]["description"] == "new"
+        )
+
+    def test_full_sync_time(self):
+        self._sync()
+        assert self.state.full_synced_at == {}
+        assert self.state.is_stale(max_age=60)
+
+        self._sync(full=True)
+        assert not self.state.is_stale(
+            max_age=60, kinds=["alert_policy", "nrql_condition"]
+        )
+        assert self.state.is_stale(max_age=60)
+
+    def test_unsupported_conditions_are_skipped(self):
+        page = [
+            {"id": "1", "name": "static", "policyId": "10", "type": "STATIC"},
+            {"id": "2", "name": "baseline", "policyId": "10", "type": "BASELINE"},
+        ]
+        search = dict(nrqlConditions=page, nextCursor=None)
+        self.condition_api = NrqlAlertConditionApi("key")
+        self.condition_api.run_query = mock.Mock(
+            return_value=dict(
+                data=dict(
+                    actor=dict(account=dict(alerts=dict(nrqlConditionsSearch=search)))
+                )
+            )
+        )
+
+        changes = self._sync(full=True)
+
+        assert changes["nrql_condition"].created == ["1"]
+        assert list(self.state.objects["nrql_condition"]) == ["1"]
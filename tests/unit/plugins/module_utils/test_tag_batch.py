@@ -0,0 +1,88 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from unittest import mock
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_batch import (
+    TagBatch,
+    TagRequest,
+)
+
+
+def _entity(guid, tags):
+    entity = Entity(name="name-%s" % guid, account_id="1", guid=guid)
+    entity.tags = EntityTags(tags)
+    return entity
+
+
+def test_tag_request_from_params():
+    request = TagRequest.from_params("web01", dict(guid="a", tags=dict(team=["x"])))
+    assert (request.state, request.append) == ("present", True)
+
+    with pytest.raises(ValueError):
+        TagRequest.from_params("web01", dict(guid="a"))
+    with pytest.raises(ValueError):
+        TagRequest.from_params("web01", dict(guid="a", tags={}, bad=1))
+    with pytest.raises(ValueError):
+        TagRequest.from_params("web01", dict(guid="a", tags={}, state="gone"))
+
+
+class TestTagBatch:
+    def setup_method(self):
+        self.api = mock.Mock()
+        self.api.iter_entities_by_guids.return_value = iter(
+            [_entity("a", dict(team=["x"])), _entity("b", dict(team=["y"]))]
+        )
+        self.requests = [
+            TagRequest("web01", "a", dict(team=["x"])),
+            TagRequest("web02", "b", dict(team=[]), state="absent"),
+            TagRequest("web03", "b", dict(team=["z"])),
+            TagRequest("web04", "c", dict(team=["z"])),
+        ]
+        self.batch = TagBatch(self.api, self.requests)
+
+    def test_plan(self):
+        results = self.batch.plan()
+
+        self.api.iter_entities_by_guids.assert_called_once_with(
+            ["a", "b", "c"], 25, tags_only=True
+        )
+        assert results["web01"]["changed"] is False
+        assert results["web02"]["changed"] is True
+        assert results["web02"]["changed_tags"] == {"team": ["y"]}
+        assert results["web02"]["diff"]["after"] == {}
+        assert "already managed by host web02" in results["web03"]["msg"]
+        assert results["web04"]["failed"] is True
+        assert list(self.batch.diffs) == ["web02"]
+
+    def test_apply_and_wait(self, mocker):
+        self.batch.plan()
+        markers = self.batch.apply()
+
+        self.api.apply_tag_diffs.assert_called_once_with(
+            [self.batch.diffs["web02"]], 25
+        )
+        assert markers["web02"]["state"] == "absent"
+        assert markers["web02"]["guid"] == "b"
+
+        sleep = mocker.patch(
+            "ansible_collections.newrelic.core.plugins.module_utils.entity.tag_batch.time.sleep"
+        )
+        self.api.iter_entities_by_guids.side_effect = [
+            iter([_entity("b", dict(team=["y"]))]),
+            iter([_entity("b", dict())]),
+        ]
+        self.batch.wait(markers, timeout=10)
+        assert sleep.call_count == 2
+
+        self.api.iter_entities_by_guids.side_effect = None
+        self.api.iter_entities_by_guids.return_value = [_entity("b", dict(team=["y"]))]
+        with pytest.raises(Exception, match="Timedout"):
+            self.batch.wait(markers, timeout=3)
@@ -0,0 +1,80 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.api import EntityApi
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_diff import (
+    diff_entity_tags,
+    diff_many_entity_tags,
+)
+
+
+def _tags(**kwargs):
+    return EntityTags(kwargs)
+
+
+class TestDiffEntityTags:
+    def setup_method(self):
+        self.current = _tags(one=["1", "11"], two=["2"])
+
+    def test_append(self):
+        diff = diff_entity_tags(self.current, _tags(one=["1", "3"], new=["n"]))
+
+        assert diff.to_json() == {"one": ["3"], "new": ["n"]}
+        assert not diff.replacements.tags
+        assert self.current.to_json()["one"] != ["3"]
+        assert diff.apply_to(self.current) == _tags(
+            one=["1", "11", "3"], two=["2"], new=["n"]
+        )
+
+    def test_replace(self):
+        diff = diff_entity_tags(
+            self.current, _tags(one=["1", "3"], two=["2"]), append=False
+        )
+
+        assert set(diff.to_json()["one"]) == {"1", "3"}
+        assert diff.removed_key_names == ["one"]
+        assert diff.apply_to(self.current) == _tags(one=["1", "3"], two=["2"])
+
+    def test_absent(self):
+        diff = diff_entity_tags(
+            self.current, _tags(one=["1"], two=[], missing=[]), state="absent"
+        )
+
+        assert diff.value_removals == _tags(one=["1"])
+        assert diff.key_removals == _tags(two=["2"])
+        assert diff.apply_to(self.current) == _tags(one=["11"])
+
+        # values that are not all present are left alone
+        assert not diff_entity_tags(self.current, _tags(one=["1", "x"]), "absent")
+
+    def test_no_change(self):
+        assert not diff_entity_tags(self.current, _tags(one=["1"]))
+        assert not diff_entity_tags(self.current, self.current, append=False)
+
+
+class TestBatchedTagChanges:
+    def test_diff_many_and_apply(self, mocker):
+        entities = []
+        for guid in ("a", "b", "c"):
+            entity = Entity(name=guid, account_id="1", guid=guid)
+            entity.tags = _tags(env=["prod"])
+            entities.append(entity)
+        desired = {"a": _tags(env=["dev"]), "b": _tags(env=["prod"])}
+
+        diffs = diff_many_entity_tags(entities, desired, append=False)
+        assert list(diffs) == ["a"]
+
+        api = EntityApi("key")
+        run_query = mocker.patch.object(
+            api, "run_query", return_value={"data": {"addTags0": {"errors": []}}}
+        )
+        api.apply_tag_diffs(list(diffs.values()))
+
+        query = run_query.call_args.kwargs["query"]
+        assert query.index("removeKeys0:") < query.index("addTags0:")
+        assert '"dev"' in query
@@ -0,0 +1,77 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.tag_index import (
+    TagIndex,
+)
+
+
+def _entity(guid, account_id="1", **tags):
+    entity = Entity(name="name-%s" % guid, account_id=account_id, guid=guid)
+    entity.tags = EntityTags(tags)
+    entity.type = "APPLICATION"
+    return entity
+
+
+class TestTagIndex:
+    def setup_method(self):
+        self.tag_index = TagIndex(account_id="1")
+        self.tag_index.add_entity(_entity("a", team="payments", env=["prod", "dr"]))
+        self.tag_index.add_entity(_entity("b", team="payments", env="dev"))
+        self.tag_index.add_entity(_entity("c", team="search"))
+
+    def test_search(self):
+        assert self.tag_index.search(tags=dict(team="payments")) == ["a", "b"]
+        assert self.tag_index.search(tags=dict(team="payments", env="prod")) == ["a"]
+        assert self.tag_index.search(tags=dict(env=["dr", "dev"])) == ["a", "b"]
+        assert self.tag_index.search(tags=dict(env=None)) == ["a", "b"]
+        assert self.tag_index.search(missing_tags=["env"]) == ["c"]
+        assert self.tag_index.search(tags=dict(team="other")) == []
+        assert self.tag_index.search() == ["a", "b", "c"]
+
+    def test_replace_and_remove(self):
+        self.tag_index.add_entity(_entity("a", team="search"))
+        assert self.tag_index.search(tags=dict(team="search")) == ["a", "c"]
+        assert "prod" not in self.tag_index.index["env"]
+
+        self.tag_index.remove_entity("c")
+        self.tag_index.remove_entity("missing")
+        assert self.tag_index.search(tags=dict(team="search")) == ["a"]
+        assert len(self.tag_index) == 2
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "index.json")
+        self.tag_index.updated_at = 100
+        self.tag_index.save(path)
+
+        loaded = TagIndex.load(path, account_id="1")
+        assert loaded.to_json() == self.tag_index.to_json()
+        assert loaded.search(tags=dict(env="dev")) == ["b"]
+
+        # index for another account is ignored
+        assert len(TagIndex.load(path, account_id="2")) == 0
+        assert len(TagIndex.load(str(tmp_path / "missing.json"), account_id="1")) == 0
+
+    def test_build_and_refresh(self, mocker):
+        api = mocker.Mock()
+        api.iter_entities_from_query.return_value = iter(
+            [_entity("x", team="payments"), _entity("y")]
+        )
+        self.tag_index.build(api)
+
+        assert api.iter_entities_from_query.call_args.args[0] == "accountId = 1"
+        assert self.tag_index.search() == ["x", "y"]
+        assert not self.tag_index.is_stale(60)
+
+        api.iter_entities_by_guids.return_value = iter(
+            [_entity("x", team="search"), _entity("other", account_id="2")]
+        )
+        self.tag_index.refresh_entities(api, ["x", "y", "other"])
+
+        assert self.tag_index.search() == ["x"]
+        assert self.tag_index.search(tags=dict(team="search")) == ["x"]
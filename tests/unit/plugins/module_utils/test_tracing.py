@@ -0,0 +1,170 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import threading
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils import tracing
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.api import (
+    AlertPolicyApi,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.fan_out import (
+    search_accounts,
+)
+
+
+POLICIES_PAGE = {
+    "data": {
+        "actor": {
+            "account": {
+                "alerts": {
+                    "policiesSearch": {
+                        "policies": [
+                            dict(
+                                id="1",
+                                name="foo",
+                                accountId=1234,
+                                incidentPreference="PER_POLICY",
+                            )
+                        ],
+                        "nextCursor": None,
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+@pytest.fixture
+def trace_path(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracing.configure_tracing(path)
+    yield path
+    tracing.configure_tracing()
+
+
+def _response(mocker, data):
+    response = mocker.Mock()
+    response.status_code = 200
+    response.content = json.dumps(data).encode("utf-8")
+    response.headers = {}
+    return response
+
+
+def _spans(path):
+    tracing.get_tracer().close()
+    with open(path) as f:
+        return {span["name"]: span for span in map(json.loads, f)}
+
+
+def _spans_named(path, name):
+    tracing.get_tracer().close()
+    with open(path) as f:
+        return [span for span in map(json.loads, f) if span["name"] == name]
+
+
+class TestQuerySpans:
+    def test_page_and_run_query(self, mocker, trace_path):
+        mocker.patch("requests.post", return_value=_response(mocker, POLICIES_PAGE))
+
+        AlertPolicyApi("key").get_policies_from_query("", "1234", cursor="abc")
+
+        spans = _spans(trace_path)
+        page = spans["nerdgraph.page"]
+        run_query = spans["nerdgraph.run_query"]
+        assert page["attributes"]["operation"] == "policiesSearch"
+        assert page["attributes"]["account_id"] == "1234"
+        assert page["attributes"]["cursor"] == "abc"
+        assert page["attributes"]["results"] == 1
+        assert run_query["attributes"]["operation"] == "policiesSearch"
+        assert run_query["attributes"]["account_id"] == "1234"
+        assert run_query["attributes"]["status_code"] == 200
+        assert run_query["parent_id"] == page["span_id"]
+        assert page["parent_id"] is None
+        assert run_query["trace_id"] == page["trace_id"]
+
+    def test_first_page_has_no_cursor(self, mocker, trace_path):
+        mocker.patch("requests.post", return_value=_response(mocker, POLICIES_PAGE))
+
+        AlertPolicyApi("key").get_policies_from_query("", "1234")
+
+        assert "cursor" not in _spans(trace_path)["nerdgraph.page"]["attributes"]
+
+    def test_propagation_wait(self, mocker, trace_path):
+        mocker.patch("requests.post", return_value=_response(mocker, POLICIES_PAGE))
+        api = AlertPolicyApi("key", propegation_timeout=20)
+
+        with api.trace_propagation_wait("alert_policy", "1234", guid="abc"):
+            api.get_policies_from_query("", "1234")
+
+        spans = _spans(trace_path)
+        wait = spans["nerdgraph.propagation_wait"]
+        assert wait["attributes"]["kind"] == "alert_policy"
+        assert wait["attributes"]["account_id"] == "1234"
+        assert wait["attributes"]["timeout"] == 20
+        assert wait["attributes"]["guid"] == "abc"
+        assert spans["nerdgraph.page"]["parent_id"] == wait["span_id"]
+
+    def test_errors_are_recorded(self, mocker, trace_path):
+        mocker.patch("requests.post", side_effect=ConnectionError("down"))
+
+        with pytest.raises(ConnectionError):
+            AlertPolicyApi("key").get_policies_from_query("", "1234")
+
+        spans = _spans(trace_path)
+        assert spans["nerdgraph.run_query"]["status"] == "error"
+        assert spans["nerdgraph.page"]["attributes"]["error"] == "ConnectionError: down"
+
+
+class TestThreads:
+    def test_fan_out_workers_are_children(self, trace_path):
+        tracer = tracing.get_tracer()
+        threads = set()
+
+        def fetch_page(cursors):
+            threads.add(threading.get_ident())
+            with tracer.span("worker", accounts=list(cursors)):
+                with tracer.span("worker.child"):
+                    pass
+            return {account_id: ([account_id], None) for account_id in cursors}
+
+        with tracer.span("module.run") as root:
+            search_accounts(
+                fetch_page, ["1", "2", "3"], max_workers=3, accounts_per_query=1
+            )
+
+        assert threading.get_ident() not in threads
+        workers = _spans_named(trace_path, "worker")
+        children = _spans_named(trace_path, "worker.child")
+        assert len(workers) == len(children) == 3
+        assert all(w["parent_id"] == root.span_id for w in workers)
+        assert sorted(c["parent_id"] for c in children) == sorted(
+            w["span_id"] for w in workers
+        )
+
+
+class TestNoopTracer:
+    def test_disabled(self, mocker, tmp_path):
+        tracer = tracing.configure_tracing()
+        mocker.patch("requests.post", return_value=_response(mocker, POLICIES_PAGE))
+
+        policies, _ = AlertPolicyApi("key").get_policies_from_query("", "1234")
+
+        assert [p.name for p in policies] == ["foo"]
+        assert isinstance(tracer, tracing.NoopTracer)
+        span = tracer.span("nerdgraph.run_query", operation="x")
+        assert span is tracer.span("nerdgraph.page")
+        assert span.recording is False
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_query_attributes():
+    query = "{ actor { account(id: 1234) { alerts { policiesSearch(cursor: 1) } } } }"
+    assert tracing.query_operation(query) == "policiesSearch"
+    assert tracing.query_account_id(query) == "1234"
+    assert tracing.query_operation("{ actor { user { id } } }") == "query"
+    assert tracing.query_account_id("mutation { x(accountId: 55) }") == "55"
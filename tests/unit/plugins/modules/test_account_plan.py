@@ -0,0 +1,71 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.modules.account_plan import (
+    main as module_main,
+)
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, tmp_path):
+        self.live_path = tmp_path / "live.json"
+        self.live_path.write_text(
+            json.dumps(
+                dict(
+                    alert_policy=[
+                        dict(
+                            id="1",
+                            name="foo",
+                            accountId="1234",
+                            incidentPreference="PER_POLICY",
+                        )
+                    ]
+                )
+            )
+        )
+        self.plan_path = tmp_path / "plan.json"
+
+    def test_plan(self, mocker, tmp_path):
+        self.__prepare(tmp_path)
+        run_query = mocker.patch(
+            "ansible_collections.newrelic.core.plugins.module_utils.nerdgraph_api_base.NerdGraphApiBase.run_query"
+        )
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                live_path=str(self.live_path),
+                plan_path=str(self.plan_path),
+                desired=dict(
+                    alert_policy=[
+                        dict(name="foo", incident_preference="PER_CONDITION"),
+                        dict(name="bar", incident_preference="PER_POLICY"),
+                    ]
+                ),
+            ),
+        )
+
+        assert result["changed"] is True
+        assert result["actions"] == 2
+        assert result["summary"]["alert_policy"]["update"] == 1
+        plan = json.loads(self.plan_path.read_text())
+        assert [a["op"] for a in plan["actions"]] == ["create", "update"]
+        run_query.assert_not_called()
+
+    def test_no_changes(self, tmp_path):
+        self.__prepare(tmp_path)
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                live_path=str(self.live_path),
+                plan_path=str(self.plan_path),
+                desired=dict(alert_policy=[dict(name="foo")]),
+            ),
+        )
+
+        assert result["changed"] is False
+        assert json.loads(self.plan_path.read_text())["actions"] == []
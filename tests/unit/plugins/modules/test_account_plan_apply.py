@@ -0,0 +1,89 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.module_utils.plan import (
+    read_plan,
+    write_plan,
+)
+from ansible_collections.newrelic.core.plugins.modules.account_plan_apply import (
+    main as module_main,
+)
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, mocker, tmp_path, account_id="1234"):
+        self.plan_path = str(tmp_path / "plan.json")
+        write_plan(
+            dict(
+                version=1,
+                account_id=account_id,
+                summary={},
+                actions=[
+                    dict(
+                        kind="alert_policy",
+                        op="delete",
+                        object=dict(id="1", name="foo", incident_preference=None),
+                    ),
+                    dict(
+                        kind="alert_policy",
+                        op="create",
+                        object=dict(name="bar", incident_preference="PER_POLICY"),
+                    ),
+                ],
+            ),
+            self.plan_path,
+        )
+        self.run_query = mocker.patch(
+            "ansible_collections.newrelic.core.plugins.modules.account_plan_apply.AlertPolicyApi.run_query",
+            side_effect=[{"data": {"m0": {"id": 2}}}, {"data": {"m0": {"id": 1}}}],
+        )
+
+    def test_apply(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path)
+        result = run_module(
+            module_entry=module_main, module_args=dict(plan_path=self.plan_path)
+        )
+
+        assert result["changed"] is True
+        assert result["applied"] == dict(alert_policy=dict(create=1, delete=1))
+        queries = [c.kwargs["query"] for c in self.run_query.call_args_list]
+        assert "alertsPolicyCreate" in queries[0]
+        assert "alertsPolicyDelete" in queries[1]
+
+    def test_wrong_account(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path, account_id="999")
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(plan_path=self.plan_path),
+            expect_success=False,
+        )
+
+        assert "999" in result["msg"]
+        self.run_query.assert_not_called()
+
+    def test_partial_failure(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path)
+        self.run_query.side_effect = [
+            {"data": {"m0": {"id": 2}}},
+            {"data": {"m0": {"errors": [{"description": "nope"}]}}},
+            {"data": {"m0": {"id": 1}}},
+        ]
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(plan_path=self.plan_path),
+            expect_success=False,
+        )
+        assert result["applied"] == dict(alert_policy=dict(create=1))
+        assert [a.get("applied") for a in read_plan(self.plan_path)["actions"]] == [
+            None,
+            True,
+        ]
+
+        result = run_module(
+            module_entry=module_main, module_args=dict(plan_path=self.plan_path)
+        )
+        assert result["applied"] == dict(alert_policy=dict(delete=1))
+        assert self.run_query.call_count == 3
@@ -0,0 +1,59 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.snapshot import (
+    read_snapshot,
+)
+from ansible_collections.newrelic.core.plugins.modules.account_snapshot import (
+    main as module_main,
+)
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, mocker):
+        self.module_path = (
+            "ansible_collections.newrelic.core.plugins.modules.account_snapshot"
+        )
+        self.policy = AlertPolicy(
+            name="foo", incident_preference="PER_POLICY", account_id="1234", id="1"
+        )
+        self.policy_search = mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            side_effect=[([self.policy], "next"), ([self.policy], None)],
+        )
+
+    def test_snapshot(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        path = str(tmp_path / "snapshot.ndjson.gz")
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(path=path, kinds=["alert_policy"]),
+        )
+
+        assert result["changed"] is True
+        assert result["manifest"]["kinds"]["alert_policy"]["count"] == 2
+        assert self.policy_search.call_args.kwargs["cursor"] == "next"
+        assert len(list(read_snapshot(path))) == 2
+        with open(path + ".manifest.json") as f:
+            assert json.load(f)["fingerprint"] == result["manifest"]["fingerprint"]
+
+    def test_check_mode(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        path = tmp_path / "snapshot.ndjson.gz"
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(path=str(path), _ansible_check_mode=True),
+        )
+
+        assert result["changed"] is True
+        assert "manifest" not in result
+        assert not path.exists()
+        self.policy_search.assert_not_called()
@@ -0,0 +1,58 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.modules.account_sync import (
+    main as module_main,
+)
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, mocker):
+        self.module_path = (
+            "ansible_collections.newrelic.core.plugins.modules.account_sync"
+        )
+        self.policy = AlertPolicy(
+            name="foo", incident_preference="PER_POLICY", account_id="1234", id="1"
+        )
+        self.policy_search = mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            return_value=([self.policy], None),
+        )
+
+    def test_sync(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        path = str(tmp_path / "state.json")
+        module_args = dict(state_path=path, kinds=["alert_policy"], return_objects=True)
+        result = run_module(module_entry=module_main, module_args=module_args)
+
+        assert result["changed"] is True
+        assert result["full"] is True
+        assert result["changes"]["alert_policy"]["created"] == ["1"]
+        assert result["objects"]["alert_policy"]["1"]["name"] == "foo"
+        with open(path) as f:
+            assert json.load(f)["account_id"] == "1234"
+
+        result = run_module(module_entry=module_main, module_args=module_args)
+        assert result["changed"] is False
+        assert result["full"] is False
+
+    def test_check_mode(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        path = tmp_path / "state.json"
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                state_path=str(path), kinds=["alert_policy"], _ansible_check_mode=True
+            ),
+        )
+
+        assert result["changed"] is True
+        assert not path.exists()
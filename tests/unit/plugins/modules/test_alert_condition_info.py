@@ -2,6 +2,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import json
+
 from ...common.utils import run_module, ModuleTestCase
 
 from ansible_collections.newrelic.core.plugins.modules.alert_condition_info import (
@@ -63,3 +65,43 @@ class TestNrModule(ModuleTestCase):
         assert self.mock_api.get_conditions_from_query.call_count == 2
         assert result["changed"] is False
         assert result["conditions"] == [c.to_json() for c in conditions]
+
+    def test_account_ids(self, mocker):
+        self.__prepare(mocker)
+        pages = [
+            {
+                "11": ([NrqlAlertConditionBase(name="1", account_id="11")], "next"),
+                "22": ([NrqlAlertConditionBase(name="2", account_id="22")], None),
+            },
+            {"11": ([NrqlAlertConditionBase(name="3", account_id="11")], None)},
+        ]
+        self.mock_api.get_conditions_from_accounts.side_effect = pages
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(name_like="%", account_ids=["11", "22"], max_workers=1),
+        )
+
+        calls = self.mock_api.get_conditions_from_accounts.call_args_list
+        assert [c.args[1] for c in calls] == [{"11": "", "22": ""}, {"11": "next"}]
+        assert [c["name"] for c in result["conditions_by_account"]["11"]] == ["1", "3"]
+        assert [c["name"] for c in result["conditions_by_account"]["22"]] == ["2"]
+        assert len(result["conditions"]) == 3
+        self.mock_api.get_conditions_from_query.assert_not_called()
+
+    def test_output_file(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        conditions = [
+            NrqlAlertConditionBase(name="1", account_id="1234"),
+            NrqlAlertConditionBase(name="12", account_id="1234"),
+        ]
+        self.mock_api.iter_conditions_from_query.return_value = iter(conditions)
+        path = tmp_path / "conditions.jsonl"
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(name_like="1", fields=["name"], output_file=str(path)),
+        )
+
+        assert result["count"] == 2
+        assert result["conditions"] == []
+        with open(path) as f:
+            assert [json.loads(line)["name"] for line in f] == ["1", "12"]
@@ -2,6 +2,9 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import json
+import logging
+
 from ...common.utils import run_module, ModuleTestCase
 
 from ansible_collections.newrelic.core.plugins.modules.alert_policy import (
@@ -11,6 +14,12 @@ from ansible_collections.newrelic.core.plugins.modules.alert_policy import (
 from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
     AlertPolicy,
 )
+from ansible_collections.newrelic.core.plugins.module_utils.module_base import (
+    RingBufferHandler,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    PendingPropagationStore,
+)
 
 
 class TestNrModule(ModuleTestCase):
@@ -22,7 +31,7 @@ class TestNrModule(ModuleTestCase):
             incident_preference="PER_POLICY",
             account_id=self.default_args["account_id"],
         )
-        mocker.patch(
+        self.api_new = mocker.patch(
             "ansible_collections.newrelic.core.plugins.modules.alert_policy.AlertPolicyApi.__new__",
             return_value=self.mock_api,
         )
@@ -57,6 +66,29 @@ class TestNrModule(ModuleTestCase):
         assert result["changed"] is True
         assert result["policy"]["id"] == 1
 
+    def test_present_create_mutation_consistency(self, mocker, tmp_path):
+        def set_policy_id(policy):
+            policy.id = 1
+
+        self.__prepare(mocker)
+        self.mock_api.get_policy_by_name_and_account.return_value = None
+        self.mock_api.create_policy.side_effect = set_policy_id
+        propagation_file = str(tmp_path / "pending.json")
+        module_args = {
+            **self.default_args,
+            **dict(consistency="mutation", propagation_file=propagation_file),
+        }
+        result = run_module(module_entry=module_main, module_args=module_args)
+
+        # the api is told not to wait for the change
+        assert self.api_new.call_args.args[2] is False
+        assert result["changed"] is True
+        assert result["pending_propagation"]["kind"] == "alert_policy"
+        assert result["pending_propagation"]["id"] == "1"
+        assert PendingPropagationStore(propagation_file).load() == [
+            result["pending_propagation"]
+        ]
+
     def test_present_no_change(self, mocker):
         self.__prepare(mocker)
         self.test_policy.id = 1
@@ -76,3 +108,73 @@ class TestNrModule(ModuleTestCase):
         self.mock_api.update_policy.assert_called_once()
         assert result["changed"] is True
         assert result["policy"]["id"] == 1
+
+    def test_check_mode(self, mocker):
+        self.__prepare(mocker)
+        self.test_policy.id = 1
+        check_args = {**self.default_args, **dict(_ansible_check_mode=True)}
+
+        # create
+        self.mock_api.get_policy_by_name_and_account.return_value = None
+        result = run_module(module_entry=module_main, module_args=dict(check_args))
+        assert result["changed"] is True
+        assert result["diff"]["before"] == {}
+        assert result["diff"]["after"]["incident_preference"] == "PER_POLICY"
+
+        # update
+        self.mock_api.get_policy_by_name_and_account.return_value = self.test_policy
+        result = run_module(
+            module_entry=module_main,
+            module_args={**check_args, **dict(incident_preference="PER_CONDITION")},
+        )
+        assert result["changed"] is True
+        assert result["diff"]["before"]["incident_preference"] == "PER_POLICY"
+        assert result["diff"]["after"]["incident_preference"] == "PER_CONDITION"
+        assert "fingerprint" not in result["diff"]["after"]
+
+        # delete
+        result = run_module(
+            module_entry=module_main,
+            module_args={**check_args, **dict(state="absent")},
+        )
+        assert result["changed"] is True
+        assert result["diff"]["after"] == {}
+
+        self.mock_api.create_policy.assert_not_called()
+        self.mock_api.update_policy.assert_not_called()
+        self.mock_api.delete_policy.assert_not_called()
+
+    def test_trace_file(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        trace_file = tmp_path / "spans.jsonl"
+        self.mock_api.get_policy_by_name_and_account.return_value = None
+        module_args = {**self.default_args, **dict(trace_file=str(trace_file))}
+        run_module(module_entry=module_main, module_args=module_args)
+
+        spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert [s["name"] for s in spans] == ["module.run"]
+        assert spans[0]["status"] == "ok"
+        assert spans[0]["attributes"]["account_id"] == "1234"
+
+    def test_log_capture_does_not_accumulate(self, mocker):
+        self.__prepare(mocker)
+        self.mock_api.get_policy_by_name_and_account.return_value = None
+        module_args = {**self.default_args, **dict(log_level="INFO")}
+        for _ in range(3):
+            result = run_module(module_entry=module_main, module_args=module_args)
+
+        assert result["stdout_lines"] == ["Policy does not exist, it will be created."]
+        assert not any(
+            isinstance(h, RingBufferHandler) for h in logging.getLogger().handlers
+        )
+        namespace_logger = logging.getLogger("ansible_collections.newrelic.core")
+        assert (
+            len(
+                [
+                    h
+                    for h in namespace_logger.handlers
+                    if isinstance(h, RingBufferHandler)
+                ]
+            )
+            == 2
+        )
@@ -2,6 +2,8 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import json
+
 from ...common.utils import run_module, ModuleTestCase
 
 from ansible_collections.newrelic.core.plugins.modules.alert_policy_info import (
@@ -63,3 +65,71 @@ class TestNrModule(ModuleTestCase):
         assert self.mock_api.get_policies_from_query.call_count == 2
         assert result["changed"] is False
         assert result["policies"] == [p.to_json() for p in policies]
+
+    def test_fields(self, mocker):
+        self.__prepare(mocker)
+        policy = AlertPolicy(
+            name="1", incident_preference=None, account_id="1234", id=1
+        )
+        self.mock_api.get_policies_from_query.return_value = ([policy], None)
+        result = run_module(module_entry=module_main, module_args=dict(fields=["name"]))
+
+        assert self.mock_api.get_policies_from_query.call_args.kwargs["fields"] == [
+            "name"
+        ]
+        assert result["policies"] == [{"id": "1", "name": "1", "account_id": "1234"}]
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(fields=["bad"]),
+            expect_success=False,
+        )
+        assert result["failed"] is True
+
+    def test_account_ids(self, mocker):
+        self.__prepare(mocker)
+
+        def pages(query, cursors, fields=None):
+            return {
+                account_id: (
+                    [
+                        AlertPolicy(
+                            name="1", incident_preference="", account_id=account_id
+                        )
+                    ],
+                    None,
+                )
+                for account_id in cursors
+            }
+
+        self.mock_api.get_policies_from_accounts.side_effect = pages
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(name_like="1", account_ids=["11", "22"]),
+        )
+
+        assert self.mock_api.get_policies_from_accounts.call_count == 1
+        assert self.mock_api.get_policies_from_accounts.call_args.args[0] == (
+            'nameLike: "1"'
+        )
+        assert set(result["policies_by_account"]) == {"11", "22"}
+        assert result["policies_by_account"]["22"][0]["account_id"] == "22"
+        assert len(result["policies"]) == 2
+
+    def test_output_file(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        policies = [
+            AlertPolicy(name="1", incident_preference="", account_id="1234"),
+            AlertPolicy(name="12", incident_preference="", account_id="1234"),
+        ]
+        self.mock_api.iter_policies_from_query.return_value = iter(policies)
+        path = tmp_path / "policies.jsonl"
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(name_like="1", fields=["name"], output_file=str(path)),
+        )
+
+        assert result["count"] == 2
+        assert result["policies"] == []
+        with open(path) as f:
+            assert [json.loads(line)["name"] for line in f] == ["1", "12"]
@@ -0,0 +1,75 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.modules.entity_info import (
+    main as module_main,
+)
+
+
+def _search_response(guids, next_cursor=None):
+    return {
+        "data": {
+            "actor": {
+                "entitySearch": {
+                    "count": len(guids),
+                    "results": {
+                        "nextCursor": next_cursor,
+                        "entities": [
+                            {
+                                "guid": guid,
+                                "name": guid,
+                                "accountId": 1234,
+                                "type": "APPLICATION",
+                                "entityType": "APM_APPLICATION_ENTITY",
+                                "tags": [{"key": "env", "values": ["prod"]}],
+                            }
+                            for guid in guids
+                        ],
+                    },
+                }
+            }
+        }
+    }
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, mocker, responses):
+        self.run_query = mocker.patch(
+            "ansible_collections.newrelic.core.plugins.modules.entity_info.EntityApi.run_query",
+            side_effect=responses,
+        )
+
+    def test_guid(self, mocker):
+        self.__prepare(mocker, [_search_response(["a"])])
+        result = run_module(module_entry=module_main, module_args=dict(guid="a"))
+
+        assert result["changed"] is False
+        assert [e["guid"] for e in result["entities"]] == ["a"]
+        assert result["entities"][0]["tags"] == {"env": ["prod"]}
+        assert result["entities"][0]["entity_type"] == "APM_APPLICATION_ENTITY"
+
+    def test_guids_are_batched(self, mocker):
+        guids = ["guid-%s" % i for i in range(30)]
+        self.__prepare(
+            mocker, [_search_response(guids[:25]), _search_response(guids[25:])]
+        )
+        result = run_module(module_entry=module_main, module_args=dict(guids=guids))
+
+        assert [e["guid"] for e in result["entities"]] == guids
+        assert self.run_query.call_count == 2
+        second_query = self.run_query.call_args.kwargs["query"]
+        assert "id IN ('guid-25', " in second_query
+
+    def test_query_follows_cursor(self, mocker):
+        self.__prepare(
+            mocker, [_search_response(["a", "b"], "next"), _search_response(["c"])]
+        )
+        result = run_module(
+            module_entry=module_main, module_args=dict(query="domain = 'APM'")
+        )
+
+        assert [e["guid"] for e in result["entities"]] == ["a", "b", "c"]
+        assert 'cursor: "next"' in self.run_query.call_args.kwargs["query"]
@@ -0,0 +1,72 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+
+from ansible_collections.newrelic.core.plugins.modules.entity_tag_index_info import (
+    main as module_main,
+)
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, mocker):
+        self.api_class = "ansible_collections.newrelic.core.plugins.modules.entity_tag_index_info.EntityApi"
+        self.entities = []
+        for guid, team in (("a", "payments"), ("b", "search")):
+            entity = Entity(name=guid, account_id="1234", guid=guid)
+            entity.tags = EntityTags(dict(team=[team]))
+            entity.type = "APPLICATION"
+            self.entities.append(entity)
+
+        self.search = mocker.patch(
+            self.api_class + ".get_entities_from_query",
+            return_value=(self.entities, None),
+        )
+
+    def test_build_then_use_index(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        index_path = str(tmp_path / "index.json")
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(index_path=index_path, tags=dict(team="payments")),
+        )
+        assert result["changed"] is False
+        assert result["guids"] == ["a"]
+        assert result["entities"][0]["tags"] == {"team": ["payments"]}
+        assert result["index"]["rebuilt"] is True
+        assert self.search.call_count == 1
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(index_path=index_path, missing_tags=["team"]),
+        )
+        assert result["guids"] == []
+        assert result["index"]["rebuilt"] is False
+        assert self.search.call_count == 1
+
+    def test_refresh_guids(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        index_path = str(tmp_path / "index.json")
+        run_module(module_entry=module_main, module_args=dict(index_path=index_path))
+
+        self.entities[1].tags = EntityTags(dict(team=["payments"]))
+        self.search.return_value = ([self.entities[1]], None)
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                index_path=index_path,
+                refresh_guids=["b"],
+                tags=dict(team="payments"),
+            ),
+        )
+
+        assert result["guids"] == ["a", "b"]
+        assert result["index"]["refreshed"] == 1
+        assert "id IN ('b')" in self.search.call_args.args[0]
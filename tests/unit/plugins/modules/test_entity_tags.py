@@ -66,3 +66,18 @@ class TestNrModule(ModuleTestCase):
 
         assert result["changed"] is True
         assert set(result["changed_tags"]["one"]) == set(["1"])
+
+    def test_check_mode(self, mocker):
+        self.__prepare(mocker)
+        run_query = mocker.patch(self.api_class + ".run_query")
+        module_args = {
+            **self.default_args,
+            **dict(tags=dict(three=["3"]), _ansible_check_mode=True),
+        }
+        result = run_module(module_entry=module_main, module_args=module_args)
+
+        assert result["changed"] is True
+        assert "three" not in result["diff"]["before"]
+        assert result["diff"]["after"]["three"] == ["3"]
+        assert "pending_propagation" not in result
+        run_query.assert_not_called()
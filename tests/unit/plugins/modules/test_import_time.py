@@ -0,0 +1,63 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ansible_collections.newrelic.core.plugins.module_utils import nerdgraph_api_base
+
+COLLECTION_ROOT = os.path.dirname(os.path.abspath(nerdgraph_api_base.__file__))
+for _ in range(5):
+    COLLECTION_ROOT = os.path.dirname(COLLECTION_ROOT)
+MODULES_DIR = os.path.join(
+    COLLECTION_ROOT, "ansible_collections", "newrelic", "core", "plugins", "modules"
+)
+MODULES = sorted(
+    name[:-3]
+    for name in os.listdir(MODULES_DIR)
+    if name.endswith(".py") and not name.startswith("_")
+)
+
+# Packages that are only needed once a request is sent or a template is rendered.
+# The import time budget is checked by tests/benchmarks/bench_import_time.py
+DEFERRED_PACKAGES = ("requests", "urllib3", "jinja2")
+
+
+def import_times(module: str):
+    """
+    Imports a module in a new interpreter with -X importtime, and returns the self
+    time in microseconds of each imported package.
+    """
+    env = dict(os.environ, PYTHONPATH=COLLECTION_ROOT)
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import ansible_collections.newrelic.core.plugins.modules.%s" % module,
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = dict()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_deferred_imports(module):
+    times = import_times(module)
+
+    loaded = sorted(name for name in times if name.split(".")[0] in DEFERRED_PACKAGES)
+    assert loaded == []
@@ -112,3 +112,55 @@ class TestNrModule(ModuleTestCase):
         )
         assert result["changed"] is True
         assert self.test_condition.description == "b"
+
+    def test_check_mode(self, mocker):
+        self.__prepare(mocker)
+        self.test_condition.id = 1
+        mocker.patch(
+            self.api_class + ".get_condition_by_name_policy_and_account",
+            return_value=self.test_condition,
+        )
+        run_query = mocker.patch(self.api_class + ".run_query")
+        result = run_module(
+            module_entry=module_main,
+            module_args={
+                **self.default_args,
+                **dict(description="b", _ansible_check_mode=True),
+            },
+        )
+
+        assert result["changed"] is True
+        assert result["condition"]["id"] == 1
+        assert result["diff"]["before"]["description"] == "a"
+        assert result["diff"]["after"]["description"] == "b"
+        run_query.assert_not_called()
+
+    def test_prefetch(self, mocker, tmp_path):
+        self.__prepare(mocker)
+        search = mocker.patch(
+            self.api_class + ".get_condition_data_from_query",
+            return_value=(
+                [
+                    {"id": "1", "name": "foo", "policyId": "123", "type": "STATIC"},
+                    {"id": "2", "name": "bar", "policyId": "123", "type": "STATIC"},
+                ],
+                None,
+            ),
+        )
+        delete = mocker.patch(self.api_class + ".run_query")
+        cache_file = str(tmp_path / "cache.json")
+        for name in ("foo", "bar", "baz"):
+            result = run_module(
+                module_entry=module_main,
+                module_args=dict(
+                    name=name,
+                    policy_id="123",
+                    state="absent",
+                    prefetch=True,
+                    prefetch_cache_file=cache_file,
+                ),
+            )
+            assert result["changed"] is (name != "baz")
+
+        assert search.call_count == 1
+        assert delete.call_count == 2
@@ -110,3 +110,25 @@ class TestNrModule(ModuleTestCase):
         )
         assert result["changed"] is True
         assert result["monitor"]["period"] == "EVERY_5_MINUTES"
+
+    def test_check_mode(self, mocker):
+        self.__prepare(mocker)
+        self.test_monitor.id = 2
+        self.test_monitor.guid = 1
+        mocker.patch(
+            self.api_class + ".get_monitor_by_name_and_account",
+            return_value=self.test_monitor,
+        )
+        run_query = mocker.patch(self.api_class + ".run_query")
+        result = run_module(
+            module_entry=module_main,
+            module_args={
+                **self.default_args,
+                **dict(period="EVERY_HOUR", _ansible_check_mode=True),
+            },
+        )
+
+        assert result["changed"] is True
+        assert result["diff"]["before"]["period"] == "EVERY_MINUTE"
+        assert result["diff"]["after"]["period"] == "EVERY_HOUR"
+        run_query.assert_not_called()
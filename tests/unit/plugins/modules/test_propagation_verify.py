@@ -0,0 +1,185 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ...common.utils import run_module, ModuleTestCase
+
+from ansible_collections.newrelic.core.plugins.module_utils.alert_policy.objects import (
+    AlertPolicy,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.entity.objects import (
+    Entity,
+    EntityTags,
+)
+from ansible_collections.newrelic.core.plugins.module_utils.propagation import (
+    PendingPropagationStore,
+    entity_tags_marker,
+    policy_marker,
+)
+from ansible_collections.newrelic.core.plugins.modules.propagation_verify import (
+    main as module_main,
+)
+
+
+class TestNrModule(ModuleTestCase):
+    def __prepare(self, mocker, tmp_path):
+        self.module_path = (
+            "ansible_collections.newrelic.core.plugins.modules.propagation_verify"
+        )
+        self.propagation_file = str(tmp_path / "pending.json")
+        self.store = PendingPropagationStore(self.propagation_file)
+        mocker.patch(self.module_path + ".time.sleep")
+
+        self.policy = AlertPolicy(
+            name="foo", incident_preference="PER_POLICY", account_id="1234", id="1"
+        )
+        self.deleted_policy = AlertPolicy(
+            name="bar", incident_preference="PER_POLICY", account_id="1234", id="2"
+        )
+        self.entity = Entity(name="host", account_id="1234", guid="guid")
+        self.entity.tags = EntityTags(dict(env=["prod"], team=["a"]))
+
+        self.store.add(policy_marker(self.policy))
+        self.store.add(policy_marker(self.deleted_policy, state="absent"))
+        self.store.add(entity_tags_marker(self.entity, EntityTags(dict(env=["prod"]))))
+
+    def test_verify(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path)
+        stale_policy = AlertPolicy(
+            name="foo", incident_preference="PER_CONDITION", account_id="1234", id="1"
+        )
+        policy_search = mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            side_effect=[
+                ([stale_policy, self.deleted_policy], None),
+                ([self.policy], None),
+            ],
+        )
+        entity_search = mocker.patch(
+            self.module_path + ".EntityApi.iter_entities_by_guids",
+            return_value=iter([self.entity]),
+        )
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(propagation_file=self.propagation_file),
+        )
+
+        assert result["changed"] is False
+        assert result["attempts"] == 2
+        assert result["pending"] == []
+        assert len(result["verified"]) == 3
+        assert policy_search.call_args.args[0] == 'ids: ["1","2"]'
+        assert entity_search.call_count == 1
+        assert self.store.load() == []
+
+    def test_check_mode(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path)
+        mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            return_value=([self.policy], None),
+        )
+        mocker.patch(
+            self.module_path + ".EntityApi.iter_entities_by_guids",
+            return_value=iter([self.entity]),
+        )
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                propagation_file=self.propagation_file, _ansible_check_mode=True
+            ),
+        )
+
+        assert len(result["verified"]) == 3
+        assert len(self.store.load()) == 3
+
+    def test_timeout(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path)
+        mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            return_value=([self.deleted_policy], None),
+        )
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                propagation_file=self.propagation_file,
+                kinds=["alert_policy"],
+                propegation_timeout=0,
+            ),
+            expect_success=False,
+        )
+
+        assert result["failed"] is True
+        assert result["attempts"] == 1
+        assert {m["id"] for m in result["pending"]} == {"1", "2"}
+        assert len(self.store.load()) == 3
+
+    @pytest.mark.parametrize("as_list", [True, False])
+    def test_registered_results(self, mocker, tmp_path, as_list):
+        self.__prepare(mocker, tmp_path)
+        registered = dict(
+            changed=True,
+            results=[
+                dict(
+                    changed=True,
+                    policy=dict(id=3, name="baz"),
+                    invocation=dict(
+                        module_args=dict(
+                            state="present",
+                            account_id="1234",
+                            incident_preference="PER_POLICY",
+                        )
+                    ),
+                ),
+                dict(changed=False, policy=dict(id=4, name="unchanged")),
+                dict(skipped=True, changed=False),
+            ],
+        )
+        new_policy = AlertPolicy(
+            name="baz", incident_preference="PER_POLICY", account_id="1234", id="3"
+        )
+        policy_search = mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            return_value=([new_policy], None),
+        )
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                propagation_file=str(tmp_path / "empty.json"),
+                # a looped task's registered result is passed as is in playbooks
+                results=[registered] if as_list else registered,
+            ),
+        )
+
+        assert result["attempts"] == 1
+        assert [m["id"] for m in result["verified"]] == ["3"]
+        assert policy_search.call_args.args[0] == 'ids: ["3"]'
+        assert len(self.store.load()) == 3
+
+    def test_shared_backoff(self, mocker, tmp_path):
+        self.__prepare(mocker, tmp_path)
+        sleep = mocker.patch(self.module_path + ".time.sleep")
+        mocker.patch(
+            self.module_path + ".AlertPolicyApi.get_policies_from_query",
+            return_value=([self.deleted_policy], None),
+        )
+
+        result = run_module(
+            module_entry=module_main,
+            module_args=dict(
+                propagation_file=self.propagation_file,
+                kinds=["alert_policy"],
+                propegation_timeout=10,
+                initial_delay=1,
+                max_delay=4,
+            ),
+            expect_success=False,
+        )
+
+        assert [c.args[0] for c in sleep.call_args_list] == [1, 2, 4, 3]
+        assert result["attempts"] == 5
@@ -46,7 +46,7 @@ class TestNrModule(ModuleTestCase):
                         priority=k.split("_", maxsplit=1)[0].upper(),
                     )
                 )
-            else:
+            elif k != "monitor_guid":
                 setattr(self.test_condition, k, v)
         self.test_condition.nrql_query = (
             "SELECT sum(constant) FROM ("